@@ -0,0 +1,141 @@
+import heapq
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+CAUSAL_WAIT_TIMEOUT = 5.0  # 초 — 선행 메시지가 끝내 오지 않을 때 보류를 포기하고 전달하는 시간
+
+
+class _Pending:
+    """선행 메시지를 기다리는 수신 메시지 1건."""
+
+    __slots__ = ("record", "clock", "deadline", "done")
+
+    def __init__(self, record, clock: Dict[str, int], deadline: float):
+        self.record = record
+        self.clock = clock
+        self.deadline = deadline
+        self.done = False
+
+
+class CausalDeliveryBuffer:
+    """벡터 클락 기반 인과 순서 전달 버퍼.
+
+    발신자 s의 메시지 m(클락 V)은 아래 조건을 만족할 때 전달됩니다.
+    - s로부터 V[s] - 1번째 메시지까지 전달됨
+    - 다른 모든 노드 k에 대해 V[k]번째 메시지까지 전달됨
+    조건이 충족되지 않은 메시지는 "첫 번째로 부족한 선행 조건" 하나에만 색인되므로,
+    새 메시지가 전달될 때 해당 노드를 기다리는 메시지만 다시 검사합니다 (전체 재탐색 없음).
+    동시에 전달 가능해진 메시지들은 (클락 합, 발신자, counter) 순으로 결정적으로 정렬됩니다.
+    wait_timeout 이상 보류된 메시지는 선행 메시지가 유실된 것으로 보고 강제로 전달합니다.
+    """
+
+    def __init__(self, wait_timeout: float = CAUSAL_WAIT_TIMEOUT):
+        self.wait_timeout = wait_timeout
+        self.delivered: Dict[str, int] = {}
+        self._waiting: Dict[str, List[Tuple[int, int, _Pending]]] = {}  # {node: heap[(필요 counter, seq, pending)]}
+        self._expiry: List[Tuple[float, int, _Pending]] = []
+        self._seq = 0
+        self._pending_count = 0
+
+    def __len__(self) -> int:
+        return self._pending_count
+
+    def mark_delivered(self, node: str, counter: int):
+        """로컬에서 생성한 메시지 등 버퍼를 거치지 않고 전달된 메시지를 기록합니다."""
+        if counter > self.delivered.get(node, 0):
+            self.delivered[sys.intern(node)] = counter
+
+    def offer(self, record, clock: Dict[str, int]) -> list:
+        """새 메시지를 넣고, 그 결과 전달 가능해진 (record, clock) 목록을 순서대로 반환합니다."""
+        if not clock:
+            return self._deliver_cascade([(record, clock)])
+
+        dep = self._missing_dep(record.sender_session, clock)
+        if dep is None:
+            return self._deliver_cascade([(record, clock)])
+
+        pending = _Pending(record, clock, time.time() + self.wait_timeout)
+        self._park(pending, dep)
+        self._seq += 1
+        heapq.heappush(self._expiry, (pending.deadline, self._seq, pending))
+        self._pending_count += 1
+        return []
+
+    def release_stale(self, now: Optional[float] = None) -> list:
+        """wait_timeout이 지난 보류 메시지를 선행 조건을 포기하고 전달합니다."""
+        now = time.time() if now is None else now
+        released = []
+        while self._expiry and self._expiry[0][0] <= now:
+            _, _, pending = heapq.heappop(self._expiry)
+            if pending.done:
+                continue
+            # 유실된 선행 메시지들은 전달된 것으로 간주하여 같은 조건을 기다리던 메시지도 함께 풀어줌
+            sender = pending.record.sender_session
+            for node, count in pending.clock.items():
+                self.mark_delivered(node, count - 1 if node == sender else count)
+            self._finish(pending)
+            released.extend(self._deliver_cascade([(pending.record, pending.clock)], woken=pending.clock.keys()))
+        return released
+
+    def _missing_dep(self, sender: str, clock: Dict[str, int]) -> Optional[Tuple[str, int]]:
+        delivered = self.delivered
+        for node, count in clock.items():
+            need = count - 1 if node == sender else count
+            if delivered.get(node, 0) < need:
+                return node, need
+        return None
+
+    def _park(self, pending: _Pending, dep: Tuple[str, int]):
+        node, need = dep
+        self._seq += 1
+        heapq.heappush(self._waiting.setdefault(node, []), (need, self._seq, pending))
+
+    def _finish(self, pending: _Pending):
+        pending.done = True
+        self._pending_count -= 1
+
+    @staticmethod
+    def _order_key(record, clock: Dict[str, int]):
+        return sum(clock.values()), record.sender_session, clock.get(record.sender_session, 0)
+
+    def _deliver_cascade(self, ready: list, woken=()) -> list:
+        heap = []
+        for record, clock in ready:
+            self._seq += 1
+            heapq.heappush(heap, (self._order_key(record, clock), self._seq, record, clock))
+        for node in woken:
+            self._wake(node, heap)
+
+        delivered = []
+        while heap:
+            _, _, record, clock = heapq.heappop(heap)
+            delivered.append((record, clock))
+            sender = record.sender_session
+            if clock:
+                self.mark_delivered(sender, clock.get(sender, 0))
+            self._wake(sender, heap)
+        return delivered
+
+    def _wake(self, node: str, heap: list):
+        """node의 전달 counter가 올라갔을 때 그 조건을 기다리던 메시지만 다시 검사합니다."""
+        waiters = self._waiting.get(node)
+        if not waiters:
+            return
+        current = self.delivered.get(node, 0)
+        while waiters and waiters[0][0] <= current:
+            _, _, pending = heapq.heappop(waiters)
+            if pending.done:
+                continue
+            dep = self._missing_dep(pending.record.sender_session, pending.clock)
+            if dep is not None:
+                self._park(pending, dep)
+                continue
+            self._finish(pending)
+            self._seq += 1
+            heapq.heappush(
+                heap,
+                (self._order_key(pending.record, pending.clock), self._seq, pending.record, pending.clock),
+            )
+        if not waiters:
+            del self._waiting[node]
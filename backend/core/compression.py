@@ -0,0 +1,157 @@
+import threading
+import zlib
+from typing import Iterable, Optional
+
+try:
+    import zstandard as _zstd  # 선택 의존성 — 설치되어 있으면 zlib보다 빠르고 압축률이 좋은 zstd를 우선 사용
+except ImportError:
+    _zstd = None
+
+# 암호화 전 평문 앞에 붙는 코덱 플래그 (1바이트)
+#   JSON 패킷: 압축한 경우에만 플래그를 붙임. 압축하지 않은 JSON은 항상 "{"(0x7B)로 시작하므로
+#             구버전 피어와 주고받는 평문과 그대로 호환됨
+#   파일 청크: 스트림 헤더에서 chunk_codec을 알린 경우 모든 청크에 플래그를 붙임 (FLAG_RAW = 압축 안 함)
+FLAG_RAW = 0x00
+FLAG_ZLIB = 0x01
+FLAG_ZSTD = 0x02
+
+CODEC_ZLIB = "zlib"
+CODEC_ZSTD = "zstd"
+SUPPORTED_CODECS = (CODEC_ZSTD, CODEC_ZLIB) if _zstd is not None else (CODEC_ZLIB,)  # 선호 순
+
+COMPRESSION_THRESHOLD = 512  # 바이트 — 이보다 작은 패킷은 압축 이득보다 비용이 커서 그대로 보냄
+MAX_DECOMPRESSED_SIZE = 64 * 1024 * 1024  # 압축 폭탄 방어용 상한
+CHUNK_GIVE_UP_AFTER = 4  # 연속으로 이만큼의 청크가 줄지 않으면 그 스트림은 압축을 멈춤
+MIN_SAVING_RATIO = 0.9  # 압축 결과가 원본의 90% 이상이면 이득이 없는 것으로 봄
+
+_ZLIB_LEVEL = 6
+_ZLIB_CHUNK_LEVEL = 1  # 파일 청크는 속도 우선
+_ZSTD_LEVEL = 3
+
+_FLAGS = {CODEC_ZLIB: FLAG_ZLIB, CODEC_ZSTD: FLAG_ZSTD}
+
+
+class CompressionStats:
+    """압축 전후 바이트 누적 통계 (프로세스 전체)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.frames = 0  # 압축을 시도한 프레임/청크 수
+        self.compressed = 0  # 실제로 압축해서 보낸 수
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def record(self, size_in: int, size_out: int, compressed: bool):
+        with self._lock:
+            self.frames += 1
+            self.compressed += 1 if compressed else 0
+            self.bytes_in += size_in
+            self.bytes_out += size_out
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            saved = self.bytes_in - self.bytes_out
+            return {
+                "frames": self.frames,
+                "compressed": self.compressed,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "bytes_saved": saved,
+                "ratio": self.bytes_out / self.bytes_in if self.bytes_in else 1.0,
+            }
+
+
+stats = CompressionStats()
+
+
+def choose_codec(peer_codecs: Optional[Iterable[str]]) -> Optional[str]:
+    """양쪽이 모두 지원하는 코덱 중 선호도가 가장 높은 것. 피어가 광고하지 않았으면 None (압축 안 함)"""
+    if not peer_codecs:
+        return None
+    for codec in SUPPORTED_CODECS:
+        if codec in peer_codecs:
+            return codec
+    return None
+
+
+def _compress(data: bytes, codec: str, level: Optional[int] = None) -> bytes:
+    if codec == CODEC_ZSTD:
+        return _zstd.ZstdCompressor(level=level or _ZSTD_LEVEL).compress(data)
+    return zlib.compress(data, level or _ZLIB_LEVEL)
+
+
+def _decompress(flag: int, data) -> bytes:
+    if flag == FLAG_ZLIB:
+        decompressor = zlib.decompressobj()
+        out = decompressor.decompress(data, MAX_DECOMPRESSED_SIZE)
+        if decompressor.unconsumed_tail:
+            raise ValueError("decompressed payload too large")
+        # 잘린 스트림은 예외 없이 앞부분만 반환되므로 끝(eof)까지 도달했는지 확인
+        if not decompressor.eof:
+            raise ValueError("truncated zlib stream")
+        if decompressor.unused_data:
+            raise ValueError("trailing data after zlib stream")
+        return out
+    if flag == FLAG_ZSTD:
+        if _zstd is None:
+            raise ValueError("zstd payload received but zstandard is not installed")
+        # 한 번에 푸는 API는 프레임이 잘렸거나 손상되면 ZstdError를 던짐 — 호출측이 다루는 ValueError로 통일
+        try:
+            return _zstd.ZstdDecompressor().decompress(bytes(data), max_output_size=MAX_DECOMPRESSED_SIZE)
+        except _zstd.ZstdError as e:
+            raise ValueError(f"invalid zstd stream: {e}") from e
+    raise ValueError(f"unknown codec flag: {flag}")
+
+
+def pack_payload(data: bytes, codec: Optional[str]) -> bytes:
+    """JSON 패킷 평문을 (이득이 있으면) 압축. 압축하지 않으면 원본 그대로 반환"""
+    if codec is None or len(data) < COMPRESSION_THRESHOLD:
+        return data
+    packed = _compress(data, codec)
+    if len(packed) + 1 >= len(data) * MIN_SAVING_RATIO:
+        stats.record(len(data), len(data), False)
+        return data
+    stats.record(len(data), len(packed) + 1, True)
+    return bytes((_FLAGS[codec],)) + packed
+
+
+def unpack_payload(data: bytes) -> bytes:
+    """pack_payload의 역. 플래그가 없는 평문(구버전 피어 포함)은 그대로 반환"""
+    if data[:1] in (b"\x01", b"\x02"):
+        return _decompress(data[0], memoryview(data)[1:])
+    return data
+
+
+class ChunkCompressor:
+    """파일 스트림 청크용 적응형 압축기.
+
+    이미 압축된 형식(zip, 이미지, 동영상 등)은 줄지 않으므로, 연속 CHUNK_GIVE_UP_AFTER개의 청크가
+    충분히 줄지 않으면 그 스트림의 나머지 청크는 압축을 시도하지 않고 FLAG_RAW로 보냅니다.
+    """
+
+    def __init__(self, codec: str):
+        self.codec = codec
+        self._misses = 0
+
+    def pack(self, chunk: bytes) -> bytes:
+        if self._misses < CHUNK_GIVE_UP_AFTER and len(chunk) >= COMPRESSION_THRESHOLD:
+            level = _ZLIB_CHUNK_LEVEL if self.codec == CODEC_ZLIB else None
+            packed = _compress(chunk, self.codec, level)
+            if len(packed) < len(chunk) * MIN_SAVING_RATIO:
+                self._misses = 0
+                stats.record(len(chunk), len(packed) + 1, True)
+                return bytes((_FLAGS[self.codec],)) + packed
+            self._misses += 1
+        stats.record(len(chunk), len(chunk) + 1, False)
+        return bytes((FLAG_RAW,)) + chunk
+
+
+def unpack_chunk(data: bytes) -> bytes:
+    if not data:
+        raise ValueError("empty chunk")
+    if data[0] == FLAG_RAW:
+        return data[1:]
+    return _decompress(data[0], memoryview(data)[1:])
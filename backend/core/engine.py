@@ -7,144 +7,698 @@ import time
 import uuid
 from typing import Callable, Optional
 
-from backend.core.history import ChatHistoryManager
-from backend.core.security import SessionSecurity
+from backend.core import compression
+from backend.core.gossip import (
+    DEFAULT_RELAY_TTL,
+    MAX_RELAY_FANOUT,
+    MAX_RELAY_TTL,
+    RELAY_FANOUT_FIELD,
+    RELAY_FROM_FIELD,
+    RELAY_TTL_FIELD,
+    relay_targets,
+    split_targets,
+)
+from backend.core.history import ChatHistoryManager, MessageRecord
+from backend.core.room_session import RoomSession, frame_for_room, split_room_frame
 from backend.network.discovery import PeerDiscovery
-from backend.network.p2p_client import P2PClient
-from backend.network.p2p_server import P2PServer
+from backend.network.liveness import HEARTBEAT_TIMEOUT, PeerLiveness
+from backend.network.outbox import ReliableOutbox
+from backend.network.send_queue import PeerSendQueue
+from backend.network.peer_registry import peer_rooms
+from backend.network.p2p_client import CODEC_SECONDS, DISK_SECONDS, P2PClient
+from backend.network.p2p_server import DEFAULT_BACKLOG, InflightBudget, P2PServer
 from backend.utils.file_manager import BandwidthThrottler, FileManager
+from backend.utils.logger import get_logger
+from backend.utils.metrics import COUNT_BUCKETS, THROUGHPUT_BUCKETS, registry as metrics
+
+logger = get_logger("engine")
 
 
 MAX_PACKET_SIZE = 50 * 1024 * 1024  # 50 MB — OOM DoS 방어용 상한
+PEER_EVENT_COALESCE_WINDOW = 0.05  # 초 — 피어 이벤트 버스트를 한 번에 처리하기 위한 대기
+HOUSEKEEPING_INTERVAL = 2.0  # 초 — 보류 메시지 해제, 클락 정리 주기
+LOBBY_ROOM = "__LOBBY__"
+# 한 연결에 이어서 보낼 수 있는 패킷 (그 외 유형은 연결 하나를 단독으로 사용)
+BATCHABLE_PACKET_TYPES = ("MESSAGE", "FILE_REQ", "FILE_CANCEL", "FILE_DOWNLOADED", "ACK", "CHAT_HISTORY")
+ACK_BATCH_DELAY = 0.05  # 초 — 같은 피어에게 보낼 ACK를 모아서 한 패킷으로 전송
+MAX_TRANSFER_HISTORY = 200  # get_transfer_status로 조회할 수 있도록 남겨 두는 최근 전송 수
+LIVENESS_EXPIRY_FRACTION = 0.5  # 디스커버리 만료까지 남은 시간이 이 비율 아래면 (알림이 끊긴 것) 생존 확인 대상
+MAX_CONCURRENT_DOWNLOADS = 8  # 동시에 받는 파일 스트림 수 (연결 처리 워커와 별도 스레드)
+FILE_STREAM_IDLE_TIMEOUT = 60.0  # 초 — 파일 스트림 청크 사이 최대 대기 시간 (넘으면 실패 처리)
+
+# 엔진 계측 (get_metrics / 제어 API /metrics / LANCHAT_METRICS_*로 노출)
+FRAMES_SENT = metrics.counter("lanchat_frames_sent_total", "피어에게 보내려고 만든 프레임 수 (패킷 유형별, 재전송 제외)", ("type",))
+FRAMES_RECEIVED = metrics.counter("lanchat_frames_received_total", "수신해 처리한 프레임 수 (패킷 유형별)", ("type",))
+PAYLOAD_BYTES = metrics.counter("lanchat_payload_bytes_total", "압축·암호화 전 패킷 평문 바이트", ("direction",))
+FRAME_BYTES = metrics.counter("lanchat_frame_bytes_total", "압축·암호화 후 프레임 바이트 (실제 전송량은 lanchat_tcp_sent_bytes_total)", ("direction",))
+BROADCAST_SECONDS = metrics.histogram("lanchat_broadcast_seconds", "방 메시지 1건의 팬아웃 준비 시간 (직렬화·압축·암호화·송신 큐 투입)")
+BROADCAST_TARGETS = metrics.histogram("lanchat_broadcast_targets", "방 메시지 1건의 직접 전송 대상 수", buckets=COUNT_BUCKETS)
+TRANSFER_BYTES = metrics.counter("lanchat_transfer_bytes_total", "완료된 파일 전송 바이트", ("direction",))
+TRANSFER_THROUGHPUT = metrics.histogram("lanchat_transfer_throughput_bytes_per_second", "완료된 파일 전송 1건의 평균 속도",
+                                        ("direction",), buckets=THROUGHPUT_BUCKETS)
+
+
+def _record_transfer(direction: str, size: int, elapsed: float):
+    TRANSFER_BYTES.inc(direction, amount=size)
+    if elapsed > 0:
+        TRANSFER_THROUGHPUT.observe(size / elapsed, direction)
 
 
 class P2PEngine:
     """Core backend controller for discovery, messaging, and file transfer."""
 
-    def __init__(self, nickname: str, password: str = "", room_name: str = "Lobby"):
+    def __init__(self, nickname: str, password: str = "", room_name: str = LOBBY_ROOM,
+                 multicast_group: str = "", multicast_ttl: int = 1, tcp_server: Optional[P2PServer] = None,
+                 relay_fanout: int = 0, relay_ttl: int = DEFAULT_RELAY_TTL, tcp_backlog: int = DEFAULT_BACKLOG,
+                 legacy_discovery: bool = True):
         self.nickname = nickname
-        self.room_name = room_name
-        self.security = SessionSecurity(password, room_name=room_name)
-
-        self.tcp_server = P2PServer()
+        self.tcp_backlog = tcp_backlog
+        # 모든 수신 연결이 동시에 들고 있는 프레임 버퍼의 총량 제한 (폭주 시 메모리 대신 연결을 버림)
+        self.inbound_budget = InflightBudget()
+        self._download_slots = threading.BoundedSemaphore(MAX_CONCURRENT_DOWNLOADS)
+        # relay_fanout > 0이면 gossip 중계 모드: 같은 모드의 피어에게는 fanout명에게만 보내고 서로 전달
+        self.relay_fanout = max(0, min(int(relay_fanout), MAX_RELAY_FANOUT))
+        self.relay_ttl = max(0, min(int(relay_ttl), MAX_RELAY_TTL))
+
+        # 전송 계층(디스커버리 소켓, TCP 서버)은 프로세스 수명 동안 유지하고, 방 상태는 RoomSession으로 붙였다 뗌.
+        # 로비에서는 디스커버리만 실행하며 TCP 서버는 prewarm() 또는 첫 입장 시 바인딩
+        self.tcp_server = tcp_server
         self.discovery = PeerDiscovery(
             nickname=self.nickname,
-            tcp_port=self.tcp_server.port,
-            room_name=self.room_name,
-            is_private=self.security.is_encrypted,
+            tcp_port=tcp_server.port if tcp_server is not None else 0,
+            room_name=LOBBY_ROOM,
+            multicast_group=multicast_group,
+            multicast_ttl=multicast_ttl,
+            relay=self.relay_fanout > 0,
+            legacy_announce=legacy_discovery,
         )
 
-        self.history_mgr = ChatHistoryManager(self.discovery.session_id)
-
-        self.active_file_requests = {}  # {req_id: request_packet}
-        self.outgoing_file_requests = {}  # {req_id: {...}}
-        self.download_paths = {}  # {req_id: temp_save_path}
+        # 여러 방에 동시에 참여 가능. session은 UI가 보고 있는(포커스된) 방
+        self.session: Optional[RoomSession] = None
+        self.joined = {}  # {room_name: RoomSession} — 참여 순서 유지
+        self._joined_by_id = {}  # {room_id: RoomSession} — 수신 프레임 라우팅용
+        self._sessions = {}  # {room_name: RoomSession} — 나간 방 포함. 재입장 시 기록과 msg_id counter를 이어서 사용
+        self._transport_lock = threading.Lock()
+        self._prewarm_thread: Optional[threading.Thread] = None
+        self._readmit_thread: Optional[threading.Thread] = None  # 보류 중인 피어의 TCP 재확인 (한 번에 하나)
+        self._gauges = []  # [(이름, 설명, 라벨, 함수)] — start에서 metrics 레지스트리에 등록
 
         self.on_file_transfer_completed: Optional[Callable] = None  # (req_id, final_path)
+        self.on_file_transfer_failed: Optional[Callable] = None  # (req_id, error)
         self.on_message_received: Optional[Callable] = None
         self.on_peer_updated: Optional[Callable] = None
         self.on_file_requested: Optional[Callable] = None
         self.on_chat_history_received: Optional[Callable] = None
+        self.on_rooms_changed: Optional[Callable] = None  # (changes: {room_name: {"is_private", "count"} 또는 삭제 시 None})
+        self.on_room_activity: Optional[Callable] = None  # (room_name, unread) — 보고 있지 않은 방에 메시지 도착
+        self.on_delivery_state: Optional[Callable] = None  # (room_name, msg_id, delivered, total, state)
+        self.on_peer_backpressure: Optional[Callable] = None  # (peer_session_id, congested) — 송신이 밀리는 느린 피어
+        self.on_peer_liveness: Optional[Callable] = None  # (peer_session_id, suspect) — 응답하지 않는 피어
+        # (room_name, records, synced) — 보고 있는 방과 무관하게 참여 중인 모든 방의 수신 메시지 (헤드리스/자동화용).
+        # synced=True이면 입장 시 받은 히스토리
+        self.on_room_messages: Optional[Callable] = None
+
+        # 방 메시지는 고정 워커의 피어별 송신 큐로 보내고, 재전송 큐가 ACK로 확인될 때까지 추적
+        self.send_queue = PeerSendQueue(
+            self._resolve_peer, on_backpressure=self._on_backpressure, on_result=self._on_send_result
+        )
+        # 트래픽과 가벼운 TCP 확인으로 같은 방 피어의 생존을 추적 — 응답 없는 피어는 디스커버리 만료 전에 제외
+        self.liveness = PeerLiveness(self._liveness_targets, on_suspect=self._on_peer_suspect, on_dead=self._on_peer_dead,
+                                     needs_check=self._needs_liveness_check)
+        self.outbox = ReliableOutbox(self._transmit, on_state=self._on_delivery_state)
+        self._ack_lock = threading.Lock()
+        self._ack_batches = {}  # {(room_name, peer_session_id): [msg_id, ...]}
+        self._transfer_lock = threading.Lock()
+        self._transfers = {}  # {req_id: 상태} — 이번 실행 중 올린 공유와 수락한 다운로드 (삽입 순)
 
         self._running = False
-
+        self._peer_events = []
+        self._peer_event_cond = threading.Condition()
+        self._room_changed = False
+        self._touched_rooms = set()  # 다음 이벤트 처리 때 집계를 다시 확인할 방
+        self._last_housekeeping = 0.0  # time.monotonic() — 마지막 _housekeeping 실행 시각
+        self._room_view = {}  # {room_name: entry} — UI에 마지막으로 알린 방 목록 (내 참여 반영)
+        self.discovery.add_listener(self._on_discovery_event)
+        self.discovery.add_room_listener(self._on_room_delta)
+
+        if room_name != LOBBY_ROOM:
+            self.join_room(room_name, password)
+
+    # ---------- 현재 방 상태 (UI 호환용 접근자) ----------
+    @property
+    def room_name(self) -> str:
+        session = self.session
+        return session.room_name if session is not None else LOBBY_ROOM
+
+    @property
+    def security(self):
+        session = self.session
+        return session.security if session is not None else None
+
+    @property
+    def history_mgr(self) -> Optional[ChatHistoryManager]:
+        session = self.session
+        return session.history_mgr if session is not None else None
+
+    @property
+    def active_file_requests(self) -> dict:
+        session = self.session
+        return session.active_file_requests if session is not None else {}
+
+    @property
+    def outgoing_file_requests(self) -> dict:
+        session = self.session
+        return session.outgoing_file_requests if session is not None else {}
+
+    @property
+    def download_paths(self) -> dict:
+        session = self.session
+        return session.download_paths if session is not None else {}
+
+    def _require_session(self, room_name: Optional[str] = None) -> RoomSession:
+        """room_name 방(기본: 보고 있는 방)의 세션. 참여 중이 아니면 RuntimeError"""
+        session = self.session if room_name is None else self.joined.get(room_name)
+        if session is None:
+            raise RuntimeError("not in a room" if room_name is None else f"not in room '{room_name}'")
+        return session
+
+    # ---------- 수명 주기 ----------
     def start(self):
         self._running = True
-        self.tcp_server.start(self._handle_incoming_tcp)
+        if self.tcp_server is not None or self.session is not None:
+            self._ensure_transport()
         self.discovery.start()
-        threading.Thread(target=self._peer_monitor_loop, daemon=True).start()
-        print(
-            f"[Engine] started (nick={self.nickname}, tcp={self.tcp_server.port}, encrypted={self.security.is_encrypted})"
+        self.send_queue.start()
+        self.outbox.start()
+        self.liveness.start()
+        threading.Thread(target=self._peer_event_loop, daemon=True).start()
+        self._kick_peer_events()
+        self._register_gauges()
+        logger.info("started (nick=%s, room=%s)", self.nickname, self.room_name)
+
+    def _register_gauges(self):
+        """조회 시점에 엔진 상태를 읽는 게이지 등록 (stop에서 해제)"""
+        def tcp_server_stats():
+            server = self.tcp_server
+            return {(k,): v for k, v in server.get_stats().items()} if server is not None else {}
+
+        def compression_bytes():
+            saved = compression.stats.snapshot()
+            return {("in",): saved["bytes_in"], ("out",): saved["bytes_out"]}
+
+        self._gauges = [
+            ("lanchat_history_messages", "방별 보관 중인 메시지 수", ("room",),
+             lambda: {(name,): len(s.history_mgr.messages) for name, s in list(self._sessions.items())}),
+            ("lanchat_tcp_server", "TCP 서버 연결 통계 (누적 수락/거절 + 현재 active/queued)", ("stat",), tcp_server_stats),
+            ("lanchat_inbound_buffer_bytes", "수신 프레임 버퍼가 현재 점유한 바이트", (), lambda: self.inbound_budget.in_use),
+            ("lanchat_peers", "디스커버리가 알고 있는 피어 수", (), lambda: len(self.discovery.registry)),
+            ("lanchat_suspect_peers", "응답이 없어 전송을 보류 중인 피어 수", (), lambda: len(self.liveness.suspects())),
+            ("lanchat_send_queue_bytes", "송신 큐에 대기 중인 바이트", (), self.send_queue.queued_bytes),
+            ("lanchat_outbox_pending_bytes", "ACK를 기다리는 전송 프레임 바이트", (), self.outbox.pending_bytes),
+            ("lanchat_compression_bytes", "송신측 압축 전(in)/후(out) 누적 바이트", ("stage",), compression_bytes),
+        ]
+        for name, help_text, labels, fn in self._gauges:
+            metrics.gauge(name, help_text, labels, fn=fn)
+
+    def _ensure_transport(self) -> P2PServer:
+        """TCP 서버를 (필요하면 바인딩하여) 수신 상태로 만들고 디스커버리에 포트를 광고"""
+        with self._transport_lock:
+            if self.tcp_server is None:
+                self.tcp_server = P2PServer(backlog=self.tcp_backlog)
+            if not self.tcp_server.running:
+                self.tcp_server.start(self._handle_incoming_tcp)
+            if self.discovery.tcp_port != self.tcp_server.port:
+                self.discovery.update_presence(tcp_port=self.tcp_server.port)
+            return self.tcp_server
+
+    def prewarm(self):
+        """로비에 있는 동안 TCP 서버를 백그라운드에서 미리 준비하여 입장 시 포트 탐색을 없앰"""
+        if self._prewarm_thread is not None or (self.tcp_server is not None and self.tcp_server.running):
+            return
+
+        def task():
+            try:
+                self._ensure_transport()
+            except RuntimeError as e:
+                logger.warning("prewarm failed: %s", e)
+
+        self._prewarm_thread = threading.Thread(target=task, daemon=True)
+        self._prewarm_thread.start()
+
+    def join_room(self, room_name: str, password: str = "", focus: bool = True) -> RoomSession:
+        """방에 참여합니다 (이미 참여 중인 다른 방은 유지). 소켓은 그대로 두고 디스커버리 광고만 바꿉니다."""
+        session = self.joined.get(room_name)
+        if session is None:
+            session = self._sessions.get(room_name)
+            if session is None:
+                session = RoomSession(room_name, password, self.discovery.session_id)
+                self._sessions[room_name] = session
+            else:
+                session.set_password(password)
+            self._ensure_transport()
+            self.joined[room_name] = session
+            self._joined_by_id[session.room_id] = session
+            logger.info("joined room '%s' (encrypted=%s)", room_name, session.security.is_encrypted)
+        else:
+            session.set_password(password)
+
+        if focus or self.session is None:
+            self.session = session
+            session.unread = 0
+        self._announce_rooms()
+        return session
+
+    def focus_room(self, room_name: str) -> RoomSession:
+        """참여 중인 방 중 UI에 보여줄 방을 바꿉니다. 기록은 로컬에 있으므로 재동기화하지 않음"""
+        session = self.joined[room_name]
+        self.session = session
+        session.unread = 0
+        self._announce_rooms()
+        return session
+
+    def leave_room(self, room_name: Optional[str] = None):
+        """room_name(기본: 보고 있는 방)에서 나갑니다. 방 기록은 재입장을 위해 보관"""
+        session = self.joined.get(room_name) if room_name is not None else self.session
+        if session is None:
+            return
+
+        # 진행 중인 파일 공유는 방을 떠나기 전에 취소를 알림
+        for req_id in list(session.outgoing_file_requests.keys()):
+            try:
+                self._cancel_file_sharing(session, req_id)
+            except Exception as e:
+                logger.warning("cancel_file_sharing error on leave (%s): %s", req_id, e)
+
+        self.joined.pop(session.room_name, None)
+        self._joined_by_id.pop(session.room_id, None)
+        if self.session is session:
+            self.session = next(iter(self.joined.values()), None)
+        self._announce_rooms(touched=(session.room_name,))
+        logger.info("left room '%s'", session.room_name)
+
+    def _announce_rooms(self, touched=()):
+        """참여 중인 모든 방을 한 패킷으로 광고. room_name/is_private는 구버전 피어를 위한 대표 방"""
+        focused = self.session
+        self.discovery.update_presence(
+            room_name=focused.room_name if focused is not None else LOBBY_ROOM,
+            is_private=focused.security.is_encrypted if focused is not None else False,
+            rooms=tuple((s.room_name, s.security.is_encrypted) for s in self.joined.values()),
         )
+        # 내 참여 여부가 방 목록 인원에 반영되므로 해당 방들의 집계를 다시 확인
+        self._kick_peer_events(rooms=tuple(self.joined) + tuple(touched))
+
+    def _room_entry(self, room_name: str):
+        """방 하나의 로비 표시용 집계. 내가 참여 중인 방은 나를 포함"""
+        entry = self.discovery.registry.room_entry(room_name)
+        session = self.joined.get(room_name)
+        if session is None:
+            return entry
+        return {
+            "is_private": session.security.is_encrypted or bool(entry and entry["is_private"]),
+            "count": (entry["count"] if entry else 0) + 1,
+        }
+
+    def room_summary(self):
+        """로비에 보여줄 전체 방 목록 {room_name: {is_private, count}} (새로고침 등 전체 갱신용)"""
+        self.discovery.registry.expire()
+        names = set(self.discovery.get_room_names()) | set(self.joined)
+        names.discard(LOBBY_ROOM)
+        summary = {}
+        for name in names:
+            entry = self._room_entry(name)
+            if entry is not None:
+                summary[name] = dict(entry)
+        return summary
 
     def stop(self):
         # 1. 종료 전 진행 중인 파일 공유가 있다면 취소 패킷을 동일 방에 브로드캐스트
-        for req_id in list(self.outgoing_file_requests.keys()):
-            try:
-                self.cancel_file_sharing(req_id)
-            except Exception as e:
-                print(f"[Engine] cancel_file_sharing error on stop ({req_id}): {e}")
+        for session in list(self.joined.values()):
+            for req_id in list(session.outgoing_file_requests.keys()):
+                try:
+                    self._cancel_file_sharing(session, req_id)
+                except Exception as e:
+                    logger.warning("cancel_file_sharing error on stop (%s): %s", req_id, e)
 
         # 2. 메인 스레드 플래그 다운
         self._running = False
+        with self._peer_event_cond:
+            self._peer_event_cond.notify_all()
+        self.discovery.remove_listener(self._on_discovery_event)
+        self.discovery.remove_room_listener(self._on_room_delta)
+        self.outbox.stop()
+        self.send_queue.stop()
+        self.liveness.stop()
+        for name, _help, _labels, fn in self._gauges:
+            metrics.unset_gauge(name, fn)
+        self._gauges = []
+        saved = compression.stats.snapshot()
+        if saved["compressed"]:
+            logger.info("compression saved %s bytes (%s/%s frames)", saved['bytes_saved'], saved['compressed'], saved['frames'])
         try:
             self.discovery.stop()
         except Exception as e:
-            print(f"[Engine] discovery stop error: {e}")
-
-        try:
-            self.tcp_server.stop()
-        except Exception as e:
-            print(f"[Engine] tcp stop error: {e}")
+            logger.warning("discovery stop error: %s", e)
 
-        for req_id, info in list(self.outgoing_file_requests.items()):
-            if info.get("is_zip"):
-                path = info.get("filepath")
-                if path and os.path.exists(path):
-                    try:
-                        os.remove(path)
-                    except OSError as e:
-                        print(f"[Engine] temp cleanup failed ({req_id}): {e}")
+        if self.tcp_server is not None:
+            try:
+                self.tcp_server.stop()
+            except Exception as e:
+                logger.warning("tcp stop error: %s", e)
+
+        for room_session in list(self._sessions.values()):
+            for req_id, info in list(room_session.outgoing_file_requests.items()):
+                if info.get("is_zip"):
+                    path = info.get("filepath")
+                    if path and os.path.exists(path):
+                        try:
+                            os.remove(path)
+                        except OSError as e:
+                            logger.warning("temp cleanup failed (%s): %s", req_id, e)
 
         # 수신 중이던 .part 임시파일 및 임시 폴더 정리
         temp_dirs = set()
-        for req_id, part_path in list(self.download_paths.items()):
-            if part_path and part_path.endswith(".part") and os.path.exists(part_path):
-                try:
-                    os.remove(part_path)
-                    print(f"[Engine] cleaned up .part file ({req_id}): {part_path}")
-                    temp_dirs.add(os.path.dirname(os.path.abspath(part_path)))
-                except OSError as e:
-                    print(f"[Engine] .part cleanup failed ({req_id}): {e}")
+        for room_session in list(self._sessions.values()):
+            for req_id, part_path in list(room_session.download_paths.items()):
+                if part_path and part_path.endswith(".part") and os.path.exists(part_path):
+                    try:
+                        os.remove(part_path)
+                        logger.info("cleaned up .part file (%s): %s", req_id, part_path)
+                        temp_dirs.add(os.path.dirname(os.path.abspath(part_path)))
+                    except OSError as e:
+                        logger.warning(".part cleanup failed (%s): %s", req_id, e)
         for temp_dir in temp_dirs:
             try:
                 os.rmdir(temp_dir)
             except OSError:
                 pass
-        print("[Engine] stopped")
+        logger.info("stopped")
 
     def _my_short_id(self) -> str:
         return PeerDiscovery.ip_short_id(self.discovery.local_ip)
 
-    def _broadcast_to_room(self, packet: dict) -> int:
-        """packet을 직렬화·암호화 후 동일 방의 모든 피어에게 전송하고 성공 수를 반환합니다."""
-        enc_data = self.security.encrypt(json.dumps(packet).encode("utf-8"))
-        success_count = 0
-        for info in self.discovery.get_active_peers().values():
-            if info.get("room_name") == self.room_name and P2PClient.send_data(info["ip"], info["tcp_port"], enc_data):
-                success_count += 1
-        return success_count
+    @staticmethod
+    def _frame_for(session: RoomSession, peer_info, sealed: bytes) -> bytes:
+        """방 ID를 이해하는 피어(디스커버리에 방 목록을 광고)에게는 방 ID를 붙여 수신측이 방별로 라우팅하게 함"""
+        if peer_info.get("rooms") is not None:
+            return frame_for_room(session.room_id, sealed)
+        return sealed
+
+    @staticmethod
+    def _seal(session: RoomSession, peer_info, raw: bytes) -> bytes:
+        """직렬화된 패킷을 피어와 합의된 코덱으로 (이득이 있으면) 압축한 뒤 방 키로 암호화"""
+        return P2PEngine._seal_with(session, raw, compression.choose_codec(peer_info.get("codecs")))
+
+    @staticmethod
+    def _seal_with(session: RoomSession, raw: bytes, codec: Optional[str]) -> bytes:
+        started = time.perf_counter()
+        packed = compression.pack_payload(raw, codec)
+        packed_at = time.perf_counter()
+        sealed = session.security.encrypt(packed)
+        if codec is not None:
+            CODEC_SECONDS.observe(packed_at - started, "compress")
+        CODEC_SECONDS.observe(time.perf_counter() - packed_at, "encrypt")
+        return sealed
+
+    @staticmethod
+    def _count_sent(packet_type: str, raw_size: int, frame_size: int):
+        FRAMES_SENT.inc(packet_type)
+        PAYLOAD_BYTES.inc("sent", amount=raw_size)
+        FRAME_BYTES.inc("sent", amount=frame_size)
+
+    def _send_packet(self, session: RoomSession, peer_info, packet: dict, peer_id: str = "") -> bool:
+        """피어 1명에게 패킷을 바로 전송. peer_id를 주면 응답 없는 피어는 연결 시도 없이 실패하고 결과를 생존 신호로 기록"""
+        if peer_id and self.liveness.is_suspect(peer_id):
+            return False
+        raw = json.dumps(packet).encode("utf-8")
+        frame = self._frame_for(session, peer_info, self._seal(session, peer_info, raw))
+        self._count_sent(packet.get("type", ""), len(raw), len(frame))
+        ok = P2PClient.send_data(peer_info["ip"], peer_info["tcp_port"], frame)
+        if peer_id:
+            self._on_send_result(peer_id, ok)
+        return ok
+
+    def _resolve_peer(self, peer_id: str):
+        """송신 큐가 전송 직전에 조회하는 피어의 현재 주소(경로가 바뀌었을 수 있음). 응답 없는 피어는 None (즉시 실패)"""
+        info = self.discovery.get_peer(peer_id)
+        if info is None or self.liveness.is_suspect(peer_id):
+            return None
+        return info["ip"], info["tcp_port"], bool(info.get("batch"))
+
+    def _on_send_result(self, peer_id: str, ok: bool):
+        if ok:
+            self.liveness.record_alive(peer_id)
+        else:
+            self.liveness.record_failure(peer_id)
+
+    def _liveness_targets(self):
+        """생존을 확인할 피어 {session_id: (ip, tcp_port)} — 내가 참여 중인 방의 피어만"""
+        targets = {}
+        for room_name in list(self.joined):
+            for sid, info in self.discovery.get_room_peers(room_name).items():
+                if info.get("tcp_port"):
+                    targets[sid] = (info["ip"], info["tcp_port"])
+        return targets
+
+    def _needs_liveness_check(self, peer_id: str) -> bool:
+        """보낼 것이 밀려 있거나, 디스커버리 신호가 끊겨 만료 시간의 절반 이상이 지난 피어만 짧은 주기로 확인"""
+        if self.outbox.pending_bytes(peer_id) or self.send_queue.queued_bytes(peer_id):
+            return True
+        lease = self.discovery.registry.lease(peer_id)
+        return lease is not None and lease[0] - time.time() < lease[1] * LIVENESS_EXPIRY_FRACTION
+
+    def _on_peer_suspect(self, peer_id: str, suspect: bool):
+        if not suspect:
+            self.outbox.retry_peer(peer_id)
+        if self.on_peer_liveness:
+            self.on_peer_liveness(peer_id, suspect)
+
+    def _on_peer_dead(self, peer_id: str):
+        # 디스커버리 만료(최대 수십 초)를 기다리지 않고 제거 → leave 이벤트로 남은 전송/재전송도 정리됨.
+        # UDP 알림이 계속 와도 TCP 접촉에 성공할 때까지는 다시 join시키지 않음 (_record_contact, _probe_suppressed)
+        self.discovery.evict(peer_id)
+
+    def _record_contact(self, peer_id: str):
+        """피어에게서 트래픽을 받음 — 생존 신호로 기록하고, TCP 확인 실패로 제거했던 피어면 다시 목록에 올림"""
+        if peer_id and self.discovery.is_suppressed(peer_id):
+            logger.info("peer %s reached us over TCP, readmitting", peer_id)
+            self.discovery.readmit(peer_id)
+        self.liveness.record_alive(peer_id)
+
+    def _probe_suppressed(self):
+        """TCP 확인 실패로 보류 중이지만 알림은 계속 보내는 피어에게 다시 연결해 보고, 응답하면 목록에 복귀"""
+        peers = self.discovery.suppressed_peers()
+        if not peers or (self._readmit_thread is not None and self._readmit_thread.is_alive()):
+            return
+        self._readmit_thread = threading.Thread(target=self._readmit_reachable, args=(peers,), name="readmit-probe",
+                                                daemon=True)
+        self._readmit_thread.start()
+
+    def _readmit_reachable(self, peers):
+        for peer_id, (ip, port) in peers.items():
+            if not self._running:
+                return
+            if P2PClient.probe(ip, port, HEARTBEAT_TIMEOUT):
+                logger.info("peer %s answers TCP again, readmitting", peer_id)
+                self.discovery.readmit(peer_id)
+
+    def _transmit(self, peer_id: str, data: bytes, done):
+        """재전송 큐의 전송 함수 — 피어 송신 큐에 넣고 바로 반환 (결과는 done으로 통지)"""
+        self.send_queue.submit(peer_id, data, done)
+
+    def _on_backpressure(self, peer_id: str, congested: bool):
+        if congested:
+            logger.warning("send queue backed up for peer %s", peer_id)
+        if self.on_peer_backpressure:
+            self.on_peer_backpressure(peer_id, congested)
+
+    def _frames_for(self, session: RoomSession, targets, packet: dict) -> list:
+        """[(session_id, info)] 각각에 보낼 (peer_id, 프레임, ACK 대기 여부) 목록. 압축·암호화는 코덱별로 한 번만 수행"""
+        if not targets:
+            return []
+        raw = json.dumps(packet).encode("utf-8")
+        sealed_by_codec = {}
+        frames = []
+        for sid, info in targets:
+            codec = compression.choose_codec(info.get("codecs"))
+            sealed = sealed_by_codec.get(codec)
+            if sealed is None:
+                sealed = sealed_by_codec[codec] = self._seal_with(session, raw, codec)
+            frame = self._frame_for(session, info, sealed)
+            self._count_sent(packet.get("type", ""), len(raw), len(frame))
+            frames.append((sid, frame, bool(info.get("acks"))))
+        return frames
+
+    def _broadcast_to_room(self, session: RoomSession, packet) -> int:
+        """packet을 직렬화·암호화 후 session 방의 피어들에게 보내고 전송 대상 수를 반환합니다.
+
+        각 피어에게는 ACK가 올 때까지 재전송하며, 결과는 on_delivery_state로 알립니다.
+        중계 모드에서는 중계 피어 중 fanout명에게만 보내고 나머지는 그들이 전달합니다.
+        """
+        started = time.perf_counter()
+        if isinstance(packet, MessageRecord):
+            packet = packet.to_wire()
+        direct, gossip = split_targets(self.discovery.get_room_peers(session.room_name), self.relay_fanout)
+        frames = self._frames_for(session, direct, packet)
+        if gossip:
+            relayed = dict(packet)
+            relayed[RELAY_TTL_FIELD] = self.relay_ttl
+            relayed[RELAY_FANOUT_FIELD] = self.relay_fanout
+            relayed[RELAY_FROM_FIELD] = self.discovery.session_id
+            frames += self._frames_for(session, gossip, relayed)
+        self.outbox.submit(session.room_name, packet["msg_id"], frames)
+        BROADCAST_SECONDS.observe(time.perf_counter() - started)
+        BROADCAST_TARGETS.observe(len(frames))
+        return len(frames)
+
+    def _relay_packet(self, session: RoomSession, packet: dict, ttl: int, fanout: int, came_from: str):
+        """처음 받은 중계 메시지를 다른 중계 피어에게 전달 (중복은 msg_id dedup이 걸러내므로 루프 없음)"""
+        exclude = {packet.get("sender_session"), came_from}
+        targets = relay_targets(self.discovery.get_room_peers(session.room_name), fanout, exclude)
+        if not targets:
+            return
+        relayed = dict(packet)
+        relayed[RELAY_TTL_FIELD] = ttl
+        relayed[RELAY_FANOUT_FIELD] = fanout
+        relayed[RELAY_FROM_FIELD] = self.discovery.session_id
+        self.outbox.submit(session.room_name, packet["msg_id"], self._frames_for(session, targets, relayed), notify=False)
+
+    def delivery_state(self, msg_id: str):
+        """내가 보낸 메시지의 (delivered, total, state). 추적 기록이 없으면 None"""
+        return self.outbox.state(msg_id)
+
+    def get_compression_stats(self) -> dict:
+        """송신측 압축 누적 통계 (frames, compressed, bytes_in, bytes_out, bytes_saved, ratio)"""
+        return compression.stats.snapshot()
+
+    @staticmethod
+    def get_metrics() -> dict:
+        """프로세스 전체 계측 스냅샷 {ts, uptime, metrics: {이름: 값}} (metrics.MetricsRegistry.snapshot 참고)"""
+        return metrics.snapshot()
+
+    def _on_delivery_state(self, room_name: str, msg_id: str, delivered: int, total: int, state: str):
+        if self.on_delivery_state:
+            self.on_delivery_state(room_name, msg_id, delivered, total, state)
+
+    def _queue_ack(self, session: RoomSession, peer_id: str, msg_id: str):
+        """받은 메시지의 ACK를 ACK_BATCH_DELAY 동안 모았다가 직전 홉 피어에게 한 번에 전송"""
+        peer_info = self.discovery.get_peer(peer_id)
+        if peer_info is None or not peer_info.get("acks"):
+            return  # 구버전 피어는 ACK를 이해하지 못함
+        key = (session.room_name, peer_id)
+        with self._ack_lock:
+            batch = self._ack_batches.get(key)
+            if batch is not None:
+                batch.append(msg_id)
+                return
+            self._ack_batches[key] = [msg_id]
+        timer = threading.Timer(ACK_BATCH_DELAY, self._flush_acks, args=(key,))
+        timer.daemon = True
+        timer.start()
+
+    def _flush_acks(self, key):
+        with self._ack_lock:
+            msg_ids = self._ack_batches.pop(key, None)
+        room_name, peer_id = key
+        session = self.joined.get(room_name)
+        peer_info = self.discovery.get_peer(peer_id)
+        if not msg_ids or session is None or peer_info is None:
+            return
+        packet = {"type": "ACK", "msg_ids": msg_ids, "sender_session": self.discovery.session_id}
+        raw = json.dumps(packet).encode("utf-8")
+        frame = self._frame_for(session, peer_info, self._seal(session, peer_info, raw))
+        self._count_sent("ACK", len(raw), len(frame))
+        # 같은 피어에게 보낼 메시지와 함께 한 연결로 묶일 수 있도록 송신 큐를 거침
+        self.send_queue.submit(peer_id, frame)
 
     def send_chat_message(self, target_session_id: str, message: str) -> bool:
-        peers = self.discovery.get_active_peers()
-        if target_session_id not in peers:
-            print(f"[Engine] peer not found: {target_session_id}")
+        session = self._require_session()
+        target = self.discovery.get_peer(target_session_id)
+        if target is None:
+            logger.warning("peer not found: %s", target_session_id)
             return False
 
-        target = peers[target_session_id]
-        packet = self.history_mgr.add_local_message(
+        packet = session.history_mgr.add_local_message(
             sender_nickname=self.nickname,
             content=message,
             extra={"sender_short_id": self._my_short_id()},
         )
-        raw_data = json.dumps(packet).encode("utf-8")
-        encrypted_data = self.security.encrypt(raw_data)
-        return P2PClient.send_data(target["ip"], target["tcp_port"], encrypted_data)
+        frames = self._frames_for(session, [(target_session_id, target)], packet.to_wire())
+        return self.outbox.submit(session.room_name, packet.msg_id, frames) > 0
 
-    def broadcast_chat_message(self, message: str) -> bool:
-        packet = self.history_mgr.add_local_message(
+    def create_chat_message(self, message: str, room_name: Optional[str] = None) -> MessageRecord:
+        """채팅 메시지를 room_name 방(기본: 현재 방)의 로컬 히스토리에 기록하고 레코드를 반환합니다 (전송은 broadcast_record)."""
+        return self._require_session(room_name).history_mgr.add_local_message(
             sender_nickname=self.nickname,
             content=message,
             extra={"sender_short_id": self._my_short_id()},
         )
-        return self._broadcast_to_room(packet) > 0
 
-    def broadcast_file_request(self, paths: list[str], speed_limit_bytes: int = 0) -> tuple[bool, dict, str]:
+    def broadcast_record(self, record: MessageRecord, room_name: Optional[str] = None) -> bool:
+        """record를 room_name 방(기본: 현재 방)에 전송. 생성 후 방을 옮겼어도 원래 방으로 보내도록 호출자가 지정"""
+        session = self._sessions.get(room_name) if room_name is not None else self.session
+        if session is None:
+            return False
+        return self._broadcast_to_room(session, record) > 0
+
+    def broadcast_chat_message(self, message: str, room_name: Optional[str] = None) -> bool:
+        return self.broadcast_record(self.create_chat_message(message, room_name), room_name)
+
+    def get_transfer_status(self, req_id: Optional[str] = None):
+        """전송 상태 조회. req_id를 주면 그 전송 1건(없으면 None), 아니면 최근 전송 목록.
+
+        다운로드: {"direction": "download", "room", "name", "size", "path", "state", "bytes"[, "error"]}
+          state: accepted → receiving → completed | failed
+        업로드: {"direction": "upload", "room", "name", "size", "state", "peers": {session_id: sending|completed|failed}}
+          state: offered | canceled
+        """
+        with self._transfer_lock:
+            if req_id is not None:
+                entry = self._transfers.get(req_id)
+                return self._copy_transfer(req_id, entry) if entry is not None else None
+            return [self._copy_transfer(rid, entry) for rid, entry in self._transfers.items()]
+
+    @staticmethod
+    def _copy_transfer(req_id: str, entry: dict) -> dict:
+        copied = dict(entry, req_id=req_id)
+        if "peers" in copied:
+            copied["peers"] = dict(copied["peers"])
+        return copied
+
+    def _update_transfer(self, req_id: str, peer_id: Optional[str] = None, **fields):
+        """전송 상태 갱신 (없으면 생성). peer_id를 주면 업로드의 피어별 상태를 fields["state"]로 기록"""
+        with self._transfer_lock:
+            entry = self._transfers.get(req_id)
+            if entry is None:
+                entry = self._transfers[req_id] = {}
+                while len(self._transfers) > MAX_TRANSFER_HISTORY:
+                    del self._transfers[next(iter(self._transfers))]
+            if peer_id is not None:
+                entry.setdefault("peers", {})[peer_id] = fields["state"]
+            else:
+                entry.update(fields)
+
+    def search_history(self, query: str, limit: int = 50, room_name: Optional[str] = None) -> list[MessageRecord]:
+        session = self.session if room_name is None else self.joined.get(room_name)
+        return session.history_mgr.search(query, limit) if session is not None else []
+
+    def get_history(self, room_name: Optional[str] = None, limit: Optional[int] = None) -> list[MessageRecord]:
+        """room_name 방(기본: 현재 방)의 기록을 시간순으로. limit이 있으면 최근 limit건"""
+        session = self.session if room_name is None else self.joined.get(room_name)
+        if session is None:
+            return []
+        records = session.history_mgr.get_history_snapshot()
+        return records[-limit:] if limit else records
+
+    def broadcast_file_request(self, paths: list[str], speed_limit_bytes: int = 0,
+                               room_name: Optional[str] = None, origin_sha256: str = "") -> tuple[bool, dict, str]:
+        """파일 공유 요청을 방에 알립니다. origin_sha256은 받은 파일을 다시 공유할 때 원본 요청의 해시
+        (폴더는 다시 압축하면 해시가 달라지므로 재공유 노드끼리 같은 파일임을 알아보는 데 사용)"""
+        session = self._require_session(room_name)
         req_id = str(uuid.uuid4())
         meta = FileManager.prepare_transfer(paths, f"temp_{req_id}.zip")
         file_sha256 = FileManager.sha256_file(meta["target_path"])
 
-        self.outgoing_file_requests[req_id] = {
+        session.outgoing_file_requests[req_id] = {
             "filepath": meta["target_path"],
             "is_zip": meta["is_zip"],
             "speed_limit": speed_limit_bytes,
@@ -160,27 +714,41 @@ class P2PEngine:
             "file_sha256": file_sha256,
             "sender_short_id": self._my_short_id(),
         }
-        packet = self.history_mgr.add_local_message(
+        if origin_sha256:
+            extra_info["origin_sha256"] = origin_sha256
+        packet = session.history_mgr.add_local_message(
             sender_nickname=self.nickname,
             content=f"File share: {meta['name']}",
             msg_type="FILE_REQ",
             extra=extra_info,
         )
+        session.outgoing_file_requests[req_id]["msg_id"] = packet.msg_id
+        self._update_transfer(req_id, direction="upload", room=session.room_name, name=meta["name"],
+                              size=meta["size"], state="offered", peers={})
 
-        return self._broadcast_to_room(packet) > 0, meta, req_id
+        return self._broadcast_to_room(session, packet) > 0, meta, req_id
 
-    def cancel_file_sharing(self, req_id: str):
-        if req_id in self.outgoing_file_requests:
-            info = self.outgoing_file_requests.pop(req_id)
+    def cancel_file_sharing(self, req_id: str, room_name: Optional[str] = None) -> bool:
+        session = self.session if room_name is None else self.joined.get(room_name)
+        if session is None:
+            return False
+        known = req_id in session.outgoing_file_requests
+        self._cancel_file_sharing(session, req_id)
+        return known
+
+    def _cancel_file_sharing(self, session: RoomSession, req_id: str):
+        if req_id in session.outgoing_file_requests:
+            self._update_transfer(req_id, state="canceled")
+            info = session.outgoing_file_requests.pop(req_id)
             if info.get("is_zip"):
                 file_path = info.get("filepath")
                 if file_path and os.path.exists(file_path):
                     try:
                         os.remove(file_path)
                     except OSError as e:
-                        print(f"[Engine] cancel cleanup failed ({req_id}): {e}")
+                        logger.warning("cancel cleanup failed (%s): %s", req_id, e)
 
-        packet = self.history_mgr.add_local_message(
+        packet = session.history_mgr.add_local_message(
             sender_nickname=self.nickname,
             content="File sharing canceled.",
             msg_type="FILE_CANCEL",
@@ -190,245 +758,543 @@ class P2PEngine:
             },
         )
 
-        self._broadcast_to_room(packet)
+        self._broadcast_to_room(session, packet)
 
-    def accept_file_transfer(self, req_id: str, save_path: str) -> bool:
-        if req_id not in self.active_file_requests:
+    def accept_file_transfer(self, req_id: str, save_path: str, room_name: Optional[str] = None) -> bool:
+        session = self.session if room_name is None else self.joined.get(room_name)
+        if session is None or req_id not in session.active_file_requests:
             return False
 
-        req_info = self.active_file_requests[req_id]
-        sender_session = req_info.get("sender_session")
-        peers = self.discovery.get_active_peers()
-        if sender_session not in peers:
+        req_info = session.active_file_requests[req_id]
+        target = self.discovery.get_peer(req_info.sender_session)
+        if target is None:
             return False
 
-        self.download_paths[req_id] = save_path
-        target = peers[sender_session]
+        session.download_paths[req_id] = save_path
+        self._update_transfer(req_id, direction="download", room=session.room_name, name=req_info.get("file_name", ""),
+                              size=req_info.get("file_size"), path=save_path, state="accepted", bytes=0)
 
         packet = {"type": "FILE_ACCEPT", "req_id": req_id, "sender_session": self.discovery.session_id}
-        enc_data = self.security.encrypt(json.dumps(packet).encode("utf-8"))
-        return P2PClient.send_data(target["ip"], target["tcp_port"], enc_data)
-
-    def reject_file_transfer(self, req_id: str):
-        if req_id in self.active_file_requests:
-            del self.active_file_requests[req_id]
+        if not self._send_packet(session, target, packet, peer_id=req_info.sender_session):
+            self._update_transfer(req_id, state="failed", error="sender unreachable")
+            return False
+        return True
+
+    def reject_file_transfer(self, req_id: str, room_name: Optional[str] = None) -> bool:
+        if room_name is not None:
+            session = self.joined.get(room_name)
+        else:
+            # 방을 지정하지 않으면 보고 있는 방부터 그 요청을 받은 방을 찾음 (다른 방으로 전환한 뒤 거절하는 경우)
+            candidates = [self.session] + list(self.joined.values())
+            session = next((s for s in candidates if s is not None and req_id in s.active_file_requests), None)
+        if session is None or req_id not in session.active_file_requests:
+            return False
+        del session.active_file_requests[req_id]
+        return True
 
     def _recv_exact(self, sock, count):
-        buf = b""
-        while count > 0:
-            newbuf = sock.recv(count)
-            if not newbuf:
+        # 미리 할당한 버퍼에 바로 받아 큰 프레임에서도 재할당/복사가 반복되지 않게 함
+        buf = bytearray(count)
+        view = memoryview(buf)
+        received = 0
+        while received < count:
+            n = sock.recv_into(view[received:], count - received)
+            if not n:
                 return None
-            buf += newbuf
-            count -= len(newbuf)
-        return buf
+            received += n
+        view.release()
+        return bytes(buf)
+
+    def _session_for_frame(self, data: bytes, addr):
+        """첫 프레임의 방 ID로 참여 중인 방 세션을 찾습니다. 반환: (session 또는 None, 본문)"""
+        room_id, body = split_room_frame(data)
+        if room_id is not None:
+            return self._joined_by_id.get(room_id), body
+        # 방 ID가 없는 구버전 피어: 그 IP가 광고한 방 중 내가 참여 중인 방, 없으면 보고 있는 방
+        for info in self.discovery.registry.at_ip(addr[0]).values():
+            session = self.joined.get(info.get("room_name"))
+            if session is not None:
+                return session, body
+        return self.session, body
 
     def _handle_incoming_tcp(self, client_sock, addr):
+        held = 0  # 이 연결이 inbound_budget에서 빌린 바이트 수
+        handed_off = False  # 파일 수신 스레드로 넘긴 연결은 그쪽에서 닫음
         try:
             client_sock.settimeout(10.0)
-
-            length_bytes = self._recv_exact(client_sock, 4)
-            if not length_bytes:
-                return
-            msg_len = struct.unpack("!I", length_bytes)[0]
-            if msg_len > MAX_PACKET_SIZE:
-                print(f"[Engine] packet too large ({msg_len} bytes), closing connection from {addr}")
-                client_sock.close()
-                return
-
-            first_packet = self._recv_exact(client_sock, msg_len)
-            if not first_packet:
-                return
-
-            decrypted_data = self.security.decrypt(first_packet)
-            packet = json.loads(decrypted_data.decode("utf-8"))
-            packet_type = packet.get("type")
-
-            if packet_type in ("MESSAGE", "FILE_REQ", "FILE_CANCEL", "FILE_DOWNLOADED"):
-                is_new = self.history_mgr.receive_remote_message(packet)
-                if is_new:
-                    if packet_type == "FILE_REQ":
-                        req_id = packet.get("req_id")
-                        if req_id:
-                            self.active_file_requests[req_id] = packet
-                    if self.on_message_received:
-                        self.on_message_received(packet)
-
-            elif packet_type == "CHAT_HISTORY":
-                messages = packet.get("messages", [])
-                new_messages = []
-                for msg in messages:
-                    if self.history_mgr.receive_remote_message(msg):
-                        new_messages.append(msg)
-                if new_messages and self.on_chat_history_received:
-                    self.on_chat_history_received(new_messages)
-                print(f"[Engine] chat history received: total={len(messages)}, new={len(new_messages)}")
-
-            elif packet_type == "FILE_ACCEPT":
-                req_id = packet.get("req_id")
-                if req_id not in self.outgoing_file_requests:
+            # 들어온 연결 자체가 그 IP 피어의 생존 신호 (생존 확인 연결은 프레임 없이 바로 닫힘).
+            # 한 IP에 여러 세션이 있으면 누가 보냈는지 알 수 없으므로 패킷의 발신 정보로만 판단
+            ip_peers = self.discovery.registry.at_ip(addr[0])
+            if len(ip_peers) == 1:
+                self.liveness.record_alive(next(iter(ip_peers)))
+
+            # 새 버전 피어는 작은 프레임 여러 개를 한 연결에 이어 보내므로 연결이 닫힐 때까지 프레임 단위로 처리
+            while True:
+                self.inbound_budget.release(held)
+                held = 0
+                length_bytes = self._recv_exact(client_sock, 4)
+                if not length_bytes:
                     return
-
-                out_info = self.outgoing_file_requests[req_id]
-                sender_session = packet.get("sender_session")
-                peers = self.discovery.get_active_peers()
-                target_info = peers.get(sender_session)
-                if not target_info:
-                    print(f"[Engine] file accept peer not found: {sender_session}")
+                msg_len = struct.unpack("!I", length_bytes)[0]
+                if msg_len > MAX_PACKET_SIZE:
+                    logger.warning("packet too large (%s bytes), closing connection from %s", msg_len, addr)
+                    client_sock.close()
                     return
-
-                target_ip = target_info["ip"]
-                target_port = target_info["tcp_port"]
-
-                def send_task():
-                    throttler = BandwidthThrottler(out_info.get("speed_limit", 0))
-                    success = P2PClient.send_file_stream(
-                        target_ip,
-                        target_port,
-                        out_info["filepath"],
-                        req_id,
-                        self.security,
-                        throttler,
-                        expected_size=out_info.get("file_size"),
-                        expected_sha256=out_info.get("file_sha256"),
-                    )
-                    if success:
-                        active_peers = self.discovery.get_active_peers()
-                        dl_nickname = active_peers.get(sender_session, {}).get("nickname", "Unknown")
-                        dl_short_id = PeerDiscovery.ip_short_id(target_ip)
-                        dl_packet = self.history_mgr.add_local_message(
-                            sender_nickname=self.nickname,
-                            content=f"Downloaded: {req_id}",
-                            msg_type="FILE_DOWNLOADED",
-                            extra={
-                                "req_id": req_id,
-                                "downloader_nickname": dl_nickname,
-                                "downloader_short_id": dl_short_id,
-                                "sender_short_id": self._my_short_id(),
-                            },
-                        )
-                        self._broadcast_to_room(dl_packet)
-                        if self.on_message_received:
-                            self.on_message_received(dl_packet)
-
-                threading.Thread(target=send_task, daemon=True).start()
-
-            elif packet_type == "FILE_STREAM_START":
-                client_sock.settimeout(None)
-                req_id = packet.get("req_id")
-                if not req_id:
-                    print("[Engine] invalid FILE_STREAM_START: missing req_id")
+                if not self.inbound_budget.acquire(msg_len):
+                    logger.warning("inbound buffer budget exhausted, dropping connection from %s", addr)
                     return
+                held = msg_len
 
-                if req_id not in self.download_paths or req_id not in self.active_file_requests:
-                    print(f"[Engine] rejected FILE_STREAM_START (not accepted): {req_id}")
+                frame = self._recv_exact(client_sock, msg_len)
+                if not frame:
                     return
 
-                req_info = self.active_file_requests[req_id]
-                sender_session = req_info.get("sender_session")
-                peers = self.discovery.get_active_peers()
-                sender_peer = peers.get(sender_session)
-                if not sender_peer or sender_peer.get("ip") != addr[0]:
-                    print(f"[Engine] rejected FILE_STREAM_START (sender mismatch): {req_id}")
+                # 프레임마다 방을 찾음. 파일 스트림은 헤더 프레임의 방 세션으로 후속 청크까지 복호화
+                session, frame = self._session_for_frame(frame, addr)
+                if session is None:
+                    logger.debug("dropped frame for a room we are not in (%s)", addr)
                     return
 
-                save_path = self.download_paths[req_id]
-                is_zip = bool(req_info.get("is_zip", False))
-                expected_size = req_info.get("file_size", packet.get("expected_size"))
-                expected_sha256 = (req_info.get("file_sha256") or packet.get("expected_sha256") or "").lower()
-
-                save_dir = os.path.dirname(os.path.abspath(save_path))
-                os.makedirs(save_dir, exist_ok=True)
-
-                bytes_received = 0
-                hasher = hashlib.sha256()
-                try:
-                    with open(save_path, "wb") as f:
-                        while True:
-                            chunk_len_bytes = self._recv_exact(client_sock, 4)
-                            if not chunk_len_bytes:
-                                break
-                            chunk_len = struct.unpack("!I", chunk_len_bytes)[0]
-                            if chunk_len <= 0:
-                                raise ValueError(f"Invalid chunk length: {chunk_len}")
-                            if chunk_len > MAX_PACKET_SIZE:
-                                raise ValueError(f"Chunk too large: {chunk_len} bytes")
-
-                            enc_chunk = self._recv_exact(client_sock, chunk_len)
-                            if not enc_chunk:
-                                raise ValueError("Incomplete chunk payload.")
-
-                            raw_chunk = self.security.decrypt(enc_chunk)
-                            f.write(raw_chunk)
-                            bytes_received += len(raw_chunk)
-                            hasher.update(raw_chunk)
-
-                    if expected_size is not None and bytes_received != int(expected_size):
-                        raise ValueError(f"Size mismatch (expected={expected_size}, actual={bytes_received})")
-
-                    actual_sha256 = hasher.hexdigest().lower()
-                    if expected_sha256 and actual_sha256 != expected_sha256:
-                        raise ValueError("SHA-256 mismatch for received file stream.")
-
-                    if is_zip:
-                        extract_dir = save_path + "_extracted"
-                        FileManager.extract_zip(save_path, extract_dir)
-                        final_path = extract_dir
-                    else:
-                        final_path = save_path
-
-                    print(f"[Engine] file receive completed: {final_path}")
-                    if self.on_file_transfer_completed:
-                        self.on_file_transfer_completed(req_id, final_path)
-                except Exception as e:
-                    print(f"[Engine] file stream validation failed ({req_id}): {e}")
+                started = time.perf_counter()
+                opened = session.security.decrypt(frame)
+                decrypted_at = time.perf_counter()
+                decrypted_data = compression.unpack_payload(opened)
+                CODEC_SECONDS.observe(decrypted_at - started, "decrypt")
+                if decrypted_data is not opened:
+                    CODEC_SECONDS.observe(time.perf_counter() - decrypted_at, "decompress")
+                packet = json.loads(decrypted_data.decode("utf-8"))
+                if not isinstance(packet, dict):
+                    logger.warning("rejected non-object frame from %s", addr)
+                    continue
+                packet_type = packet.get("type")
+                FRAMES_RECEIVED.inc(packet_type)
+                FRAME_BYTES.inc("received", amount=msg_len + 4)
+                PAYLOAD_BYTES.inc("received", amount=len(decrypted_data))
+
+                if packet_type in ("MESSAGE", "FILE_REQ", "FILE_CANCEL", "FILE_DOWNLOADED"):
+                    # 중계 필드는 전송용이므로 기록에 남기지 않음
+                    relay_ttl = packet.pop(RELAY_TTL_FIELD, 0)
+                    relay_fanout = packet.pop(RELAY_FANOUT_FIELD, self.relay_fanout)
+                    relay_from = packet.pop(RELAY_FROM_FIELD, "")
+                    try:
+                        record = MessageRecord.from_wire(packet)
+                    except ValueError as e:
+                        # 이 프레임만 버리고 같은 연결의 다음 프레임은 계속 처리
+                        logger.warning("rejected malformed %s from %s: %s", packet_type, addr, e)
+                        continue
+                    if not isinstance(relay_from, str):
+                        relay_from = ""
+                    if isinstance(relay_fanout, bool) or not isinstance(relay_fanout, int):
+                        relay_fanout = self.relay_fanout
+                    self._record_contact(relay_from or record.sender_session)
+                    with session.dispatch_lock:
+                        is_new, delivered = session.history_mgr.offer_remote_message(record)
+                        self._queue_dispatch(session, delivered)
+                    # 중복 수신이어도 ACK — 발신측이 앞선 ACK를 못 받아 재전송한 경우
+                    self._queue_ack(session, relay_from or record.sender_session, record.msg_id)
+                    if is_new and self.discovery.relay and isinstance(relay_ttl, int) and relay_ttl > 0:
+                        # 화면 표시보다 먼저 전달하여 방 전체로 퍼지는 시간을 줄임
+                        fanout = max(1, min(int(relay_fanout), MAX_RELAY_FANOUT))
+                        self._relay_packet(session, packet, min(relay_ttl, MAX_RELAY_TTL) - 1, fanout, relay_from)
+                    self._drain_dispatch(session)
+
+                elif packet_type == "CHAT_HISTORY":
+                    messages = packet.get("messages")
+                    messages = ChatHistoryManager.expand_wire_snapshot(messages if isinstance(messages, list) else [])
+                    records = []
+                    for msg in messages:
+                        try:
+                            records.append(MessageRecord.from_wire(msg))
+                        except ValueError as e:
+                            logger.warning("skipped malformed history entry from %s: %s", addr, e)
+                    new_messages = []
+                    with session.dispatch_lock:
+                        for record in records:
+                            new_messages.extend(session.history_mgr.receive_remote_message(record))
+                        self._queue_dispatch(session, new_messages, synced=True)
+                    self._drain_dispatch(session)
+                    logger.debug("chat history received: total=%s, new=%s", len(messages), len(new_messages))
+
+                elif packet_type == "ACK":
+                    msg_ids = packet.get("msg_ids")
+                    acker = packet.get("sender_session")
+                    if not isinstance(acker, str):
+                        logger.warning("rejected malformed ACK from %s", addr)
+                        continue
+                    self._record_contact(acker)
+                    if isinstance(msg_ids, list):
+                        self.outbox.ack(acker, [msg_id for msg_id in msg_ids if isinstance(msg_id, str)])
+
+                elif packet_type == "FILE_ACCEPT":
+                    req_id = packet.get("req_id")
+                    if req_id not in session.outgoing_file_requests:
+                        return
+
+                    out_info = session.outgoing_file_requests[req_id]
+                    sender_session = packet.get("sender_session")
+                    target_info = self.discovery.get_peer(sender_session)
+                    if not target_info:
+                        logger.warning("file accept peer not found: %s", sender_session)
+                        return
+
+                    target_ip = target_info["ip"]
+                    target_port = target_info["tcp_port"]
+                    frame_prefix = self._frame_for(session, target_info, b"")
+                    chunk_codec = compression.choose_codec(target_info.get("codecs"))
+
+                    def send_task():
+                        self._update_transfer(req_id, peer_id=sender_session, state="sending")
+                        throttler = BandwidthThrottler(out_info.get("speed_limit", 0))
+                        started = time.perf_counter()
+                        success = P2PClient.send_file_stream(
+                            target_ip,
+                            target_port,
+                            out_info["filepath"],
+                            req_id,
+                            session.security,
+                            throttler,
+                            expected_size=out_info.get("file_size"),
+                            expected_sha256=out_info.get("file_sha256"),
+                            frame_prefix=frame_prefix,
+                            chunk_codec=chunk_codec,
+                        )
+                        self._update_transfer(req_id, peer_id=sender_session, state="completed" if success else "failed")
+                        if success:
+                            _record_transfer("upload", out_info.get("file_size") or 0, time.perf_counter() - started)
+                            dl_nickname = (self.discovery.get_peer(sender_session) or {}).get("nickname", "Unknown")
+                            dl_short_id = PeerDiscovery.ip_short_id(target_ip)
+                            dl_packet = session.history_mgr.add_local_message(
+                                sender_nickname=self.nickname,
+                                content=f"Downloaded: {req_id}",
+                                msg_type="FILE_DOWNLOADED",
+                                extra={
+                                    "req_id": req_id,
+                                    "downloader_nickname": dl_nickname,
+                                    "downloader_short_id": dl_short_id,
+                                    "sender_short_id": self._my_short_id(),
+                                },
+                            )
+                            self._broadcast_to_room(session, dl_packet)
+                            if self.on_message_received and session is self.session:
+                                self.on_message_received(dl_packet)
+
+                    threading.Thread(target=send_task, daemon=True).start()
+
+                elif packet_type == "FILE_STREAM_START":
+                    req_id = packet.get("req_id")
+                    if not req_id:
+                        logger.warning("invalid FILE_STREAM_START: missing req_id")
+                        return
+
+                    if req_id not in session.download_paths or req_id not in session.active_file_requests:
+                        logger.warning("rejected FILE_STREAM_START (not accepted): %s", req_id)
+                        return
+
+                    req_info = session.active_file_requests[req_id]
+                    sender_peer = self.discovery.get_peer(req_info.sender_session)
+                    if not sender_peer or sender_peer.get("ip") != addr[0]:
+                        logger.warning("rejected FILE_STREAM_START (sender mismatch): %s", req_id)
+                        return
+
+                    save_path = session.download_paths[req_id]
+                    is_zip = bool(req_info.get("is_zip", False))
+                    expected_size = req_info.get("file_size", packet.get("expected_size"))
+                    expected_sha256 = (req_info.get("file_sha256") or packet.get("expected_sha256") or "").lower()
+                    # 송신측이 청크 압축을 알린 경우 모든 청크 앞에 코덱 플래그가 붙어 있음
+                    chunk_codec = packet.get("chunk_codec")
+                    if chunk_codec and chunk_codec not in compression.SUPPORTED_CODECS:
+                        logger.warning("rejected FILE_STREAM_START (unsupported codec %s): %s", chunk_codec, req_id)
+                        return
+
+                    # 파일 스트림은 연결 처리 워커를 점유하지 않도록 별도 수신 스레드로 넘김 (동시 수신 수 제한)
+                    if not self._download_slots.acquire(blocking=False):
+                        logger.warning("rejected FILE_STREAM_START (too many concurrent downloads): %s", req_id)
+                        return
+                    args = (client_sock, session, req_id, save_path, is_zip, expected_size, expected_sha256, chunk_codec)
                     try:
-                        if os.path.isdir(save_path):
-                            import shutil
+                        threading.Thread(target=self._file_stream_task, args=args, name="file-receive", daemon=True).start()
+                    except RuntimeError:
+                        self._download_slots.release()
+                        raise
+                    handed_off = True
+                    return
+
+                if packet_type not in BATCHABLE_PACKET_TYPES:
+                    return  # 파일 전송 등은 연결 하나를 단독으로 사용
 
-                            shutil.rmtree(save_path)
-                        elif os.path.exists(save_path):
-                            os.remove(save_path)
-                    except OSError:
-                        pass
-                finally:
-                    self.download_paths.pop(req_id, None)
+        except Exception as e:
+            logger.warning("TCP handler error (%s): %s: %s", addr, type(e).__name__, e)
+        finally:
+            self.inbound_budget.release(held)
+            if not handed_off:
+                client_sock.close()
 
+    def _file_stream_task(self, client_sock, session: RoomSession, *args):
+        try:
+            self._receive_file_stream(client_sock, session, *args)
         except Exception as e:
-            print(f"[Engine] TCP handler error ({addr}): {type(e).__name__}: {e}")
+            logger.warning("file receive error: %s: %s", type(e).__name__, e)
         finally:
+            self._download_slots.release()
             client_sock.close()
 
-    def _send_chat_history_to(self, target_ip: str, target_port: int):
-        messages = self.history_mgr.get_history_snapshot()
+    def _receive_file_stream(self, client_sock, session: RoomSession, req_id: str, save_path: str, is_zip: bool,
+                             expected_size, expected_sha256: str, chunk_codec: Optional[str]):
+        """FILE_STREAM_START 뒤의 청크를 받아 저장하고 크기/해시를 검증 (수신 스레드에서 실행)"""
+        # 송신측이 멈추면(노트북 절전 등) 청크 사이 대기 시간 초과로 포기 — 수신 스레드가 영원히 남지 않도록
+        client_sock.settimeout(FILE_STREAM_IDLE_TIMEOUT)
+        save_dir = os.path.dirname(os.path.abspath(save_path))
+        os.makedirs(save_dir, exist_ok=True)
+
+        bytes_received = 0
+        hasher = hashlib.sha256()
+        started = time.perf_counter()
+        self._update_transfer(req_id, state="receiving", bytes=0)
+        try:
+            with open(save_path, "wb") as f:
+                while True:
+                    chunk_len_bytes = self._recv_exact(client_sock, 4)
+                    if not chunk_len_bytes:
+                        break
+                    chunk_len = struct.unpack("!I", chunk_len_bytes)[0]
+                    if chunk_len <= 0:
+                        raise ValueError(f"Invalid chunk length: {chunk_len}")
+                    if chunk_len > MAX_PACKET_SIZE:
+                        raise ValueError(f"Chunk too large: {chunk_len} bytes")
+
+                    if not self.inbound_budget.acquire(chunk_len, timeout=10.0):
+                        raise ValueError("Inbound buffer budget exhausted.")
+                    try:
+                        enc_chunk = self._recv_exact(client_sock, chunk_len)
+                        if not enc_chunk:
+                            raise ValueError("Incomplete chunk payload.")
+                        t0 = time.perf_counter()
+                        raw_chunk = session.security.decrypt(enc_chunk)
+                        t1 = time.perf_counter()
+                        CODEC_SECONDS.observe(t1 - t0, "decrypt")
+                        if chunk_codec:
+                            raw_chunk = compression.unpack_chunk(raw_chunk)
+                            t0, t1 = t1, time.perf_counter()
+                            CODEC_SECONDS.observe(t1 - t0, "decompress")
+                    finally:
+                        self.inbound_budget.release(chunk_len)
+                    f.write(raw_chunk)
+                    DISK_SECONDS.observe(time.perf_counter() - t1, "write")
+                    bytes_received += len(raw_chunk)
+                    hasher.update(raw_chunk)
+                    self._update_transfer(req_id, bytes=bytes_received)
+
+            if expected_size is not None and bytes_received != int(expected_size):
+                raise ValueError(f"Size mismatch (expected={expected_size}, actual={bytes_received})")
+
+            actual_sha256 = hasher.hexdigest().lower()
+            if expected_sha256 and actual_sha256 != expected_sha256:
+                raise ValueError("SHA-256 mismatch for received file stream.")
+
+            if is_zip:
+                extract_dir = save_path + "_extracted"
+                FileManager.extract_zip(save_path, extract_dir)
+                final_path = extract_dir
+            else:
+                final_path = save_path
+
+            logger.info("file receive completed: %s", final_path)
+            _record_transfer("download", bytes_received, time.perf_counter() - started)
+            self._update_transfer(req_id, state="completed", path=final_path)
+            if self.on_file_transfer_completed:
+                self.on_file_transfer_completed(req_id, final_path)
+        except Exception as e:
+            logger.warning("file stream validation failed (%s): %s", req_id, e)
+            self._update_transfer(req_id, state="failed", error=str(e))
+            if self.on_file_transfer_failed:
+                self.on_file_transfer_failed(req_id, str(e))
+            try:
+                if os.path.isdir(save_path):
+                    import shutil
+
+                    shutil.rmtree(save_path)
+                elif os.path.exists(save_path):
+                    os.remove(save_path)
+            except OSError:
+                pass
+        finally:
+            session.download_paths.pop(req_id, None)
+
+    def _register_file_request(self, session: RoomSession, record: MessageRecord):
+        if record.msg_type == "FILE_REQ":
+            req_id = record.get("req_id")
+            if req_id:
+                session.active_file_requests[req_id] = record
+
+    @staticmethod
+    def _queue_dispatch(session: RoomSession, records: list, synced: bool = False):
+        """기록에 추가된 records를 전달 대기열 끝에 넣음. 기록 추가와 같은 session.dispatch_lock 안에서 호출해야
+        대기열 순서가 기록 순서와 같아짐"""
+        if records:
+            session.dispatch_queue.append((records, synced))
+
+    def _drain_dispatch(self, session: RoomSession):
+        """전달 대기열을 비움. 이미 다른 스레드가 비우는 중이면 그 스레드가 이어서 전달하므로 바로 반환"""
+        with session.dispatch_lock:
+            if session.dispatching:
+                return
+            session.dispatching = True
+        while True:
+            with session.dispatch_lock:
+                if not session.dispatch_queue:
+                    session.dispatching = False
+                    return
+                records, synced = session.dispatch_queue.popleft()
+            try:
+                if synced:
+                    self._dispatch_history(session, records)
+                else:
+                    for record in records:
+                        self._dispatch_message(session, record)
+            except Exception as e:
+                logger.warning("message callback error (%s): %s: %s", session.room_name, type(e).__name__, e)
+
+    def _dispatch_history(self, session: RoomSession, records: list):
+        """입장 시 받은 히스토리 중 새 메시지를 한 번에 UI로 전달합니다."""
+        for record in records:
+            self._register_file_request(session, record)
+        if self.on_room_messages:
+            self.on_room_messages(session.room_name, records, True)
+        if session is self.session:
+            if self.on_chat_history_received:
+                self.on_chat_history_received(records)
+        else:
+            self._mark_unread(session, len(records))
+
+    def _dispatch_message(self, session: RoomSession, record: MessageRecord):
+        """인과 순서가 확정된 수신 메시지를 기록하고, 현재 보고 있는 방이면 UI로 전달합니다."""
+        self._register_file_request(session, record)
+        if self.on_room_messages:
+            self.on_room_messages(session.room_name, [record], False)
+        if session is self.session:
+            if self.on_message_received:
+                self.on_message_received(record)
+        else:
+            self._mark_unread(session, 1)
+
+    def _mark_unread(self, session: RoomSession, count: int):
+        # 다른 방을 보고 있는 동안 도착한 메시지는 기록에만 남기고 안 읽은 수만 알림 (전환 시 로컬 기록으로 표시)
+        session.unread += count
+        if self.on_room_activity:
+            self.on_room_activity(session.room_name, session.unread)
+
+    def _send_chat_history_to(self, session: RoomSession, peer_info, peer_id: str = ""):
+        messages = session.history_mgr.export_wire_snapshot()
         if not messages:
             return
         packet = {"type": "CHAT_HISTORY", "messages": messages}
-        raw_data = json.dumps(packet).encode("utf-8")
-        encrypted_data = self.security.encrypt(raw_data)
-        P2PClient.send_data(target_ip, target_port, encrypted_data)
-        print(f"[Engine] sent chat history ({len(messages)}) -> {target_ip}:{target_port}")
-
-    def _peer_monitor_loop(self):
-        last_peers_keys = set()
+        if not self._send_packet(session, peer_info, packet, peer_id=peer_id):
+            return
+        logger.debug("sent chat history (%s, %s) -> %s:%s", session.room_name, len(messages), peer_info['ip'], peer_info['tcp_port'])
+
+    def _on_discovery_event(self, event: str, session_id: str, info, previous):
+        """discovery 수신/만료 스레드에서 호출됨 — 큐에 넣고 이벤트 스레드를 깨움"""
+        with self._peer_event_cond:
+            self._peer_events.append((event, session_id, info, previous))
+            self._peer_event_cond.notify()
+
+    def _on_room_delta(self, event: str, room_name: str, entry):
+        """discovery의 방 단위 델타 — 방 이름만 모아 두고 이벤트 스레드에서 한 번에 반영"""
+        with self._peer_event_cond:
+            self._touched_rooms.add(room_name)
+            self._peer_event_cond.notify()
+
+    def _kick_peer_events(self, rooms=()):
+        """방 입장/퇴장처럼 피어 이벤트 없이도 목록을 다시 그려야 할 때 이벤트 스레드를 깨움"""
+        with self._peer_event_cond:
+            self._room_changed = True
+            self._touched_rooms.update(rooms)
+            self._peer_event_cond.notify()
+
+    def _peer_event_loop(self):
+        """피어 이벤트를 짧게 모아(coalesce) 처리하고, 주기적 정리 작업도 함께 수행"""
         while self._running:
-            current_peers = self.discovery.get_active_peers()
-            current_keys = set(current_peers.keys())
-
-            if current_keys != last_peers_keys:
-                if self.room_name != "__LOBBY__":
-                    new_peer_ids = current_keys - last_peers_keys
-                    for sid in new_peer_ids:
-                        info = current_peers.get(sid, {})
-                        if info.get("room_name") == self.room_name:
-                            threading.Thread(
-                                target=self._send_chat_history_to,
-                                args=(info["ip"], info["tcp_port"]),
-                                daemon=True,
-                            ).start()
-
-                if self.on_peer_updated:
-                    self.on_peer_updated(current_peers)
-                last_peers_keys = current_keys
-
-            time.sleep(2)
+            with self._peer_event_cond:
+                if not self._peer_events and not self._room_changed and not self._touched_rooms:
+                    wait = self._last_housekeeping + HOUSEKEEPING_INTERVAL - time.monotonic()
+                    self._peer_event_cond.wait(timeout=max(0.0, wait))
+                has_events = bool(self._peer_events) or self._room_changed or bool(self._touched_rooms)
+
+            if has_events:
+                # 동시에 여러 피어가 나타나는 버스트는 한 번의 UI 갱신으로 합침
+                time.sleep(PEER_EVENT_COALESCE_WINDOW)
+                with self._peer_event_cond:
+                    events, self._peer_events = self._peer_events, []
+                    touched, self._touched_rooms = self._touched_rooms, set()
+                    self._room_changed = False
+                if self._running:
+                    self._apply_room_deltas(touched)
+                    self._handle_peer_events(events)
+
+            # 이벤트 배치마다가 아니라 HOUSEKEEPING_INTERVAL마다만 (디스커버리 변동이 잦아도 전체 세션 정리는 주기적으로)
+            now = time.monotonic()
+            if now - self._last_housekeeping >= HOUSEKEEPING_INTERVAL:
+                self._last_housekeeping = now
+                self._housekeeping()
+
+    def _apply_room_deltas(self, touched):
+        """건드려진 방만 다시 집계하여 실제로 바뀐 방을 UI에 델타로 전달 (방에 있는 동안에도 로비에서 방 추가 가능)"""
+        changes = {}
+        for room_name in touched:
+            if room_name == LOBBY_ROOM:
+                continue
+            entry = self._room_entry(room_name)
+            if entry is not None:
+                entry = dict(entry)
+            if entry == self._room_view.get(room_name):
+                continue
+            changes[room_name] = entry
+            if entry is None:
+                self._room_view.pop(room_name, None)
+            else:
+                self._room_view[room_name] = entry
+        if changes and self.on_rooms_changed:
+            self.on_rooms_changed(changes)
+
+    def _handle_peer_events(self, events: list):
+        for event, sid, _info, _previous in events:
+            if event == "leave":
+                # 떠난 피어에게 남은 전송과 재전송은 포기
+                self.send_queue.drop_peer(sid)
+                self.outbox.forget_peer(sid)
+                self.liveness.forget(sid)
+        if not self.joined:
+            return
+
+        synced = set()
+        for event, sid, info, previous in events:
+            if event == "leave":
+                continue
+            rooms_now = {name for name, _ in peer_rooms(info)}
+            rooms_before = {name for name, _ in peer_rooms(previous)} if event == "update" else set()
+            # 새로 나타났거나 내가 참여 중인 방에 새로 들어온 피어에게만 그 방의 히스토리 전달
+            for room_name in rooms_now - rooms_before:
+                session = self.joined.get(room_name)
+                if session is None or (sid, room_name) in synced:
+                    continue
+                synced.add((sid, room_name))
+                threading.Thread(target=self._send_chat_history_to, args=(session, info, sid), daemon=True).start()
+
+        if self.session is not None and self.on_peer_updated:
+            self.on_peer_updated(self.discovery.get_active_peers())
+
+    def _housekeeping(self):
+        self._probe_suppressed()
+        active = self.discovery.get_active_peers().keys()
+        # 선행 메시지가 유실되어 오래 보류된 메시지는 포기하고 전달.
+        # 나간 방은 제외 — 보류분은 세션에 남아 있다가 재입장 후 전달됨
+        for session in list(self.joined.values()):
+            with session.dispatch_lock:
+                self._queue_dispatch(session, session.history_mgr.release_stale_messages())
+            self._drain_dispatch(session)
+
+        for session in list(self._sessions.values()):
+            # 오래 전에 떠난 세션은 벡터 클락에서 제거하여 메시지 메타데이터 증가를 막음
+            pruned = session.history_mgr.prune_departed(active)
+            if pruned:
+                logger.info("pruned departed nodes from vector clock (%s): %s", session.room_name, pruned)
@@ -0,0 +1,117 @@
+import json
+import sys
+import threading
+import time
+from typing import Callable, List, Optional, TextIO
+
+from backend.utils.logger import get_logger
+
+logger = get_logger("events")
+event_logger = get_logger("event")
+
+# sink(event) — event: {"event": 이름, "ts": 시각, ...} (JSON으로 직렬화 가능한 사전)
+EventSink = Callable[[dict], None]
+
+
+class EventBus:
+    """P2PEngine 콜백을 이벤트 사전으로 바꿔 등록된 sink들에게 전달합니다.
+
+    GUI 없이 엔진을 실행하는 헤드리스 모드와 로컬 제어 API가 같은 이벤트 흐름을 공유합니다.
+    sink는 엔진의 네트워크 스레드에서 호출되므로 오래 막히지 않아야 합니다 (예외는 기록만 하고 무시).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sinks: List[EventSink] = []
+
+    def subscribe(self, sink: EventSink):
+        with self._lock:
+            self._sinks = self._sinks + [sink]
+
+    def unsubscribe(self, sink: EventSink):
+        with self._lock:
+            self._sinks = [s for s in self._sinks if s is not sink]
+
+    def publish(self, event: str, **fields):
+        payload = {"event": event, "ts": time.time()}
+        payload.update(fields)
+        for sink in self._sinks:
+            try:
+                sink(payload)
+            except Exception as e:
+                logger.error("sink error (%s): %s", event, e)
+
+    def attach(self, engine):
+        """엔진의 콜백을 이 버스로 연결 (UIController 대신 사용)"""
+        engine.on_room_messages = lambda room, records, synced: self.publish(
+            "messages", room=room, synced=synced, messages=[r.to_wire() for r in records]
+        )
+        engine.on_peer_updated = lambda peers: self.publish(
+            "peers",
+            peers=[
+                {"session_id": sid, "nickname": info.get("nickname", ""), "ip": info.get("ip", "")}
+                for sid, info in peers.items()
+            ],
+        )
+        engine.on_rooms_changed = lambda changes: self.publish(
+            "rooms", changes={name: dict(entry) if entry is not None else None for name, entry in changes.items()}
+        )
+        engine.on_delivery_state = lambda room, msg_id, delivered, total, state: self.publish(
+            "delivery", room=room, msg_id=msg_id, delivered=delivered, total=total, state=state
+        )
+        engine.on_file_transfer_completed = lambda req_id, path: self.publish(
+            "download_completed", req_id=req_id, path=path
+        )
+        engine.on_file_transfer_failed = lambda req_id, error: self.publish(
+            "download_failed", req_id=req_id, error=error
+        )
+        engine.on_peer_backpressure = lambda peer_id, congested: self.publish(
+            "backpressure", peer_id=peer_id, congested=congested
+        )
+        engine.on_peer_liveness = lambda peer_id, suspect: self.publish(
+            "liveness", peer_id=peer_id, suspect=suspect
+        )
+
+
+class JsonlSink:
+    """이벤트를 한 줄에 하나씩 JSON으로 기록 (path가 "-"이면 표준 출력)"""
+
+    def __init__(self, path: str = "-"):
+        self._lock = threading.Lock()
+        self._owned = path != "-"
+        self._stream: TextIO = open(path, "a", encoding="utf-8") if self._owned else sys.stdout
+
+    def __call__(self, event: dict):
+        line = json.dumps(event, ensure_ascii=False, default=str)
+        with self._lock:
+            if self._stream is None:
+                return
+            self._stream.write(line + "\n")
+            self._stream.flush()
+
+    def close(self):
+        with self._lock:
+            if self._owned and self._stream is not None:
+                self._stream.close()
+            self._stream = None
+
+
+def log_sink(event: dict):
+    """사람이 읽는 한 줄 요약을 출력하는 sink"""
+    name = event.get("event")
+    if name == "messages":
+        for msg in event.get("messages", []):
+            tag = " (history)" if event.get("synced") else ""
+            event_logger.info("%s%s <%s> %s: %s", event.get('room'), tag, msg.get('sender_nickname', '?'), msg.get('type'), msg.get('content', ''))
+    else:
+        fields = {k: v for k, v in event.items() if k not in ("event", "ts")}
+        event_logger.info("%s: %s", name, json.dumps(fields, ensure_ascii=False, default=str))
+
+
+def open_sink(target: Optional[str]) -> Optional[EventSink]:
+    """CLI/환경변수 값으로 sink 생성: None/""이면 없음, "log"이면 요약 출력, 그 외는 JSONL 파일 경로("-"는 표준 출력)"""
+    if not target:
+        return None
+    if target == "log":
+        return log_sink
+    return JsonlSink(target)
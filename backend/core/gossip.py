@@ -0,0 +1,35 @@
+import random
+from typing import List, Mapping, Tuple
+
+DEFAULT_RELAY_FANOUT = 5  # 중계 모드에서 메시지 1건을 전달할 피어 수
+DEFAULT_RELAY_TTL = 6  # 발신자로부터 최대 몇 번 더 전달될 수 있는지 (홉 수)
+
+# 패킷에 붙는 중계 필드. 히스토리 레코드에는 저장하지 않음
+RELAY_TTL_FIELD = "relay_ttl"
+RELAY_FANOUT_FIELD = "relay_fanout"
+RELAY_FROM_FIELD = "relay_from"  # 직전에 전달한 피어의 session_id (되돌려 보내지 않도록)
+MAX_RELAY_TTL = 16  # 수신한 값의 상한 — 잘못된(또는 악의적인) 패킷이 무한히 퍼지지 않도록
+MAX_RELAY_FANOUT = 16
+
+
+def split_targets(peers: Mapping[str, Mapping], fanout: int, rng=random) -> Tuple[List[tuple], List[tuple]]:
+    """발신 대상 나누기. 반환: (직접 보낼 [(session_id, info)], gossip으로 보낼 [(session_id, info)])
+
+    중계 모드를 광고하지 않은 피어(구버전 포함)는 전달받을 수 없으므로 항상 직접 보냅니다.
+    중계 피어가 fanout 이하이면 중계할 이유가 없으므로 모두 직접 보냅니다.
+    """
+    direct, relays = [], []
+    for sid, info in peers.items():
+        (relays if info.get("relay") else direct).append((sid, info))
+    if fanout <= 0 or len(relays) <= fanout:
+        return direct + relays, []
+    return direct, rng.sample(relays, fanout)
+
+
+def relay_targets(peers: Mapping[str, Mapping], fanout: int, exclude=(), rng=random) -> List[tuple]:
+    """받은 메시지를 전달할 중계 피어 [(session_id, info)]를 무작위로 최대 fanout명 선택 (exclude: 제외할 session_id)"""
+    candidates = [(sid, info) for sid, info in peers.items() if info.get("relay") and sid not in exclude]
+    if len(candidates) <= fanout:
+        return candidates
+    return rng.sample(candidates, fanout)
+
@@ -1,80 +1,406 @@
+import sys
 import threading
 import time
-from typing import List, Dict
+from typing import Iterable, List, Dict, Optional, Set, Tuple
+
+from backend.core.causal import CausalDeliveryBuffer
+from backend.core.search import HistorySearchIndex
+
+VCLOCK_PRUNE_AFTER = 600  # 초 — 이 시간 이상 활동이 없고 떠난 노드는 클락에서 제거
+VCLOCK_KEYFRAME_INTERVAL = 32  # 발신자별 N개 메시지마다 전체 클락을 저장 (나머지는 델타)
+
 
 class VectorClock:
-    """피어 간 이벤트 순서를 결정짓는 논리적 클락"""
+    """피어 간 이벤트 순서를 결정짓는 논리적 클락
+
+    session_id는 엔진 재시작마다 새로 생성되므로, 떠난 노드의 항목은 prune()으로 정리합니다.
+    인과성 보장 범위:
+    - 남아 있는 노드들 사이의 happened-before 관계는 그대로 유지됩니다.
+    - 제거된 노드 X의 항목은 0으로 간주됩니다. 따라서 X가 보낸 메시지와 이후 메시지는
+      "동시(concurrent)"로 판정될 수 있으며, 이 경우 순서는 결정적 tie-break로 정해집니다.
+    - 제거는 X가 discovery에서 사라지고 VCLOCK_PRUNE_AFTER 이상 클락이 진행되지 않은
+      경우에만 일어나므로, 그 사이 X의 메시지는 이미 방 안에 전파되었다고 가정합니다.
+    - 제거한 항목은 {노드: 제거 시점 카운트}로 남겨 두고, 아직 X를 제거하지 않은 피어의 클락을
+      병합할 때 그 이하의 카운트는 무시합니다. 피어마다 제거 시점이 달라도 항목이 되살아나지 않습니다.
+    """
     def __init__(self, node_id: str):
         self.node_id = node_id
         self.clock: Dict[str, int] = {node_id: 0}
+        self.last_advanced: Dict[str, float] = {node_id: time.time()}
+        self.pruned: Dict[str, int] = {}  # 제거한 노드 → 제거 시점 카운트 (tombstone)
         self.lock = threading.Lock()
 
     def increment(self):
         with self.lock:
             self.clock[self.node_id] = self.clock.get(self.node_id, 0) + 1
+            self.last_advanced[self.node_id] = time.time()
             return self.clock.copy()  # get_clock() 호출 시 같은 lock 재진입으로 데드락 발생하므로 직접 복사
 
     def merge(self, other_clock: Dict[str, int]):
         """타 피어의 클락과 병합하여 최대값으로 동기화"""
+        now = time.time()
         with self.lock:
             for node, count in other_clock.items():
-                self.clock[node] = max(self.clock.get(node, 0), count)
+                if count > self.clock.get(node, 0):
+                    tombstone = self.pruned.get(node)
+                    if tombstone is not None:
+                        if count <= tombstone:
+                            continue  # 이미 제거한 노드의 지난 값 — 되살리지 않음
+                        del self.pruned[node]  # 제거 후 실제로 진행된 노드
+                    self.clock[node] = count
+                    self.last_advanced[node] = now
+
+    def prune(self, present_nodes: Iterable[str], max_idle: float = VCLOCK_PRUNE_AFTER) -> List[str]:
+        """현재 접속 중이 아니고 max_idle 초 이상 진행이 없던 노드 항목을 제거하고 그 목록을 반환합니다."""
+        present = set(present_nodes)
+        present.add(self.node_id)
+        cutoff = time.time() - max_idle
+        with self.lock:
+            departed = [
+                node for node in self.clock
+                if node not in present and self.last_advanced.get(node, 0) < cutoff
+            ]
+            for node in departed:
+                self.pruned[node] = self.clock.pop(node)
+                self.last_advanced.pop(node, None)
+        return departed
 
     def get_clock(self) -> Dict[str, int]:
         with self.lock:
             return self.clock.copy()
 
 
+class SeenMessageIds:
+    """msg_id 중복 판정용 압축 집합.
+
+    msg_id는 `{session_id}_{counter}` 형식이므로 발신자별로
+    - 1부터 연속 수신된 최대 counter (high-water mark)
+    - high-water mark 위에 띄엄띄엄 도착한 counter들의 작은 집합 (gaps)
+    만 유지하면 모든 id를 문자열로 보관하지 않고도 정확히 판정할 수 있습니다.
+    형식에 맞지 않는 id는 별도의 set에 그대로 보관합니다 (오탐 없음).
+    """
+
+    def __init__(self):
+        self._senders: Dict[str, Tuple[int, Optional[Set[int]]]] = {}
+        self._foreign: set = set()
+
+    @staticmethod
+    def _parse(msg_id: str) -> Optional[Tuple[str, int]]:
+        sender, sep, counter = msg_id.rpartition("_")
+        if not sep or not sender or not counter.isdigit():
+            return None
+        value = int(counter)
+        if value <= 0 or str(value) != counter:
+            return None  # "007" 같은 비정규 표기는 문자열 그대로 비교해야 정확함
+        return sender, value
+
+    def __contains__(self, msg_id) -> bool:
+        parsed = self._parse(msg_id) if isinstance(msg_id, str) else None
+        if parsed is None:
+            return msg_id in self._foreign
+        sender, counter = parsed
+        high, gaps = self._senders.get(sender, (0, None))
+        return counter <= high or (gaps is not None and counter in gaps)
+
+    def add(self, msg_id) -> bool:
+        """id를 기록합니다. 새로 추가되었으면 True, 이미 본 id면 False."""
+        parsed = self._parse(msg_id) if isinstance(msg_id, str) else None
+        if parsed is None:
+            if msg_id in self._foreign:
+                return False
+            self._foreign.add(msg_id)
+            return True
+
+        sender, counter = parsed
+        high, gaps = self._senders.get(sender, (0, None))
+        if counter <= high or (gaps is not None and counter in gaps):
+            return False
+
+        if counter == high + 1:
+            high = counter
+            # 빈 구간이 메워지면 gaps의 연속 구간을 high-water mark로 흡수
+            while gaps and high + 1 in gaps:
+                high += 1
+                gaps.discard(high)
+        else:
+            if gaps is None:
+                gaps = set()
+            gaps.add(counter)
+
+        self._senders[sys.intern(sender)] = (high, gaps or None)
+        return True
+
+    def __len__(self) -> int:
+        total = len(self._foreign)
+        for high, gaps in self._senders.values():
+            total += high + (len(gaps) if gaps else 0)
+        return total
+
+
+class MessageRecord:
+    """히스토리에 보관되는 메시지 1건 (슬롯 기반 레코드).
+
+    메시지마다 dict와 vclock dict를 따로 두지 않도록 고정 필드는 슬롯에,
+    반복되는 세션/닉네임/타입 문자열은 intern하여 공유합니다.
+    와이어 포맷(dict)으로의 변환은 송수신 경계에서만 수행합니다.
+    """
+
+    __slots__ = (
+        "msg_type",
+        "msg_id",
+        "sender_session",
+        "sender_nickname",
+        "sender_short_id",
+        "content",
+        "timestamp",
+        "vclock",
+        "vclock_base",
+        "extra",
+    )
+
+    _WIRE_FIELDS = {
+        "type": "msg_type",
+        "msg_id": "msg_id",
+        "sender_session": "sender_session",
+        "sender_nickname": "sender_nickname",
+        "sender_short_id": "sender_short_id",
+        "content": "content",
+        "timestamp": "timestamp",
+    }
+    _WIRE_STR_FIELDS = ("type", "sender_session", "sender_nickname", "sender_short_id", "content")
+
+    def __init__(
+        self,
+        msg_type: str,
+        msg_id: str,
+        sender_session: str,
+        sender_nickname: str,
+        content: str = "",
+        timestamp: float = 0.0,
+        vclock: Optional[Dict[str, int]] = None,
+        sender_short_id: str = "",
+        extra: Optional[dict] = None,
+    ):
+        self.msg_type = sys.intern(msg_type or "MESSAGE")
+        self.msg_id = msg_id
+        self.sender_session = sys.intern(sender_session or "")
+        self.sender_nickname = sys.intern(sender_nickname or "")
+        self.sender_short_id = sys.intern(sender_short_id or "")
+        self.content = content or ""
+        self.timestamp = timestamp or 0.0
+        self.vclock: Tuple[Tuple[str, int], ...] = (
+            tuple((sys.intern(node), count) for node, count in vclock.items()) if vclock else ()
+        )
+        # None이면 vclock이 전체 클락, 아니면 같은 발신자의 직전 레코드 대비 델타
+        self.vclock_base: Optional["MessageRecord"] = None
+        self.extra = extra or None
+
+    def full_vclock(self) -> Dict[str, int]:
+        """델타 체인을 따라가 전체 벡터 클락을 복원합니다 (최대 VCLOCK_KEYFRAME_INTERVAL 단계)."""
+        chain = []
+        record = self
+        while record is not None:
+            chain.append(record.vclock)
+            record = record.vclock_base
+        clock: Dict[str, int] = {}
+        for entries in reversed(chain):
+            clock.update(entries)
+        return clock
+
+    @classmethod
+    def from_wire(cls, packet: dict) -> "MessageRecord":
+        """피어가 보낸 패킷으로 레코드를 만듭니다. 필드 타입이 맞지 않으면 ValueError (intern/클락 비교 전에 거름)"""
+        cls._validate_wire(packet)
+        extra = {k: v for k, v in packet.items() if k not in cls._WIRE_FIELDS and k != "vclock"}
+        vclock = packet.get("vclock")
+        return cls(
+            msg_type=packet.get("type", "MESSAGE"),
+            msg_id=packet.get("msg_id"),
+            sender_session=packet.get("sender_session", ""),
+            sender_nickname=packet.get("sender_nickname", "Unknown"),
+            content=packet.get("content", ""),
+            timestamp=packet.get("timestamp", 0.0),
+            vclock=vclock,
+            sender_short_id=packet.get("sender_short_id", ""),
+            extra=extra,
+        )
+
+    @classmethod
+    def _validate_wire(cls, packet):
+        if not isinstance(packet, dict):
+            raise ValueError("message must be a JSON object")
+        msg_id = packet.get("msg_id")
+        if not isinstance(msg_id, str) or not msg_id:
+            raise ValueError("msg_id must be a non-empty string")
+        for key in cls._WIRE_STR_FIELDS:
+            value = packet.get(key)
+            if value is not None and not isinstance(value, str):
+                raise ValueError(f"{key} must be a string, not {type(value).__name__}")
+        timestamp = packet.get("timestamp")
+        if timestamp is not None and (isinstance(timestamp, bool) or not isinstance(timestamp, (int, float))):
+            raise ValueError("timestamp must be a number")
+        vclock = packet.get("vclock")
+        if vclock is not None:
+            if not isinstance(vclock, dict):
+                raise ValueError("vclock must be an object")
+            for node, count in vclock.items():
+                if not isinstance(node, str) or isinstance(count, bool) or not isinstance(count, int) or count < 0:
+                    raise ValueError("vclock must map session ids to non-negative integers")
+
+    def to_wire(self) -> dict:
+        packet = {
+            "type": self.msg_type,
+            "msg_id": self.msg_id,
+            "sender_session": self.sender_session,
+            "sender_nickname": self.sender_nickname,
+            "content": self.content,
+            "timestamp": self.timestamp,
+            "vclock": self.full_vclock(),
+        }
+        if self.sender_short_id:
+            packet["sender_short_id"] = self.sender_short_id
+        if self.extra:
+            packet.update(self.extra)
+        return packet
+
+    def get(self, key: str, default=None):
+        """와이어 키 이름으로 필드를 조회합니다 (FILE_REQ의 file_name 등 부가 필드 포함)."""
+        attr = self._WIRE_FIELDS.get(key)
+        if attr is not None:
+            return getattr(self, attr)
+        if key == "vclock":
+            return self.full_vclock()
+        if self.extra:
+            return self.extra.get(key, default)
+        return default
+
+
 class ChatHistoryManager:
     """P2P 대화 일지 및 동기화를 관리하는 모듈"""
     def __init__(self, local_session_id: str):
         self.local_session_id = local_session_id
         self.vector_clock = VectorClock(local_session_id)
-        self.messages: List[dict] = []
-        self._seen_ids: set = set()
+        self.messages: List[MessageRecord] = []
+        self._seen_ids = SeenMessageIds()
+        self._sender_tails: Dict[str, Tuple[MessageRecord, Dict[str, int], int]] = {}
+        self._causal = CausalDeliveryBuffer()
+        self.search_index = HistorySearchIndex()
         self.lock = threading.Lock()
 
-    def add_local_message(self, sender_nickname: str, content: str = "", msg_type: str = "MESSAGE", extra: dict = None) -> dict:
+    def _compact_clock(self, record: MessageRecord):
+        """record의 클락을 같은 발신자 직전 레코드 대비 델타로 바꿉니다. (lock 보유 상태에서 호출)"""
+        full = dict(record.vclock)
+        tail = self._sender_tails.get(record.sender_session)
+        if tail is not None:
+            prev_record, prev_clock, depth = tail
+            # 항목이 제거(prune)된 경우 델타로 표현할 수 없으므로 키프레임으로 저장
+            if depth < VCLOCK_KEYFRAME_INTERVAL and prev_clock.keys() <= full.keys():
+                record.vclock = tuple(
+                    (node, count) for node, count in record.vclock if prev_clock.get(node) != count
+                )
+                record.vclock_base = prev_record
+                self._sender_tails[record.sender_session] = (record, full, depth + 1)
+                return
+        self._sender_tails[record.sender_session] = (record, full, 0)
+
+    def add_local_message(self, sender_nickname: str, content: str = "", msg_type: str = "MESSAGE", extra: dict = None) -> MessageRecord:
         """내가 전송하는 새 메시지(또는 이벤트)를 기록하고 클락을 증가시킴"""
         vclock = self.vector_clock.increment()
-        msg_obj = {
-            "type": msg_type,
-            "msg_id": f"{self.local_session_id}_{vclock[self.local_session_id]}",
-            "sender_session": self.local_session_id,
-            "sender_nickname": sender_nickname,
-            "content": content,
-            "timestamp": time.time(),
-            "vclock": vclock
-        }
-        if extra:
-            msg_obj.update(extra)
-            
+        extra = dict(extra) if extra else {}
+        msg_obj = MessageRecord(
+            msg_type=msg_type,
+            msg_id=f"{self.local_session_id}_{vclock[self.local_session_id]}",
+            sender_session=self.local_session_id,
+            sender_nickname=sender_nickname,
+            content=content,
+            timestamp=time.time(),
+            vclock=vclock,
+            sender_short_id=extra.pop("sender_short_id", ""),
+            extra=extra,
+        )
+
         with self.lock:
             self.messages.append(msg_obj)
-            self._seen_ids.add(msg_obj["msg_id"])
+            self._seen_ids.add(msg_obj.msg_id)
+            self._causal.mark_delivered(self.local_session_id, vclock[self.local_session_id])
+            self._compact_clock(msg_obj)
+            self.search_index.add(msg_obj)
         return msg_obj
 
-    def receive_remote_message(self, msg_obj: dict) -> bool:
-        """다른 피어로부터 수신한 메시지를 기록하고 클락을 동기화함"""
-        msg_id = msg_obj.get("msg_id")
-        remote_vclock = msg_obj.get("vclock", {})
-        
+    def receive_remote_message(self, msg_obj: MessageRecord) -> List[MessageRecord]:
+        """다른 피어로부터 수신한 메시지를 인과 순서 버퍼에 넣고, 전달 가능해진 메시지를 순서대로 반환함
+
+        중복이거나 선행 메시지를 기다리는 중이면 빈 리스트를 반환합니다.
+        반환된 메시지는 히스토리 끝에 추가된 순서 그대로이므로 UI는 append만 하면 됩니다.
+        """
+        return self.offer_remote_message(msg_obj)[1]
+
+    def offer_remote_message(self, msg_obj: MessageRecord) -> Tuple[bool, List[MessageRecord]]:
+        """receive_remote_message와 같지만 처음 본 msg_id인지도 함께 반환 (gossip 중계 여부 판단용)"""
         with self.lock:
-            # 중복 수신 방지 — O(1) set 조회
-            if msg_id in self._seen_ids:
-                return False
+            # 중복 수신 방지 — 발신자별 high-water mark 조회
+            if not self._seen_ids.add(msg_obj.msg_id):
+                return False, []
+            ready = self._causal.offer(msg_obj, dict(msg_obj.vclock))
+            return True, self._append_delivered(ready)
 
-            self.messages.append(msg_obj)
-            self._seen_ids.add(msg_id)
-            # 수신 시점 기준으로 정렬 (실제론 Vector Clock 대조나 Timestamp 기반 정렬 등 활용)
-            self.messages.sort(key=lambda x: x.get("timestamp", 0))
-            
-        # 벡터 클락 동기화
-        if remote_vclock:
-            self.vector_clock.merge(remote_vclock)
-            
-        return True
+    def release_stale_messages(self) -> List[MessageRecord]:
+        """선행 메시지가 끝내 도착하지 않아 오래 보류된 메시지를 전달 처리하고 반환함"""
+        with self.lock:
+            return self._append_delivered(self._causal.release_stale())
+
+    def _append_delivered(self, ready: list) -> List[MessageRecord]:
+        """인과 순서가 확정된 메시지를 히스토리에 추가하고 벡터 클락을 동기화함 (lock 보유 상태에서 호출)"""
+        delivered = []
+        for record, clock in ready:
+            self.messages.append(record)
+            self._compact_clock(record)
+            self.search_index.add(record)
+            if clock:
+                self.vector_clock.merge(clock)
+            delivered.append(record)
+        return delivered
 
-    def get_history_snapshot(self) -> List[dict]:
+    def prune_departed(self, present_sessions: Iterable[str], max_idle: float = VCLOCK_PRUNE_AFTER) -> List[str]:
+        """떠난 노드를 로컬 클락에서 제거합니다. 이후 보내는 메시지의 클락 크기가 줄어듭니다."""
+        return self.vector_clock.prune(present_sessions, max_idle)
+
+    def search(self, query: str, limit: Optional[int] = 50) -> List[MessageRecord]:
+        """본문·파일명·발신자 색인에서 질의와 일치하는 메시지를 최신순으로 반환함"""
+        with self.lock:
+            return self.search_index.search(query, limit)
+
+    def get_history_snapshot(self) -> List[MessageRecord]:
         with self.lock:
             return self.messages.copy()
+
+    def export_wire_snapshot(self) -> List[dict]:
+        """CHAT_HISTORY 전송용 스냅샷. 발신자별 첫 메시지 이후로는 클락을 델타로만 담습니다."""
+        packets = []
+        running: Dict[str, Dict[str, int]] = {}
+        for record in self.get_history_snapshot():
+            packet = record.to_wire()
+            prev = running.get(record.sender_session)
+            full = packet["vclock"]
+            if prev is not None and prev.keys() <= full.keys():
+                packet["vclock"] = {node: count for node, count in full.items() if prev.get(node) != count}
+                packet["vclock_delta"] = True
+            running[record.sender_session] = full
+            packets.append(packet)
+        return packets
+
+    @staticmethod
+    def expand_wire_snapshot(packets: List[dict]) -> List[dict]:
+        """export_wire_snapshot()의 델타 클락을 전체 클락으로 복원합니다."""
+        running: Dict[str, Dict[str, int]] = {}
+        for packet in packets:
+            if not isinstance(packet, dict):
+                continue  # from_wire에서 거부됨
+            sender = packet.get("sender_session", "")
+            vclock = packet.get("vclock") or {}
+            if packet.pop("vclock_delta", False) and isinstance(vclock, dict) and isinstance(sender, str):
+                full = dict(running.get(sender, {}))
+                full.update(vclock)
+                packet["vclock"] = full
+            running[sender] = packet.get("vclock") or {}
+        return packets
@@ -0,0 +1,57 @@
+import hashlib
+import threading
+from collections import deque
+from typing import Optional, Tuple
+
+from backend.core.history import ChatHistoryManager
+from backend.core.security import SessionSecurity
+
+# 방 ID 프레임: magic(2) | room_id(8) | 암호화된 본문
+# 평문 JSON("{")이나 Fernet 토큰("gAAAA")은 0x00으로 시작하지 않으므로 구버전 프레임과 구분됨
+ROOM_FRAME_MAGIC = b"\x00R"
+ROOM_ID_SIZE = 8
+
+
+def room_id_for(room_name: str) -> bytes:
+    return hashlib.sha256(room_name.encode("utf-8")).digest()[:ROOM_ID_SIZE]
+
+
+def frame_for_room(room_id: bytes, payload: bytes) -> bytes:
+    return ROOM_FRAME_MAGIC + room_id + payload
+
+
+def split_room_frame(data: bytes) -> Tuple[Optional[bytes], bytes]:
+    """(room_id, 본문). 방 ID가 없는 구버전 프레임이면 (None, data)"""
+    if data[:2] == ROOM_FRAME_MAGIC and len(data) >= 2 + ROOM_ID_SIZE:
+        return data[2:2 + ROOM_ID_SIZE], data[2 + ROOM_ID_SIZE:]
+    return None, data
+
+
+class RoomSession:
+    """방 하나에 속한 상태 묶음: 암호화 컨텍스트, 대화 기록(검색 색인 포함), 파일 요청 테이블.
+
+    소켓이나 스레드를 소유하지 않으므로 P2PEngine에 붙였다 떼는 비용이 거의 없습니다.
+    같은 방에 다시 들어오면 엔진이 기존 세션을 재사용하여 기록과 msg_id counter가 이어집니다
+    (counter가 1부터 다시 시작하면 피어들이 새 메시지를 중복으로 보고 버림).
+    """
+
+    def __init__(self, room_name: str, password: str, local_session_id: str):
+        self.room_name = room_name
+        self.room_id = room_id_for(room_name)
+        self.security = SessionSecurity(password, room_name=room_name)
+        self.history_mgr = ChatHistoryManager(local_session_id)
+        self.unread = 0  # 보고 있지 않은 동안 도착한 메시지 수
+        # 기록에 추가된 수신 메시지를 콜백으로 넘기기 전 대기열 [(records, synced)].
+        # 여러 연결 처리 워커가 동시에 받아도 기록에 추가된 순서 그대로, 한 번에 한 스레드만 전달함
+        self.dispatch_lock = threading.Lock()
+        self.dispatch_queue = deque()
+        self.dispatching = False
+
+        self.active_file_requests = {}  # {req_id: MessageRecord}
+        self.outgoing_file_requests = {}  # {req_id: {...}}
+        self.download_paths = {}  # {req_id: temp_save_path}
+
+    def set_password(self, password: str):
+        """재입장 시 비밀번호가 바뀌었으면 암호화 컨텍스트만 교체 (키 파생 결과는 security 모듈에서 캐시됨)"""
+        if password != self.security.password:
+            self.security = SessionSecurity(password, room_name=self.room_name)
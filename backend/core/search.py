@@ -0,0 +1,157 @@
+import bisect
+import re
+import sys
+from typing import Dict, List, Optional
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+SEARCH_FIELDS = ("content", "file", "sender")
+_FIELD_ALIASES = {"from": "sender", "sender": "sender", "file": "file", "content": "content"}
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+class _FieldIndex:
+    """필드 하나에 대한 역색인. 접두어 검색을 위해 정렬된 어휘 목록을 함께 유지합니다."""
+
+    __slots__ = ("postings", "vocab")
+
+    def __init__(self):
+        self.postings: Dict[str, List[int]] = {}  # 토큰 -> 오름차순 doc_id 목록
+        self.vocab: List[str] = []
+
+    def add(self, doc_id: int, tokens):
+        for token in set(tokens):
+            docs = self.postings.get(token)
+            if docs is None:
+                token = sys.intern(token)
+                self.postings[token] = [doc_id]
+                bisect.insort(self.vocab, token)
+            else:
+                docs.append(doc_id)
+
+    def posting_lists(self, term: str, prefix: bool) -> List[List[int]]:
+        if not prefix:
+            docs = self.postings.get(term)
+            return [docs] if docs else []
+        lists = []
+        start = bisect.bisect_left(self.vocab, term)
+        for token in self.vocab[start:]:
+            if not token.startswith(term):
+                break
+            lists.append(self.postings[token])
+        return lists
+
+
+class _Term:
+    __slots__ = ("fields", "token", "prefix")
+
+    def __init__(self, fields, token: str, prefix: bool):
+        self.fields = fields
+        self.token = token
+        self.prefix = prefix
+
+
+class HistorySearchIndex:
+    """대화 기록 증분 역색인.
+
+    메시지 본문, FILE_REQ의 파일명, 발신자 닉네임을 색인합니다.
+    질의 문법: 공백으로 구분된 단어는 AND, 끝에 `*`를 붙이면 접두어 검색,
+    `from:이름` / `file:이름` 으로 필드를 한정할 수 있습니다.
+    가장 결과가 적은 단어의 posting만 최신순으로 훑고, 나머지 단어는 후보 문서에서 직접 확인하므로
+    흔한 접두어가 섞여 있어도 limit개를 찾는 즉시 종료됩니다.
+    """
+
+    INDEXED_TYPES = ("MESSAGE", "FILE_REQ")
+
+    def __init__(self):
+        self._docs: list = []  # doc_id -> MessageRecord
+        self._fields = {field: _FieldIndex() for field in SEARCH_FIELDS}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    @staticmethod
+    def _field_text(record, field: str) -> str:
+        if field == "sender":
+            return record.sender_nickname
+        if field == "file":
+            return record.get("file_name", "") if record.msg_type == "FILE_REQ" else ""
+        return record.content if record.msg_type != "FILE_REQ" else ""
+
+    def add(self, record):
+        if record.msg_type not in self.INDEXED_TYPES:
+            return
+        doc_id = len(self._docs)
+        self._docs.append(record)
+        for field in SEARCH_FIELDS:
+            tokens = tokenize(self._field_text(record, field))
+            if tokens:
+                self._fields[field].add(doc_id, tokens)
+
+    @staticmethod
+    def _parse(query: str) -> List[_Term]:
+        terms = []
+        for raw in query.split():
+            field, sep, term = raw.partition(":")
+            fields = SEARCH_FIELDS
+            if sep and field.lower() in _FIELD_ALIASES:
+                fields = (_FIELD_ALIASES[field.lower()],)
+            else:
+                term = raw
+
+            prefix = term.endswith("*")
+            tokens = tokenize(term.rstrip("*"))
+            # "hello-world" 처럼 여러 토큰으로 쪼개지는 단어는 각 토큰을 모두 포함해야 함
+            for i, token in enumerate(tokens):
+                terms.append(_Term(fields, token, prefix and i == len(tokens) - 1))
+        return terms
+
+    def _posting_lists(self, term: _Term) -> List[List[int]]:
+        lists = []
+        for field in term.fields:
+            lists.extend(self._fields[field].posting_lists(term.token, term.prefix))
+        return lists
+
+    def _doc_matches(self, record, term: _Term) -> bool:
+        for field in term.fields:
+            for token in tokenize(self._field_text(record, field)):
+                if token == term.token or (term.prefix and token.startswith(term.token)):
+                    return True
+        return False
+
+    def search(self, query: str, limit: Optional[int] = 50) -> list:
+        """질의와 일치하는 메시지 레코드를 최신순으로 반환합니다."""
+        terms = self._parse(query)
+        if not terms:
+            return []
+
+        candidates = []
+        for term in terms:
+            lists = self._posting_lists(term)
+            if not lists:
+                return []
+            candidates.append((sum(len(docs) for docs in lists), term, lists))
+        candidates.sort(key=lambda item: item[0])
+        cost, _, lists = candidates[0]
+        others = [term for _, term, _ in candidates[1:]]
+
+        if cost * 8 >= len(self._docs):
+            # 흔한 단어/짧은 접두어: posting 병합보다 최신 문서부터 직접 확인하는 편이 빠름
+            doc_ids = range(len(self._docs) - 1, -1, -1)
+            others = terms
+        elif len(lists) == 1:
+            doc_ids = reversed(lists[0])
+        else:
+            doc_ids = sorted(set().union(*lists), reverse=True)
+
+        results = []
+        for doc_id in doc_ids:
+            record = self._docs[doc_id]
+            if all(self._doc_matches(record, term) for term in others):
+                results.append(record)
+                if limit is not None and len(results) >= limit:
+                    break
+        return results
@@ -1,10 +1,40 @@
 import base64
 import hashlib
-from cryptography.fernet import Fernet, InvalidToken
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+import threading
+from collections import OrderedDict
+
+# cryptography는 import만 수십 ms가 걸리므로 비밀번호 방에 처음 입장할 때 불러옴 (공개 방/로비는 import하지 않음)
 
 _PACKET_TTL = 300  # 초 — 재전송 공격 방어용 Fernet TTL
+_KEY_CACHE_SIZE = 16  # 같은 방에 다시 입장할 때 PBKDF2(480,000회)를 반복하지 않도록 유지하는 키 수
+
+_key_cache = OrderedDict()  # {(salt, sha256(password)): key}
+_key_cache_lock = threading.Lock()
+
+
+def _derive_key(password: str, salt: bytes) -> bytes:
+    cache_key = (salt, hashlib.sha256(password.encode()).digest())
+    with _key_cache_lock:
+        key = _key_cache.get(cache_key)
+        if key is not None:
+            _key_cache.move_to_end(cache_key)
+            return key
+
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=480000,
+    )
+    key = base64.urlsafe_b64encode(kdf.derive(password.encode()))
+    with _key_cache_lock:
+        _key_cache[cache_key] = key
+        while len(_key_cache) > _KEY_CACHE_SIZE:
+            _key_cache.popitem(last=False)
+    return key
 
 
 class SessionSecurity:
@@ -15,16 +45,12 @@ class SessionSecurity:
         self.is_encrypted = bool(password)
 
         if self.is_encrypted:
+            from cryptography.fernet import Fernet, InvalidToken
+
+            self._invalid_token = InvalidToken
             # room_name 기반 동적 솔트 — 방마다 키가 달라 크로스-룸 재전송 불가
             salt = hashlib.sha256(room_name.encode()).digest() if room_name else b"lan_chat_default_salt"
-            kdf = PBKDF2HMAC(
-                algorithm=hashes.SHA256(),
-                length=32,
-                salt=salt,
-                iterations=480000,
-            )
-            key = base64.urlsafe_b64encode(kdf.derive(password.encode()))
-            self.fernet = Fernet(key)
+            self.fernet = Fernet(_derive_key(password, salt))
 
     def encrypt(self, data: bytes) -> bytes:
         if not self.is_encrypted:
@@ -36,7 +62,7 @@ class SessionSecurity:
             return data
         try:
             return self.fernet.decrypt(data, ttl=_PACKET_TTL)
-        except InvalidToken:
-            raise ValueError("암호 복호화 실패: 비밀번호가 다르거나 패킷이 만료/손상되었습니다.")
-        except Exception:
+        except Exception as e:
+            if isinstance(e, self._invalid_token):
+                raise ValueError("암호 복호화 실패: 비밀번호가 다르거나 패킷이 만료/손상되었습니다.")
             raise ValueError("암호 복호화 실패: 비밀번호가 다르거나 패킷이 손상되었습니다.")
@@ -0,0 +1,504 @@
+import hmac
+import ipaddress
+import json
+import os
+import queue
+import secrets
+import socket
+import socketserver
+import stat
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from backend.core.events import EventBus
+from backend.network.peer_registry import peer_rooms
+from backend.utils.logger import get_logger
+from backend.utils.metrics import registry as metrics
+
+logger = get_logger("control_api")
+
+DEFAULT_API_HOST = "127.0.0.1"
+DEFAULT_API_PORT = 50080
+DEFAULT_TOKEN_FILE = "control_api.token"  # 토큰을 지정하지 않으면 자동 생성해 저장하는 파일 (config.json과 같은 폴더, 0600)
+DEFAULT_DOWNLOAD_DIR = "downloads"  # POST /downloads가 저장할 수 있는 폴더 (이 밖의 경로는 거부)
+MAX_REQUEST_BODY = 1024 * 1024  # 요청 본문 상한 (명령만 받으므로 작게)
+EVENT_QUEUE_SIZE = 1000  # 스트림 클라이언트별 대기 이벤트 상한 — 넘으면 느린 소비자로 보고 연결을 끊음
+EVENT_KEEPALIVE = 15.0  # 초 — 이벤트가 없을 때 연결 유지를 위해 보내는 주석 간격
+DEFAULT_HISTORY_LIMIT = 100
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class ControlAPI:
+    """자동화용 로컬 HTTP 제어 API (P2PEngine 메서드를 그대로 노출).
+
+    GET    /peers[?room=]                    피어 목록
+    GET    /rooms                            참여 중인 방과 로비 방 목록
+    GET    /messages?room=&limit=&q=         방 기록 (q가 있으면 검색)
+    POST   /messages {"room", "text"}        메시지 전송 → msg_id
+    GET    /messages/<msg_id>                내 메시지의 전달 상태
+    POST   /shares {"room", "paths", "speed_limit"}  파일/폴더 공유 → req_id
+    DELETE /shares/<req_id>?room=            공유 취소
+    POST   /downloads {"room", "req_id", "save_path" | "dir"}  다운로드 수락
+    GET    /transfers[/<req_id>]             전송 상태
+    GET    /events[?types=messages,delivery]  이벤트 스트림 (text/event-stream)
+    GET    /metrics[?format=json]            계측 값 (Prometheus 텍스트, json이면 스냅샷)
+
+    파일을 보내고 디스크에 쓰는 명령이 있으므로 모든 요청에 토큰이 필요합니다 (Authorization: Bearer <token>).
+    token을 주지 않으면 token_file의 토큰을 쓰고, 파일이 없으면 새로 만들어 소유자만 읽을 수 있게(0600) 저장합니다.
+    기본적으로 127.0.0.1에만 바인딩하며, DNS 리바인딩을 막기 위해 Host(와 Origin)가 localhost 또는 IP 주소인
+    요청만 받습니다. POSIX에서는 unix_socket 경로를 주면 TCP 대신 소유자 전용(0600) 유닉스 소켓으로 엽니다.
+    다운로드 저장 경로는 download_dir 안으로 제한합니다.
+    """
+
+    def __init__(self, engine, bus: EventBus, host: str = DEFAULT_API_HOST, port: int = DEFAULT_API_PORT,
+                 token: str = "", token_file: str = DEFAULT_TOKEN_FILE, unix_socket: Optional[str] = None,
+                 download_dir: str = DEFAULT_DOWNLOAD_DIR):
+        if unix_socket and not hasattr(socket, "AF_UNIX"):
+            raise ValueError("unix sockets are not supported on this platform")
+        self.engine = engine
+        self.bus = bus
+        self.host = host
+        self.port = port
+        self.unix_socket = unix_socket
+        self.token_file = None if token else token_file
+        self.token = token or load_or_create_token(token_file)
+        self.download_dir = os.path.abspath(download_dir)
+        self._server: Optional[socketserver.BaseServer] = None
+        self._streams_lock = threading.Lock()
+        self._streams = set()  # 열린 이벤트 스트림의 큐
+
+    def start(self):
+        api = self
+
+        class Handler(_ApiHandler):
+            pass
+
+        Handler.api = api
+        if self.unix_socket:
+            self._server = _bind_unix_server(self.unix_socket, Handler)
+            where = f"unix:{self.unix_socket}"
+        else:
+            self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+            self._server.daemon_threads = True
+            self.port = self._server.server_address[1]
+            where = f"http://{self.host}:{self.port}"
+        threading.Thread(target=self._server.serve_forever, name="control-api", daemon=True).start()
+        if self.token_file:
+            logger.info("listening on %s (token in %s)", where, os.path.abspath(self.token_file))
+        else:
+            logger.info("listening on %s", where)
+
+    def stop(self):
+        with self._streams_lock:
+            streams = list(self._streams)
+        for stream in streams:
+            _offer(stream, None)  # 스트림 종료 신호
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            if self.unix_socket:
+                try:
+                    os.unlink(self.unix_socket)
+                except OSError:
+                    pass
+
+    def host_allowed(self, host: str) -> bool:
+        """Host/Origin 헤더 값이 이 서버를 직접 가리키는지 (이름은 localhost만, 그 외는 IP 주소만 허용.
+        127.0.0.1에 바인딩했으면 루프백 주소만)"""
+        try:
+            parsed = urlsplit(host if "//" in host else "//" + host)
+            name, port = parsed.hostname, parsed.port
+        except ValueError:
+            return False
+        if not name or (port if port is not None else 80) != self.port:
+            return False
+        if name == "localhost":
+            return True
+        try:
+            address = ipaddress.ip_address(name)
+        except ValueError:
+            return False
+        return address.is_loopback or not _is_loopback(self.host)
+
+    # ---------- 이벤트 스트림 ----------
+    def open_stream(self, types=()) -> "queue.Queue":
+        stream = queue.Queue(maxsize=EVENT_QUEUE_SIZE)
+        wanted = set(types)
+
+        def sink(event: dict):
+            if wanted and event.get("event") not in wanted:
+                return
+            if not _offer(stream, event):
+                # 소비가 밀린 클라이언트 — 더 쌓지 않고 스트림을 닫음 (재연결은 클라이언트 몫)
+                self.bus.unsubscribe(sink)
+                _offer(stream, None, force=True)
+
+        stream.sink = sink
+        self.bus.subscribe(sink)
+        with self._streams_lock:
+            self._streams.add(stream)
+        return stream
+
+    def close_stream(self, stream):
+        self.bus.unsubscribe(stream.sink)
+        with self._streams_lock:
+            self._streams.discard(stream)
+
+    # ---------- 명령 ----------
+    def _room(self, body_or_query: dict) -> Optional[str]:
+        room = body_or_query.get("room")
+        if room is not None and room not in self.engine.joined:
+            raise ApiError(404, f"not in room '{room}'")
+        return room
+
+    def list_peers(self, query: dict):
+        room = self._room(query)
+        peers = self.engine.discovery.get_room_peers(room) if room else self.engine.discovery.get_active_peers()
+        suspects = self.engine.liveness.suspects()
+        return {"peers": [
+            {
+                "session_id": sid,
+                "nickname": info.get("nickname", ""),
+                "ip": info.get("ip", ""),
+                "rooms": [name for name, _ in peer_rooms(info)],
+                "responding": sid not in suspects,
+            }
+            for sid, info in peers.items()
+        ]}
+
+    def list_rooms(self, _query: dict):
+        return {
+            "joined": list(self.engine.joined),
+            "focused": self.engine.session.room_name if self.engine.session is not None else None,
+            "rooms": {name: dict(entry) for name, entry in self.engine.room_summary().items()},
+        }
+
+    def get_messages(self, query: dict):
+        room = self._room(query)
+        limit = _int_param(query, "limit", DEFAULT_HISTORY_LIMIT)
+        if query.get("q"):
+            records = self.engine.search_history(query["q"], limit, room_name=room)
+        else:
+            records = self.engine.get_history(room, limit)
+        return {"messages": [record.to_wire() for record in records]}
+
+    def send_message(self, body: dict):
+        room = self._room(body)
+        text = body.get("text")
+        if not isinstance(text, str) or not text:
+            raise ApiError(400, "text is required")
+        try:
+            record = self.engine.create_chat_message(text, room)
+        except RuntimeError as e:
+            raise ApiError(409, str(e))
+        sent = self.engine.broadcast_record(record, room)
+        return {"msg_id": record.msg_id, "sent": sent, "delivery": self._delivery(record.msg_id)}
+
+    def message_state(self, msg_id: str):
+        delivery = self._delivery(msg_id)
+        if delivery is None:
+            raise ApiError(404, f"unknown msg_id '{msg_id}'")
+        return delivery
+
+    def _delivery(self, msg_id: str):
+        state = self.engine.delivery_state(msg_id)
+        if state is None:
+            return None
+        delivered, total, name = state
+        return {"msg_id": msg_id, "delivered": delivered, "total": total, "state": name}
+
+    def share(self, body: dict):
+        room = self._room(body)
+        paths = body.get("paths")
+        if isinstance(paths, str):
+            paths = [paths]
+        if not paths or not all(isinstance(p, str) for p in paths):
+            raise ApiError(400, "paths must be a non-empty list of file or folder paths")
+        missing = [p for p in paths if not os.path.exists(p)]
+        if missing:
+            raise ApiError(400, f"path not found: {missing[0]}")
+        try:
+            ok, meta, req_id = self.engine.broadcast_file_request(
+                paths, int(body.get("speed_limit") or 0), room_name=room
+            )
+        except RuntimeError as e:
+            raise ApiError(409, str(e))
+        return {"req_id": req_id, "name": meta["name"], "size": meta["size"], "sent": ok}
+
+    def cancel_share(self, req_id: str, query: dict):
+        room = self._room(query)
+        status = self.engine.get_transfer_status(req_id)
+        if status is None or status.get("direction") != "upload" or status.get("state") != "offered":
+            raise ApiError(404, f"unknown share '{req_id}'")
+        if not self.engine.cancel_file_sharing(req_id, room_name=room or status.get("room")):
+            raise ApiError(404, f"unknown share '{req_id}'")
+        return {"req_id": req_id, "state": "canceled"}
+
+    def accept_download(self, body: dict):
+        room = self._room(body)
+        req_id = body.get("req_id")
+        if not isinstance(req_id, str) or not req_id:
+            raise ApiError(400, "req_id is required")
+        save_path = body.get("save_path")
+        if save_path:
+            save_path = self._download_path(save_path)
+            os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        else:
+            # dir 생략 시 download_dir 바로 아래에 저장
+            directory = self._download_path(body.get("dir") or "", allow_root=True)
+            request = self._file_request(room, req_id)
+            name = os.path.basename(str(request.get("file_name") or req_id).replace("\\", "/")) or req_id
+            os.makedirs(directory, exist_ok=True)
+            save_path = os.path.join(directory, name)
+        if not self.engine.accept_file_transfer(req_id, save_path, room_name=room):
+            raise ApiError(409, f"could not accept '{req_id}' (unknown request or sender unreachable)")
+        return self.engine.get_transfer_status(req_id)
+
+    def _download_path(self, path, allow_root: bool = False) -> str:
+        """download_dir 기준 상대 경로(또는 그 안의 절대 경로)를 실제 경로로. 밖을 가리키면 거부"""
+        if not isinstance(path, str):
+            raise ApiError(400, "save_path/dir must be a string")
+        root = os.path.realpath(self.download_dir)
+        full = os.path.realpath(os.path.join(root, path))
+        if os.path.commonpath([root, full]) != root or (full == root and not allow_root):
+            raise ApiError(403, f"path must be inside the download directory ({self.download_dir})")
+        return full
+
+    def _file_request(self, room: Optional[str], req_id: str):
+        session = self.engine.joined.get(room) if room else self.engine.session
+        request = session.active_file_requests.get(req_id) if session is not None else None
+        if request is None:
+            raise ApiError(404, f"unknown file request '{req_id}'")
+        return request
+
+    def transfers(self, req_id: Optional[str] = None):
+        if req_id is None:
+            return {"transfers": self.engine.get_transfer_status()}
+        status = self.engine.get_transfer_status(req_id)
+        if status is None:
+            raise ApiError(404, f"unknown transfer '{req_id}'")
+        return status
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def load_or_create_token(path: str) -> str:
+    """path의 API 토큰을 읽고, 없으면 새로 만들어 소유자만 읽을 수 있게(0600) 저장"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            token = f.read().strip()
+        if token:
+            return token
+    except FileNotFoundError:
+        pass
+    token = secrets.token_urlsafe(32)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(token + "\n")
+    try:
+        os.chmod(path, 0o600)  # 이미 있던 빈 파일이면 O_CREAT 권한이 적용되지 않음
+    except OSError:
+        pass
+    return token
+
+
+class _UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def _bind_unix_server(path: str, handler) -> _UnixHTTPServer:
+    """소유자만 접속할 수 있는 유닉스 소켓 서버. 이전 실행이 남긴 소켓 파일은 지우고 다시 바인딩"""
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+    old_umask = os.umask(0o177)
+    try:
+        return _UnixHTTPServer(path, handler)
+    finally:
+        os.umask(old_umask)
+
+
+def _offer(stream: "queue.Queue", item, force: bool = False) -> bool:
+    try:
+        stream.put_nowait(item)
+        return True
+    except queue.Full:
+        if not force:
+            return False
+        try:
+            stream.get_nowait()  # 종료 신호가 들어갈 자리를 만듦
+        except queue.Empty:
+            pass
+        return _offer(stream, item)
+
+
+def _int_param(query: dict, name: str, default: int) -> int:
+    try:
+        return max(1, int(query.get(name, default)))
+    except (TypeError, ValueError):
+        raise ApiError(400, f"{name} must be an integer")
+
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    api: ControlAPI = None
+    server_version = "LocalLanChat"
+
+    def log_message(self, format, *args):
+        pass  # 요청마다 stderr에 남기지 않음 (오류는 _dispatch에서 출력)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def _dispatch(self, method: str):
+        try:
+            self._check_host()
+            self._authorize()
+            url = urlsplit(self.path)
+            parts = [unquote(p) for p in url.path.strip("/").split("/") if p]
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            route = (method, parts[0] if parts else "", len(parts))
+
+            if route == ("GET", "events", 1):
+                types = [t for t in query.get("types", "").split(",") if t]
+                return self._stream_events(types)
+            if route == ("GET", "metrics", 1):
+                if query.get("format") == "json":
+                    return self._send_json(200, metrics.snapshot())
+                return self._send_text(200, metrics.prometheus_text())
+            api = self.api
+            if route == ("GET", "peers", 1):
+                result = api.list_peers(query)
+            elif route == ("GET", "rooms", 1):
+                result = api.list_rooms(query)
+            elif route == ("GET", "messages", 1):
+                result = api.get_messages(query)
+            elif route == ("POST", "messages", 1):
+                result = api.send_message(self._json_body())
+            elif route == ("GET", "messages", 2):
+                result = api.message_state(parts[1])
+            elif route == ("POST", "shares", 1):
+                result = api.share(self._json_body())
+            elif route == ("DELETE", "shares", 2):
+                result = api.cancel_share(parts[1], query)
+            elif route == ("POST", "downloads", 1):
+                result = api.accept_download(self._json_body())
+            elif route == ("GET", "transfers", 1):
+                result = api.transfers()
+            elif route == ("GET", "transfers", 2):
+                result = api.transfers(parts[1])
+            else:
+                raise ApiError(404, f"no route for {method} {url.path}")
+            self._send_json(200, result)
+        except ApiError as e:
+            self._send_json(e.status, {"error": str(e)})
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        except Exception as e:
+            logger.error("%s %s failed: %s: %s", method, self.path, type(e).__name__, e)
+            self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def _check_host(self):
+        """DNS 리바인딩 방어 — 공격자 도메인 이름으로 들어온 브라우저 요청은 Host/Origin이 맞지 않아 거부됨"""
+        if self.api.unix_socket:
+            return
+        if not self.api.host_allowed(self.headers.get("Host", "")):
+            raise ApiError(403, "unexpected Host header")
+        origin = self.headers.get("Origin")
+        if origin is not None and not self.api.host_allowed(origin):
+            raise ApiError(403, "cross-origin requests are not allowed")
+
+    def _authorize(self):
+        token = self.api.token
+        header = self.headers.get("Authorization", "")
+        supplied = header[7:] if header.startswith("Bearer ") else self.headers.get("X-Api-Token", "")
+        if not hmac.compare_digest(supplied.encode("utf-8"), token.encode("utf-8")):
+            raise ApiError(401, "invalid or missing API token")
+
+    def _json_body(self) -> dict:
+        if self.headers.get_content_type() != "application/json":
+            raise ApiError(415, "Content-Type must be application/json")
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            raise ApiError(400, "invalid Content-Length")
+        if length > MAX_REQUEST_BODY:
+            raise ApiError(413, "request body too large")
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            raise ApiError(400, "request body is not valid JSON")
+        if not isinstance(body, dict):
+            raise ApiError(400, "request body must be a JSON object")
+        return body
+
+    def _send_json(self, status: int, payload):
+        data = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _send_text(self, status: int, text: str):
+        data = text.encode("utf-8")
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _stream_events(self, types):
+        """Server-Sent Events — 연결이 끊기거나 서버가 멈출 때까지 버스 이벤트를 밀어 보냄"""
+        stream = self.api.open_stream(types)
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            self.wfile.write(b": connected\n\n")
+            self.wfile.flush()
+            while True:
+                try:
+                    event = stream.get(timeout=EVENT_KEEPALIVE)
+                except queue.Empty:
+                    self.wfile.write(b": keepalive\n\n")
+                    self.wfile.flush()
+                    continue
+                if event is None:
+                    return
+                data = json.dumps(event, ensure_ascii=False, default=str)
+                self.wfile.write(f"event: {event.get('event')}\ndata: {data}\n\n".encode("utf-8"))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.api.close_stream(stream)
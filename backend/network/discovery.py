@@ -1,23 +1,81 @@
 import socket
 import threading
-import json
+import random
 import time
 import uuid
 
+from backend.core.compression import SUPPORTED_CODECS
+from backend.network.discovery_protocol import (
+    LEGACY_COMPAT_FIELD, decode_packet, encode_discovery, encode_leave, encode_legacy_discovery, encode_probe,
+)
+from backend.network.interfaces import default_route_ip, interface_for, list_ipv4_interfaces
+from backend.network.peer_registry import PeerRegistry, PeerSnapshot
+from backend.utils.logger import get_logger
+from backend.utils.metrics import registry as metrics
+
+logger = get_logger("discovery")
+
+DISCOVERY_PACKETS = metrics.counter("lanchat_discovery_packets_total", "디스커버리 UDP 패킷 수 (인터페이스별 송신 포함)", ("direction",))
+
+PROBE_SCHEDULE = (0.0, 0.3, 1.0)  # 초 — 시작 직후 DISCOVERY_PROBE 재전송 시점 (패킷 유실 대비)
+PROBE_REPLY_MAX_JITTER = 0.25  # 초 — 여러 피어의 응답이 한꺼번에 몰리지 않도록 지연
+PROBE_REPLY_MIN_INTERVAL = 2.0  # 초 — 같은 탐색자에게 다시 응답하기 전 최소 간격
+PROBE_REPLY_RATE = 20.0  # 초당 최대 응답 수 (probe 폭주 방지 토큰 버킷)
+EXPIRY_MULTIPLIER = 3  # 피어가 알린 주기의 몇 배 동안 신호가 없으면 만료할지 (연속 유실 허용)
+EXPIRY_GRACE = 1.0  # 초 — 만료 판정 여유
+MAX_EXPIRY_WINDOW = 11.0  # 초 — 알림 주기가 길어져도 (주기 2회분이 넘지 않는 한) 만료 시간을 이 이하로 유지
+INTERFACE_REFRESH_INTERVAL = 30.0  # 초 — NIC 추가/제거, DHCP 재할당 반영 주기
+LEGACY_ANNOUNCE_INTERVAL = 3.0  # 초 — 호환용 JSON 알림 주기 (구버전은 3초마다 알리고 10초간 신호가 없으면 만료)
+
 class PeerDiscovery:
-    def __init__(self, nickname: str, tcp_port: int, room_name: str = "Lobby", is_private: bool = False, port: int = 50000, broadcast_interval: int = 3):
+    def __init__(self, nickname: str, tcp_port: int, room_name: str = "Lobby", is_private: bool = False, port: int = 50000,
+                 min_broadcast_interval: float = 0.5, max_broadcast_interval: float = 5.0, peer_timeout: float = 10,
+                 multicast_group: str = "", multicast_ttl: int = 1, relay: bool = False, legacy_announce: bool = True):
         self.nickname = nickname
         self.tcp_port = tcp_port
         self.room_name = room_name
         self.is_private = is_private
+        # 참여 중인 모든 방 ((이름, 비공개 여부), ...) — room_name은 구버전 피어를 위한 대표(현재 보고 있는) 방
+        self.rooms = ()
+        # gossip 중계 참여 여부 — 켜진 피어끼리는 메시지를 일부 피어에게만 보내고 서로 전달함
+        self.relay = relay
+        # 구버전(JSON 전용) 피어와 섞여 있는 동안 JSON 알림도 함께 보냄 — 끄면 구버전 피어에게 보이지 않음
+        self.legacy_announce = legacy_announce
         
         self.port = port
-        self.broadcast_interval = broadcast_interval
+        # 상태가 바뀌면 min 주기로 알리고, 변화가 없으면 max 주기까지 지수적으로 늘림
+        self.min_broadcast_interval = min_broadcast_interval
+        self.max_broadcast_interval = max_broadcast_interval
+        self.broadcast_interval = min_broadcast_interval
+        self._announce_wakeup = threading.Event()
         self.running = False
         
         self.session_id = str(uuid.uuid4())[:8]
+        # 모든 IPv4 인터페이스로 알림 (인터넷이 없는 다중 NIC 환경 대응)
+        self.interfaces = list_ipv4_interfaces()
+        self._interfaces_at = time.time()
         self.local_ip = self._get_local_ip()
-        self.peers = {}  # { session_id: {'nickname': ..., 'ip': ..., ...} }
+        # 멀티캐스트 그룹이 지정되면 브로드캐스트와 함께 그룹으로도 송신 (TTL로 라우터 통과 범위 제한)
+        self.multicast_group = multicast_group
+        self.multicast_ttl = multicast_ttl
+        self._send_lock = threading.Lock()
+        # { 인터페이스 이름: 송수신 통계 } — get_interface_report()로 조회
+        self._interface_stats = {}
+        # { session_id: { 피어 IP: 마지막 수신 시각 } } — 다중 NIC 피어의 경로 후보
+        self._routes = {}
+        # { session_id: {'nickname': ..., 'ip': ..., ...} } — 수신 스레드와 호출 스레드가 함께 쓰므로 잠금 레지스트리 사용
+        self.registry = PeerRegistry(default_ttl=peer_timeout)
+        self._expiry_wakeup = threading.Event()
+        # TCP 생존 확인에 실패해 제거한 피어 { session_id: (마지막 알림 info, ttl, 만료 시각) }.
+        # UDP 알림은 오지만 TCP가 막힌 피어가 다시 join되어 목록이 깜빡이지 않도록, TCP 접촉에 성공할 때까지 보류
+        self._suppressed = {}
+        self._suppress_lock = threading.Lock()
+
+        # DISCOVERY_PROBE 응답 속도 제한 상태
+        self._probe_lock = threading.Lock()
+        self._probe_replied_at = {}  # { 탐색자 session_id: 마지막 응답 시각 }
+        self._reply_tokens = PROBE_REPLY_RATE
+        self._reply_tokens_at = time.time()
         
         self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         # UDP 브로드캐스트 허용
@@ -28,22 +86,24 @@ class PeerDiscovery:
         # 수신 바인딩. 실패 시 다음 포트로 Fallback 하는 로직은 상위 Engine이나 별도 래퍼에서 처리 가능
         try:
             self.udp_socket.bind(('', self.port))
-            print(f"[Discovery] UDP 바인딩 성공 (Port: {self.port})")
+            logger.info("UDP 바인딩 성공 (Port: %s)", self.port)
         except Exception as e:
-            print(f"[Discovery] UDP 바인딩 실패: {e}")
+            logger.error("UDP 바인딩 실패: %s", e)
             raise e
 
-    @staticmethod
-    def _get_local_ip() -> str:
-        """실제 LAN 인터페이스 IP를 감지합니다."""
-        try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.connect(('8.8.8.8', 80))
-            ip = s.getsockname()[0]
-            s.close()
+        if self.multicast_group:
+            self.udp_socket.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, max(1, int(self.multicast_ttl)))
+            self._join_multicast(self.interfaces)
+        self.registry.add_listener(self._forget_routes)
+
+    def _get_local_ip(self) -> str:
+        """실제 LAN 인터페이스 IP를 감지합니다. 기본 라우트가 없으면(폐쇄망) 첫 번째 LAN 인터페이스를 사용"""
+        ip = default_route_ip()
+        if ip and not ip.startswith("127."):
             return ip
-        except Exception:
-            return '127.0.0.1'
+        if self.interfaces:
+            return self.interfaces[0].ip
+        return '127.0.0.1'
 
     @staticmethod
     def ip_short_id(ip: str) -> str:
@@ -64,47 +124,259 @@ class PeerDiscovery:
         # 2. 내 존재를 알리는 브로드캐스트 발송 스레드
         self.broadcast_thread = threading.Thread(target=self._broadcast_presence, daemon=True)
         self.broadcast_thread.start()
+
+        # 3. 다음 만료 시각에 맞춰 깨어나 leave 이벤트를 즉시 발생시키는 스레드
+        self.expiry_thread = threading.Thread(target=self._expiry_loop, daemon=True)
+        self.expiry_thread.start()
+
+        # 4. 기존 피어들이 다음 주기를 기다리지 않고 바로 응답하도록 탐색 요청 발송
+        self.probe_thread = threading.Thread(target=self._send_probes, daemon=True)
+        self.probe_thread.start()
+
+        # 5. 구버전 피어용 JSON 알림 (고정 주기)
+        if self.legacy_announce:
+            self.legacy_thread = threading.Thread(target=self._broadcast_legacy_presence, daemon=True)
+            self.legacy_thread.start()
         
-        print(f"[Discovery] Peer Discovery 시작됨... (닉네임: {self.nickname}_{self.session_id})")
+        logger.info("Peer Discovery 시작됨... (닉네임: %s_%s)", self.nickname, self.session_id)
 
     def stop(self):
+        # 다른 피어들이 타임아웃을 기다리지 않도록 종료를 명시적으로 알림
+        if self.running:
+            try:
+                self._send_all(encode_leave(self.session_id))
+            except OSError:
+                pass
         self.running = False
+        self._expiry_wakeup.set()
+        self._announce_wakeup.set()
         self.udp_socket.close()
-        print("[Discovery] Peer Discovery 중지됨.")
+        logger.info("Peer Discovery 중지됨.")
+
+    def update_presence(self, **fields):
+        """닉네임/방 등 광고 정보를 갱신하고 즉시(빠른 주기로) 다시 알림"""
+        for key, value in fields.items():
+            setattr(self, key, value)
+        self._announce_wakeup.set()
+
+    def _presence_packet(self) -> bytes:
+        # 매번 최신 속성값으로 메시지 생성 (닉네임 등 변경사항 반영). 다음 알림까지의 주기를 함께 광고
+        return encode_discovery(
+            self.session_id, self.nickname, self.tcp_port, self.room_name, self.is_private, self.broadcast_interval,
+            rooms=self.rooms, relay=self.relay, acks=True, batch=True,
+            codecs=SUPPORTED_CODECS,
+        )
 
     def _broadcast_presence(self):
-        """주기적으로 네트워크에 내 정보를 브로드캐스트"""
+        """적응형 주기로 네트워크에 내 정보를 브로드캐스트 (변경 직후엔 빠르게, 안정되면 점점 느리게)"""
         while self.running:
+            if time.time() - self._interfaces_at >= INTERFACE_REFRESH_INTERVAL:
+                self._refresh_interfaces()
             try:
-                # 매 루프마다 최신 속성값으로 메시지 생성 (닉네임 등 변경사항 반영)
-                message = {
-                    "type": "DISCOVERY",
-                    "nickname": self.nickname,
-                    "session_id": self.session_id,
-                    "tcp_port": self.tcp_port,
-                    "room_name": self.room_name,
-                    "is_private": self.is_private
-                }
-                data = json.dumps(message).encode('utf-8')
-                # 255.255.255.255 브로드캐스트 주소로 전송
-                self.udp_socket.sendto(data, ('<broadcast>', self.port))
+                # 인터페이스별 서브넷 브로드캐스트 (+ 멀티캐스트 그룹)로 전송
+                self._send_all(self._presence_packet())
             except Exception as e:
                 # 소켓 닫힘 등의 에러 무시
                 pass
-            time.sleep(self.broadcast_interval)
+
+            changed = self._announce_wakeup.wait(self.broadcast_interval)
+            self._announce_wakeup.clear()
+            if changed:
+                self.broadcast_interval = self.min_broadcast_interval
+            else:
+                self.broadcast_interval = min(self.max_broadcast_interval, self.broadcast_interval * 2)
+
+    def _broadcast_legacy_presence(self):
+        """구버전 피어가 만료시키지 않도록 JSON DISCOVERY를 고정 주기로 브로드캐스트"""
+        while self.running:
+            try:
+                self._send_all(encode_legacy_discovery(
+                    self.session_id, self.nickname, self.tcp_port, self.room_name, self.is_private,
+                ))
+            except Exception:
+                pass
+            time.sleep(LEGACY_ANNOUNCE_INTERVAL)
+
+    # ---------- 인터페이스 ----------
+    def _send_targets(self):
+        """(인터페이스 이름, 목적지, 멀티캐스트 송신 인터페이스 IP) 목록"""
+        targets = [(iface.name, (iface.broadcast, self.port), None) for iface in self.interfaces]
+        # 인터페이스 조회가 실패했거나 넷마스크를 추정한 경우에만 제한 브로드캐스트도 전송
+        # (정상 조회된 서브넷에서는 같은 패킷이 두 번 도착하므로 생략)
+        if not self.interfaces or any(iface.netmask_guessed for iface in self.interfaces):
+            targets.append((None, ('<broadcast>', self.port), None))
+        if self.multicast_group:
+            targets.extend((iface.name, (self.multicast_group, self.port), iface.ip) for iface in self.interfaces)
+        return targets
+
+    def _send_all(self, packet: bytes):
+        """모든 인터페이스로 패킷을 송신. 일부 인터페이스 실패는 통계에만 기록하고, 전부 실패하면 OSError"""
+        sent = 0
+        last_error = None
+        with self._send_lock:
+            for name, addr, multicast_if in self._send_targets():
+                try:
+                    if multicast_if is not None:
+                        self.udp_socket.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(multicast_if))
+                    self.udp_socket.sendto(packet, addr)
+                    sent += 1
+                    DISCOVERY_PACKETS.inc("sent")
+                    if name is not None:
+                        self._stats_for(name)["sent"] += 1
+                except OSError as e:
+                    last_error = e
+                    if name is not None:
+                        self._stats_for(name)["send_errors"] += 1
+        if sent == 0 and last_error is not None:
+            raise last_error
+
+    def _join_multicast(self, interfaces):
+        for iface in interfaces:
+            mreq = socket.inet_aton(self.multicast_group) + socket.inet_aton(iface.ip)
+            try:
+                self.udp_socket.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+            except OSError as e:
+                # 이미 가입한 그룹(EADDRINUSE) 또는 멀티캐스트 미지원 인터페이스
+                logger.warning("멀티캐스트 가입 실패 (%s %s): %s", iface.name, iface.ip, e)
+
+    def _refresh_interfaces(self):
+        self._interfaces_at = time.time()
+        interfaces = list_ipv4_interfaces()
+        if interfaces == self.interfaces:
+            return
+        added = [iface for iface in interfaces if iface not in self.interfaces]
+        logger.info("인터페이스 변경: %s", [f'{i.name}={i.ip}' for i in interfaces])
+        self.interfaces = interfaces
+        self.local_ip = self._get_local_ip()
+        if self.multicast_group and added:
+            self._join_multicast(added)
+        # 새 경로로 빠르게 다시 알림
+        self._announce_wakeup.set()
+
+    def _stats_for(self, name: str) -> dict:
+        stats = self._interface_stats.get(name)
+        if stats is None:
+            stats = self._interface_stats[name] = {
+                "sent": 0, "send_errors": 0, "received": 0, "last_received": None, "peers": set(),
+            }
+        return stats
+
+    def get_interface_report(self):
+        """인터페이스별 도달 가능성 보고: 송신 성공/실패 수, 수신 수, 마지막 수신 시각, 그 경로로 보이는 피어 수"""
+        report = []
+        for iface in self.interfaces:
+            stats = self._stats_for(iface.name)
+            report.append({
+                "name": iface.name,
+                "ip": iface.ip,
+                "netmask": iface.netmask,
+                "broadcast": iface.broadcast,
+                "sent": stats["sent"],
+                "send_errors": stats["send_errors"],
+                "received": stats["received"],
+                "last_received": stats["last_received"],
+                "peers": len(stats["peers"]),
+            })
+        return report
+
+    def _select_route(self, session_id: str, ip: str, ttl: float, now: float):
+        """여러 주소로 보이는 피어(다중 NIC)의 경로를 고정적으로 선택합니다.
+
+        직접 연결된 서브넷의 주소를 우선하고, 현재 경로가 유효하면 유지하여
+        인터페이스마다 번갈아 도착하는 패킷 때문에 피어 정보가 흔들리지 않게 합니다.
+        반환값: (피어 IP, 그 피어에 닿는 내 인터페이스 또는 None)
+        """
+        routes = self._routes.setdefault(session_id, {})
+        routes[ip] = now
+        for stale in [addr for addr, seen in routes.items() if now - seen > ttl]:
+            del routes[stale]
+
+        def rank(addr):
+            return interface_for(addr, self.interfaces) is not None, routes[addr]
+
+        current = self.registry.get(session_id)
+        current_ip = current.get("ip") if current is not None else None
+        best = max(routes, key=rank)
+        if current_ip in routes and rank(current_ip)[0] == rank(best)[0]:
+            best = current_ip
+        return best, interface_for(best, self.interfaces)
+
+    def _forget_routes(self, event, session_id, info, previous):
+        if event == "leave":
+            self._routes.pop(session_id, None)
+            for stats in self._interface_stats.values():
+                stats["peers"].discard(session_id)
+
+    def _send_probes(self):
+        """시작 직후 DISCOVERY_PROBE를 몇 차례 브로드캐스트"""
+        probe = encode_probe(self.session_id)
+        started = time.time()
+        for offset in PROBE_SCHEDULE:
+            delay = started + offset - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            if not self.running:
+                return
+            try:
+                self._send_all(probe)
+            except OSError:
+                return
+
+    def _allow_probe_reply(self, prober_id: str) -> bool:
+        """같은 탐색자에 대한 중복 응답과 전체 응답 폭주를 제한"""
+        now = time.time()
+        with self._probe_lock:
+            last = self._probe_replied_at.get(prober_id)
+            if last is not None and now - last < PROBE_REPLY_MIN_INTERVAL:
+                return False
+
+            self._reply_tokens = min(PROBE_REPLY_RATE, self._reply_tokens + (now - self._reply_tokens_at) * PROBE_REPLY_RATE)
+            self._reply_tokens_at = now
+            if self._reply_tokens < 1:
+                return False
+            self._reply_tokens -= 1
+
+            if len(self._probe_replied_at) > 1024:
+                cutoff = now - PROBE_REPLY_MIN_INTERVAL
+                self._probe_replied_at = {k: t for k, t in self._probe_replied_at.items() if t >= cutoff}
+            self._probe_replied_at[prober_id] = now
+            return True
+
+    def _reply_to_probe(self, addr):
+        if not self.running:
+            return
+        try:
+            self.udp_socket.sendto(self._presence_packet(), addr)
+        except OSError:
+            pass
 
     def _listen_for_peers(self):
         """네트워크에서 다른 피어들의 DISCOVERY 메시지 수신"""
         while self.running:
             try:
-                data, addr = self.udp_socket.recvfrom(1024)
+                data, addr = self.udp_socket.recvfrom(8192)
                 ip = addr[0]
+                DISCOVERY_PACKETS.inc("received")
                 
                 # 본인의 메시지도 캡처될 수 있으나, 처리 과정에서 본인의 session_id면 무시(또는 필터)할 수 있음
                 
-                try:
-                    payload = json.loads(data.decode('utf-8'))
-                    if payload.get("type") == "DISCOVERY":
+                payload = decode_packet(data)
+                if payload is not None:
+                    if payload.get("type") == "DISCOVERY_PROBE":
+                        prober_id = payload.get("session_id", "")
+                        if prober_id and prober_id != self.session_id and self._allow_probe_reply(prober_id):
+                            # 지터를 두고 탐색자에게만 유니캐스트로 내 정보를 응답
+                            timer = threading.Timer(random.uniform(0, PROBE_REPLY_MAX_JITTER), self._reply_to_probe, args=(addr,))
+                            timer.daemon = True
+                            timer.start()
+                    elif payload.get("type") == "DISCOVERY_LEAVE":
+                        session_id = payload.get("session_id", "")
+                        if session_id and session_id != self.session_id:
+                            self.registry.remove(session_id)
+                            with self._suppress_lock:
+                                self._suppressed.pop(session_id, None)
+                    elif payload.get("type") == "DISCOVERY" and not payload.get(LEGACY_COMPAT_FIELD):
+                        # 호환용 JSON 알림은 같은 피어의 바이너리 알림보다 정보가 적으므로 무시
                         nickname = payload.get("nickname", "Unknown")
                         session_id = payload.get("session_id", "0000")
                         tcp_port = payload.get("tcp_port", 0)
@@ -115,37 +387,152 @@ class PeerDiscovery:
                         if session_id == self.session_id:
                             continue
 
+                        # 만료 시간은 피어가 광고한 다음 알림 주기로부터 계산 (구버전 JSON 패킷은 기본값)
+                        interval = payload.get("interval")
+                        # 종료 알림 없이 사라진 피어(와 그 방)가 오래 남지 않도록 MAX_EXPIRY_WINDOW로 제한
+                        ttl = None
+                        if interval:
+                            ttl = min(interval * EXPIRY_MULTIPLIER, max(MAX_EXPIRY_WINDOW, interval * 2)) + EXPIRY_GRACE
+
+                        now = time.time()
+                        route_ip, iface = self._select_route(session_id, ip, ttl or self.registry.default_ttl, now)
+                        rx_iface = interface_for(ip, self.interfaces)
+                        if rx_iface is not None:
+                            stats = self._stats_for(rx_iface.name)
+                            stats["received"] += 1
+                            stats["last_received"] = now
+                            stats["peers"].add(session_id)
+
                         # 피어 리스트 갱신 (Key를 ip가 아닌 고유 session_id로 두어 로컬 다중 테스트 지원)
-                        self.peers[session_id] = {
-                            "ip": ip,
+                        info = {
+                            "ip": route_ip,
+                            "local_ip": iface.ip if iface is not None else self.local_ip,
                             "tcp_port": tcp_port,
                             "nickname": nickname,
                             "room_name": room_name,
                             "is_private": is_private,
-                            "last_seen": time.time()
                         }
-                except json.JSONDecodeError:
-                    pass
+                        if "rooms" in payload:
+                            info["rooms"] = payload["rooms"]
+                        if payload.get("relay"):
+                            info["relay"] = True
+                        if payload.get("acks"):
+                            info["acks"] = True
+                        if payload.get("batch"):
+                            info["batch"] = True
+                        if payload.get("codecs"):
+                            info["codecs"] = payload["codecs"]
+                        if self._hold_suppressed(session_id, info, ttl, now):
+                            continue
+                        change = self.registry.upsert(session_id, info, ttl=ttl, now=now)
+                        if change == "join":
+                            self._expiry_wakeup.set()
             except Exception as e:
                 if self.running:
-                    print(f"[Discovery] 수신 오류: {e}")
-
-    def get_active_peers(self, timeout_seconds=10):
-        """일정 시간(timeout_seconds) 이내에 신호가 있었던 활성 피어만 반환"""
-        current_time = time.time()
-        active = {}
-        for sid, info in list(self.peers.items()):
-            if current_time - info["last_seen"] <= timeout_seconds:
-                active[sid] = info
-            else:
-                # 타임아웃된 유저는 리스트에서 제거 (오프라인 처리)
-                del self.peers[sid]
-        return active
+                    logger.warning("수신 오류: %s", e)
+
+    def _expiry_loop(self):
+        """가장 이른 만료 시각까지 대기했다가 만료된 피어를 제거 (제거 시 registry가 leave 이벤트 발생)"""
+        while self.running:
+            deadline = self.registry.next_deadline()
+            timeout = None if deadline is None else max(0.0, deadline - time.time())
+            self._expiry_wakeup.wait(timeout)
+            self._expiry_wakeup.clear()
+            self.registry.expire()
+
+    def add_listener(self, listener):
+        """피어 join/update/leave 이벤트 구독. listener(event, session_id, info, previous)"""
+        self.registry.add_listener(listener)
+
+    def remove_listener(self, listener):
+        self.registry.remove_listener(listener)
+
+    def add_room_listener(self, listener):
+        """방 단위 델타 구독. listener(event, room_name, entry) — room_added/room_changed/room_removed"""
+        self.registry.add_room_listener(listener)
+
+    def remove_room_listener(self, listener):
+        self.registry.remove_room_listener(listener)
+
+    def snapshot(self) -> PeerSnapshot:
+        """만료된 피어를 정리한 뒤 버전이 붙은 읽기 전용 피어 테이블을 반환"""
+        self.registry.expire()
+        return self.registry.snapshot()
+
+    def get_active_peers(self):
+        """peer_timeout 이내에 신호가 있었던 활성 피어만 반환 (읽기 전용 매핑)"""
+        return self.snapshot().peers
+
+    def get_peer(self, session_id: str):
+        """session_id로 활성 피어 1명을 O(1) 조회. 없거나 만료되었으면 None"""
+        self.registry.expire()
+        return self.registry.get(session_id)
+
+    def evict(self, session_id: str) -> bool:
+        """TCP 생존 확인에 실패한 피어를 만료 시각 전에 제거 (leave 이벤트 발생).
+        이후 알림이 계속 와도 readmit()으로 TCP 접촉 성공이 확인될 때까지 다시 join시키지 않음"""
+        info = self.registry.remove(session_id)
+        if info is None:
+            return False
+        ttl = self.registry.default_ttl
+        with self._suppress_lock:
+            self._suppressed[session_id] = (dict(info), ttl, time.time() + ttl)
+        return True
+
+    def _hold_suppressed(self, session_id: str, info: dict, ttl, now: float) -> bool:
+        """보류 중인 피어의 알림이면 최신 정보만 기록하고 True (registry에 넣지 않음)"""
+        with self._suppress_lock:
+            if session_id not in self._suppressed:
+                return False
+            ttl = ttl or self.registry.default_ttl
+            self._suppressed[session_id] = (info, ttl, now + ttl)
+            return True
+
+    def suppressed_peers(self):
+        """보류 중이고 아직 알림이 오는 피어 {session_id: (ip, tcp_port)} — 알림이 끊긴 피어는 보류 해제(삭제)"""
+        now = time.time()
+        with self._suppress_lock:
+            for session_id in [sid for sid, entry in self._suppressed.items() if entry[2] <= now]:
+                del self._suppressed[session_id]
+            return {sid: (info["ip"], info["tcp_port"]) for sid, (info, _ttl, _expires) in self._suppressed.items()}
+
+    def is_suppressed(self, session_id: str) -> bool:
+        return session_id in self._suppressed
+
+    def readmit(self, session_id: str) -> bool:
+        """보류 중인 피어와 TCP 접촉에 성공함 — 마지막 알림 정보로 다시 join시킴"""
+        with self._suppress_lock:
+            entry = self._suppressed.pop(session_id, None)
+        if entry is None:
+            return False
+        info, ttl, expires_at = entry
+        now = time.time()
+        if expires_at <= now:
+            return False
+        if self.registry.upsert(session_id, info, ttl=ttl, now=now) == "join":
+            self._expiry_wakeup.set()
+        return True
+
+    def get_room_peers(self, room_name: str):
+        """room_name에 속한 활성 피어만 색인으로 조회"""
+        self.registry.expire()
+        return self.registry.in_room(room_name)
+
+    def get_room_summary(self, exclude=()):
+        """방별 {is_private, count} 집계 (레지스트리 색인 기반, 변경이 없으면 캐시 재사용)"""
+        self.registry.expire()
+        return self.registry.room_summary(exclude)
+
+    def get_room_names(self):
+        """활성 피어들이 속한 방 이름 목록"""
+        self.registry.expire()
+        return [name for name in self.registry.rooms() if name]
 
 if __name__ == "__main__":
     # 단독 테스트용 코드
     import sys
     name = sys.argv[1] if len(sys.argv) > 1 else "TestUser"
+    # 첫 피어 발견 지연 측정은 benchmarks/bench_discovery.py 참고
     discovery = PeerDiscovery(nickname=name, tcp_port=50001, room_name="TestRoom", is_private=False)
     discovery.start()
     
@@ -154,6 +541,8 @@ if __name__ == "__main__":
             time.sleep(3)
             print("--- 현재 접속 중인 피어 ---")
             for sid, info in discovery.get_active_peers().items():
-                print(f"{info['ip']} : {info['nickname']} ({sid})")
+                print(f"{info['ip']} : {info['nickname']} ({sid}) via {info.get('local_ip')}")
+            for row in discovery.get_interface_report():
+                print(f"  [{row['name']}] {row['ip']} → {row['broadcast']} sent={row['sent']} err={row['send_errors']} rx={row['received']} peers={row['peers']}")
     except KeyboardInterrupt:
         discovery.stop()
@@ -0,0 +1,157 @@
+import json
+import struct
+from typing import Optional
+
+# 압축 바이너리 디스커버리 패킷
+#   공통 헤더: magic(2) "LC" | version(1) | type(1) | session_id(len1 + bytes)
+#   DISCOVERY: tcp_port(H) | interval(H, 0.1초 단위) | flags(B) | nickname(len1 + utf8) | room_name(len1 + utf8)
+#              [ room_count(B) | (flags(B) | room_name(len1 + utf8)) * room_count ]
+#     뒤쪽 참여 방 목록 블록은 선택 사항. 이전 디코더는 남는 바이트를 무시하므로 호환되며,
+#     블록이 있으면(개수 0 포함) 방 ID 프레임을 이해하는 피어임을 뜻함
+#   flags: bit0 = 대표 방 비공개, bit1 = gossip 중계 참여, bit2 = 메시지 ACK 지원,
+#          bit3 = 한 연결로 여러 프레임 수신 (이전 디코더는 모르는 비트를 무시)
+#   DISCOVERY_PROBE, DISCOVERY_LEAVE: 헤더만
+# 구버전 피어는 JSON만 해석하므로 호환 모드에서는 JSON DISCOVERY도 함께 보냄 (encode_legacy_discovery).
+# 이 패킷에는 LEGACY_COMPAT_FIELD가 붙어 있어, 바이너리 형식을 이해하는 피어는 무시합니다.
+MAGIC = b"LC"
+VERSION = 1
+
+TYPE_DISCOVERY = 1
+TYPE_PROBE = 2
+TYPE_LEAVE = 3
+
+_TYPE_NAMES = {
+    TYPE_DISCOVERY: "DISCOVERY",
+    TYPE_PROBE: "DISCOVERY_PROBE",
+    TYPE_LEAVE: "DISCOVERY_LEAVE",
+}
+
+FLAG_PRIVATE = 0x01
+FLAG_RELAY = 0x02
+FLAG_ACK = 0x04
+FLAG_BATCH = 0x08
+FLAG_ZLIB_CODEC = 0x10  # 압축된 TCP 프레임/청크를 해제할 수 있는 코덱
+FLAG_ZSTD_CODEC = 0x20
+_CODEC_FLAGS = (("zstd", FLAG_ZSTD_CODEC), ("zlib", FLAG_ZLIB_CODEC))  # 선호 순
+MAX_ADVERTISED_ROOMS = 16  # 한 패킷에 싣는 참여 방 수 상한 (UDP 데이터그램 크기 제한)
+LEGACY_COMPAT_FIELD = "compat"  # 바이너리 알림과 함께 보낸 호환용 JSON 알림 표시
+
+_HEADER = struct.Struct("!2sBB")
+_DISCOVERY_BODY = struct.Struct("!HHB")
+
+
+def _pack_str(value: str) -> bytes:
+    raw = (value or "").encode("utf-8")[:255]
+    # 255바이트에서 잘린 경우 깨진 멀티바이트 문자를 제거
+    raw = raw.decode("utf-8", errors="ignore").encode("utf-8")
+    return bytes((len(raw),)) + raw
+
+
+def _unpack_str(data: bytes, offset: int):
+    length = data[offset]
+    start = offset + 1
+    end = start + length
+    if end > len(data):
+        raise ValueError("truncated string field")
+    return data[start:end].decode("utf-8", errors="replace"), end
+
+
+def _header(packet_type: int, session_id: str) -> bytes:
+    return _HEADER.pack(MAGIC, VERSION, packet_type) + _pack_str(session_id)
+
+
+def encode_discovery(session_id: str, nickname: str, tcp_port: int, room_name: str, is_private: bool, interval: float,
+                     rooms=None, relay: bool = False, acks: bool = False,
+                     batch: bool = False, codecs=()) -> bytes:
+    """rooms: 참여 중인 [(방 이름, 비공개 여부), ...]. None이면 목록 블록을 생략 (구버전 형식)
+    relay: gossip 중계 모드로 메시지를 받고 다른 피어에게 전달함
+    acks: 받은 메시지마다 ACK를 돌려주므로 발신측이 전달 여부를 추적할 수 있음
+    batch: 연결이 닫힐 때까지 프레임을 계속 읽으므로 작은 프레임 여러 개를 한 연결로 받을 수 있음
+    codecs: 해제할 수 있는 압축 코덱 이름 ("zlib", "zstd")"""
+    interval_ds = max(1, min(0xFFFF, int(round(interval * 10))))
+    flags = (FLAG_PRIVATE if is_private else 0) | (FLAG_RELAY if relay else 0) | (FLAG_ACK if acks else 0) | (FLAG_BATCH if batch else 0)
+    for codec, flag in _CODEC_FLAGS:
+        if codec in codecs:
+            flags |= flag
+    packet = (
+        _header(TYPE_DISCOVERY, session_id)
+        + _DISCOVERY_BODY.pack(tcp_port & 0xFFFF, interval_ds, flags)
+        + _pack_str(nickname)
+        + _pack_str(room_name)
+    )
+    if rooms is not None:
+        rooms = list(rooms)[:MAX_ADVERTISED_ROOMS]
+        packet += bytes((len(rooms),))
+        for name, private in rooms:
+            packet += bytes((FLAG_PRIVATE if private else 0,)) + _pack_str(name)
+    return packet
+
+
+def encode_legacy_discovery(session_id: str, nickname: str, tcp_port: int, room_name: str, is_private: bool) -> bytes:
+    """구버전(JSON 전용) 피어가 해석하는 DISCOVERY 패킷. 대표 방 하나만 싣습니다."""
+    return json.dumps({
+        "type": "DISCOVERY",
+        "nickname": nickname,
+        "session_id": session_id,
+        "tcp_port": tcp_port,
+        "room_name": room_name,
+        "is_private": is_private,
+        LEGACY_COMPAT_FIELD: True,
+    }).encode("utf-8")
+
+
+def encode_probe(session_id: str) -> bytes:
+    return _header(TYPE_PROBE, session_id)
+
+
+def encode_leave(session_id: str) -> bytes:
+    return _header(TYPE_LEAVE, session_id)
+
+
+def decode_packet(data: bytes) -> Optional[dict]:
+    """바이너리 또는 (구버전) JSON 디스커버리 패킷을 dict로 해석합니다. 알 수 없는 패킷은 None."""
+    if data[:2] == MAGIC:
+        try:
+            _, version, packet_type = _HEADER.unpack_from(data, 0)
+            if version != VERSION or packet_type not in _TYPE_NAMES:
+                return None
+            session_id, offset = _unpack_str(data, _HEADER.size)
+            payload = {"type": _TYPE_NAMES[packet_type], "session_id": session_id}
+            if packet_type == TYPE_DISCOVERY:
+                tcp_port, interval_ds, flags = _DISCOVERY_BODY.unpack_from(data, offset)
+                nickname, offset = _unpack_str(data, offset + _DISCOVERY_BODY.size)
+                room_name, offset = _unpack_str(data, offset)
+                if offset < len(data):
+                    rooms = []
+                    count = data[offset]
+                    offset += 1
+                    for _ in range(count):
+                        room_flags = data[offset]
+                        name, offset = _unpack_str(data, offset + 1)
+                        rooms.append((name, bool(room_flags & FLAG_PRIVATE)))
+                    payload["rooms"] = tuple(rooms)
+                if flags & FLAG_RELAY:
+                    payload["relay"] = True
+                if flags & FLAG_ACK:
+                    payload["acks"] = True
+                if flags & FLAG_BATCH:
+                    payload["batch"] = True
+                codecs = tuple(codec for codec, flag in _CODEC_FLAGS if flags & flag)
+                if codecs:
+                    payload["codecs"] = codecs
+                payload.update({
+                    "tcp_port": tcp_port,
+                    "interval": interval_ds / 10.0,
+                    "is_private": bool(flags & FLAG_PRIVATE),
+                    "nickname": nickname,
+                    "room_name": room_name,
+                })
+            return payload
+        except (struct.error, ValueError, IndexError):
+            return None
+
+    try:
+        payload = json.loads(data.decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return None
+    return payload if isinstance(payload, dict) else None
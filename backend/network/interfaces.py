@@ -0,0 +1,107 @@
+import ipaddress
+import socket
+import struct
+import sys
+from typing import List, NamedTuple, Optional
+
+# Linux ioctl 번호 (netdevice(7))
+_SIOCGIFADDR = 0x8915
+_SIOCGIFNETMASK = 0x891B
+
+_DEFAULT_NETMASK = "255.255.255.0"  # 넷마스크를 알 수 없는 플랫폼에서의 가정값
+
+
+class NetworkInterface(NamedTuple):
+    name: str
+    ip: str
+    netmask: str
+    broadcast: str
+    netmask_guessed: bool = False  # 넷마스크를 조회하지 못해 _DEFAULT_NETMASK로 가정함 (브로드캐스트 주소가 틀릴 수 있음)
+
+    @property
+    def is_loopback(self) -> bool:
+        return self.ip.startswith("127.")
+
+    @property
+    def network(self) -> ipaddress.IPv4Network:
+        return ipaddress.IPv4Network(f"{self.ip}/{self.netmask}", strict=False)
+
+    def contains(self, ip: str) -> bool:
+        try:
+            return ipaddress.IPv4Address(ip) in self.network
+        except ValueError:
+            return False
+
+
+def _make_interface(name: str, ip: str, netmask: Optional[str]) -> NetworkInterface:
+    guessed = netmask is None
+    netmask = netmask or _DEFAULT_NETMASK
+    network = ipaddress.IPv4Network(f"{ip}/{netmask}", strict=False)
+    return NetworkInterface(name, ip, netmask, str(network.broadcast_address), guessed)
+
+
+def _ioctl_addr(sock, request: int, name: str) -> Optional[str]:
+    import fcntl
+
+    try:
+        packed = struct.pack("256s", name.encode("utf-8")[:15])
+        return socket.inet_ntoa(fcntl.ioctl(sock.fileno(), request, packed)[20:24])
+    except OSError:
+        return None
+
+
+def _list_linux() -> List[NetworkInterface]:
+    interfaces = []
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        for _index, name in socket.if_nameindex():
+            ip = _ioctl_addr(sock, _SIOCGIFADDR, name)
+            if not ip:
+                continue  # IPv4 주소가 없는(또는 내려간) 인터페이스
+            interfaces.append(_make_interface(name, ip, _ioctl_addr(sock, _SIOCGIFNETMASK, name)))
+    return interfaces
+
+
+def _list_fallback() -> List[NetworkInterface]:
+    """Windows/macOS 등: 호스트 이름으로 조회한 주소만 사용 (넷마스크는 /24로 가정)"""
+    ips = []
+    try:
+        for info in socket.getaddrinfo(socket.gethostname(), None, socket.AF_INET):
+            ip = info[4][0]
+            if ip not in ips:
+                ips.append(ip)
+    except OSError:
+        pass
+    return [_make_interface(f"if{i}", ip, None) for i, ip in enumerate(ips)]
+
+
+def list_ipv4_interfaces(include_loopback: bool = False) -> List[NetworkInterface]:
+    """이 호스트의 IPv4 인터페이스 목록 (외부망 연결 여부와 무관)"""
+    interfaces: List[NetworkInterface] = []
+    if sys.platform.startswith("linux"):
+        try:
+            interfaces = _list_linux()
+        except (OSError, ImportError, AttributeError):
+            interfaces = []
+    if not interfaces:
+        interfaces = _list_fallback()
+    if not include_loopback:
+        interfaces = [iface for iface in interfaces if not iface.is_loopback]
+    return interfaces
+
+
+def default_route_ip() -> Optional[str]:
+    """기본 라우트가 있으면 그 인터페이스 IP (실제 패킷은 전송되지 않음)"""
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.connect(("8.8.8.8", 80))
+            return s.getsockname()[0]
+    except OSError:
+        return None
+
+
+def interface_for(ip: str, interfaces: List[NetworkInterface]) -> Optional[NetworkInterface]:
+    """ip가 직접 연결된 서브넷에 속하면 그 인터페이스를 반환"""
+    for iface in interfaces:
+        if iface.contains(ip):
+            return iface
+    return None
@@ -0,0 +1,215 @@
+import random
+import threading
+import time
+from typing import Callable, Dict, Mapping, Optional, Set, Tuple
+
+from backend.network.p2p_client import P2PClient
+from backend.utils.logger import get_logger
+
+logger = get_logger("liveness")
+
+HEARTBEAT_INTERVAL = 30.0  # 초 — 조용한 피어도 이 시간 동안 주고받은 것이 없으면 생존 확인 (±50% 지터)
+ACTIVE_HEARTBEAT_INTERVAL = 2.0  # 초 — needs_check가 참인 피어(보낼 것이 밀려 있거나 곧 만료)는 이 간격으로 확인
+HEARTBEAT_TIMEOUT = 1.0  # 초 — 생존 확인 연결 제한 시간 (LAN에서는 수 ms면 충분)
+SUSPECT_PROBE_INTERVAL = 0.5  # 초 — 의심 피어 재확인 간격
+SUSPECT_AFTER_MISSES = 1  # 연속 실패가 이만큼이면 의심 상태 (송신을 즉시 실패 처리)
+DEAD_AFTER_MISSES = 3  # 연속 실패가 이만큼이면 떠난 것으로 보고 디스커버리에서 제거
+MAX_PROBES_IN_FLIGHT = 8
+
+# targets() -> {peer_id: (ip, tcp_port)} — 생존을 확인할 피어 (내가 참여 중인 방의 피어)
+TargetProvider = Callable[[], Mapping[str, Tuple[str, int]]]
+
+
+class _PeerState:
+    __slots__ = ("next_due", "last_seen", "misses", "suspect")
+
+    def __init__(self, next_due: float, last_seen: float):
+        self.next_due = next_due
+        self.last_seen = last_seen
+        self.misses = 0
+        self.suspect = False
+
+
+class PeerLiveness:
+    """TCP 생존 확인.
+
+    - 실제 트래픽을 생존 신호로 씁니다: 송신 성공, 그 피어에게서 온 연결은 record_alive, 송신 실패는 record_failure.
+    - 아무것도 주고받지 않은 피어에게 연결만 맺고 닫는 가벼운 확인을 보냅니다. 방이 조용할 때 피어 수의 제곱으로
+      연결이 늘지 않도록 평소에는 HEARTBEAT_INTERVAL마다, needs_check(peer_id)가 참인 피어(보낼 것이 밀려 있거나
+      디스커버리 신호가 끊겨 곧 만료될 피어)만 ACTIVE_HEARTBEAT_INTERVAL마다 확인합니다.
+    - 연속 실패가 SUSPECT_AFTER_MISSES이면 의심 상태(on_suspect(peer_id, True))가 되어 송신측은 연결 시도 없이 바로
+      실패 처리하고, SUSPECT_PROBE_INTERVAL마다 다시 확인합니다. 응답이 오거나 추적을 멈추면 on_suspect(peer_id, False).
+    - 연속 실패가 DEAD_AFTER_MISSES이면 on_dead(peer_id)를 호출합니다 (디스커버리 만료를 기다리지 않고 제거).
+    """
+
+    def __init__(self, targets: TargetProvider, probe: Callable[[str, int, float], bool] = P2PClient.probe,
+                 on_suspect: Optional[Callable[[str, bool], None]] = None,
+                 on_dead: Optional[Callable[[str], None]] = None,
+                 needs_check: Optional[Callable[[str], bool]] = None,
+                 interval: float = HEARTBEAT_INTERVAL, active_interval: float = ACTIVE_HEARTBEAT_INTERVAL,
+                 timeout: float = HEARTBEAT_TIMEOUT,
+                 suspect_after: int = SUSPECT_AFTER_MISSES, dead_after: int = DEAD_AFTER_MISSES):
+        self.targets = targets
+        self.probe = probe
+        self.on_suspect = on_suspect
+        self.on_dead = on_dead
+        self.needs_check = needs_check
+        self.interval = interval
+        self.active_interval = active_interval
+        self.timeout = timeout
+        self.suspect_after = suspect_after
+        self.dead_after = dead_after
+
+        self._lock = threading.Lock()
+        self._states: Dict[str, _PeerState] = {}
+        self._probing: Set[str] = set()
+        self._wakeup = threading.Event()
+        self._running = False
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        threading.Thread(target=self._loop, name="liveness", daemon=True).start()
+
+    def stop(self):
+        self._running = False
+        self._wakeup.set()
+
+    # ---------- 생존 신호 ----------
+    def record_alive(self, peer_id: str):
+        """피어와 주고받은 트래픽이 있음. 추적 중인 피어만 갱신"""
+        with self._lock:
+            state = self._states.get(peer_id)
+            if state is None:
+                return
+            recovered = state.suspect
+            state.misses = 0
+            state.suspect = False
+            state.last_seen = time.time()
+            state.next_due = self._next_heartbeat()
+        if recovered:
+            logger.info("peer %s is reachable again", peer_id)
+            self._emit_suspect(peer_id, False)
+
+    def record_failure(self, peer_id: str):
+        """피어로의 연결/전송이 실패함"""
+        became_suspect = dead = was_suspect = False
+        with self._lock:
+            state = self._states.get(peer_id)
+            if state is None:
+                state = self._states[peer_id] = _PeerState(0.0, 0.0)
+            state.misses += 1
+            state.next_due = time.time() + SUSPECT_PROBE_INTERVAL
+            if state.misses >= self.dead_after:
+                del self._states[peer_id]
+                dead = True
+                was_suspect = state.suspect
+            elif state.misses >= self.suspect_after and not state.suspect:
+                state.suspect = became_suspect = True
+        if became_suspect:
+            logger.info("peer %s is not responding", peer_id)
+            self._emit_suspect(peer_id, True)
+            self._wakeup.set()
+        if dead:
+            logger.info("peer %s missed %s heartbeats, treating as departed", peer_id, self.dead_after)
+            if was_suspect:
+                self._emit_suspect(peer_id, False)
+            if self.on_dead is not None:
+                try:
+                    self.on_dead(peer_id)
+                except Exception as e:
+                    logger.error("dead callback error (%s): %s", peer_id, e)
+
+    def forget(self, peer_id: str):
+        """피어가 떠났으면 상태 제거"""
+        with self._lock:
+            state = self._states.pop(peer_id, None)
+        if state is not None and state.suspect:
+            self._emit_suspect(peer_id, False)
+
+    def is_suspect(self, peer_id: str) -> bool:
+        state = self._states.get(peer_id)
+        return state is not None and state.suspect
+
+    def suspects(self) -> Set[str]:
+        with self._lock:
+            return {peer_id for peer_id, state in self._states.items() if state.suspect}
+
+    # ---------- 내부 ----------
+    def _next_heartbeat(self) -> float:
+        return time.time() + self.interval * random.uniform(0.5, 1.5)
+
+    def _emit_suspect(self, peer_id: str, suspect: bool):
+        if self.on_suspect is None:
+            return
+        try:
+            self.on_suspect(peer_id, suspect)
+        except Exception as e:
+            logger.error("suspect callback error (%s): %s", peer_id, e)
+
+    def _loop(self):
+        while self._running:
+            self._wakeup.wait(SUSPECT_PROBE_INTERVAL)
+            self._wakeup.clear()
+            if not self._running:
+                return
+            try:
+                targets = self.targets()
+            except Exception as e:
+                logger.error("target lookup error: %s", e)
+                continue
+
+            now = time.time()
+            due = []
+            quiet = []  # 정기 확인 전이지만 ACTIVE_HEARTBEAT_INTERVAL 이상 조용한 피어 — needs_check로 판단
+            dropped = []
+            with self._lock:
+                # 더 이상 같은 방에 있지 않은 피어는 추적 중단
+                for peer_id in [pid for pid in self._states if pid not in targets]:
+                    if self._states.pop(peer_id).suspect:
+                        dropped.append(peer_id)
+                for peer_id, address in targets.items():
+                    state = self._states.get(peer_id)
+                    if state is None:
+                        self._states[peer_id] = _PeerState(self._next_heartbeat(), now)
+                    elif peer_id in self._probing:
+                        continue
+                    elif state.next_due <= now:
+                        due.append((state.next_due, peer_id, address))
+                    elif now - state.last_seen >= self.active_interval:
+                        quiet.append((state.last_seen, peer_id, address))
+
+            # 콜백은 잠금 밖에서 호출 (송신 큐/재전송 큐의 잠금을 잡음)
+            if quiet and self.needs_check is not None:
+                for entry in quiet:
+                    try:
+                        if self.needs_check(entry[1]):
+                            due.append(entry)
+                    except Exception as e:
+                        logger.error("needs_check error (%s): %s", entry[1], e)
+            with self._lock:
+                due = [entry for entry in due if entry[1] in self._states and entry[1] not in self._probing]
+                due.sort()
+                due = due[:max(0, MAX_PROBES_IN_FLIGHT - len(self._probing))]
+                self._probing.update(peer_id for _, peer_id, _ in due)
+
+            for peer_id in dropped:
+                self._emit_suspect(peer_id, False)
+            for _, peer_id, (ip, port) in due:
+                threading.Thread(target=self._probe_task, args=(peer_id, ip, port), daemon=True).start()
+
+    def _probe_task(self, peer_id: str, ip: str, port: int):
+        try:
+            ok = self.probe(ip, port, self.timeout)
+        except Exception:
+            ok = False
+        with self._lock:
+            self._probing.discard(peer_id)
+            tracked = peer_id in self._states
+        if not tracked:
+            return
+        if ok:
+            self.record_alive(peer_id)
+        else:
+            self.record_failure(peer_id)
@@ -0,0 +1,294 @@
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from backend.utils.logger import get_logger
+from backend.utils.metrics import registry as metrics
+
+logger = get_logger("outbox")
+
+DELIVERY_SECONDS = metrics.histogram("lanchat_delivery_seconds", "메시지 제출부터 피어 1명의 확인(ACK)까지 걸린 시간")
+DELIVERIES = metrics.counter("lanchat_deliveries_total", "피어별 메시지 전달 결과", ("result",))
+RETRANSMITS = metrics.counter("lanchat_retransmits_total", "ACK가 없어 다시 보낸 프레임 수")
+
+RETRANSMIT_BASE_DELAY = 0.5  # 초 — 첫 재전송까지의 대기 (이후 2배씩 증가)
+RETRANSMIT_MAX_DELAY = 8.0
+MAX_SEND_ATTEMPTS = 8  # 첫 전송 포함. 약 40초 동안 ACK가 없으면 포기
+MAX_PEER_QUEUE_BYTES = 2 * 1024 * 1024  # 피어 하나가 응답하지 않을 때 쌓아 둘 수 있는 미확인 프레임 총량
+MAX_TOTAL_QUEUE_BYTES = 16 * 1024 * 1024
+DELIVERY_STATE_HISTORY = 1000  # UI가 다시 그릴 때 조회할 수 있도록 남겨 두는 최근 전달 상태 수
+
+# on_state(room_name, msg_id, delivered, total, state)
+#   state: "sending"(ACK 대기 중) | "delivered"(전원 확인) | "failed"(일부 피어 포기)
+DeliveryCallback = Callable[[str, str, int, int, str], None]
+
+
+class _Pending:
+    """ACK를 기다리는 (피어, 메시지) 프레임 1건."""
+
+    __slots__ = ("peer_id", "msg_id", "data", "needs_ack", "attempts", "next_retry", "sending", "done")
+
+    def __init__(self, peer_id: str, msg_id: str, data: bytes, needs_ack: bool):
+        self.peer_id = peer_id
+        self.msg_id = msg_id
+        self.data = data
+        self.needs_ack = needs_ack
+        self.attempts = 0
+        self.next_retry = 0.0
+        self.sending = False  # 송신 큐에 들어가 결과를 기다리는 중
+        self.done = False
+
+
+class _Delivery:
+    __slots__ = ("room_name", "total", "delivered", "failed", "notify", "created")
+
+    def __init__(self, room_name: str, total: int, notify: bool):
+        self.created = time.perf_counter()
+        self.room_name = room_name
+        self.total = total
+        self.delivered = 0
+        self.failed = 0
+        self.notify = notify
+
+    @property
+    def state(self) -> str:
+        if self.delivered + self.failed < self.total:
+            return "sending"
+        return "delivered" if self.failed == 0 else "failed"
+
+
+class ReliableOutbox:
+    """피어별 재전송 큐.
+
+    - 메시지는 피어마다 미확인(pending) 프레임으로 보관하고, ACK가 오면 제거합니다.
+    - 실제 전송은 transmit(송신 큐)에 맡기므로 submit과 재전송 스레드는 네트워크를 기다리지 않습니다.
+    - ACK가 없으면 RETRANSMIT_BASE_DELAY부터 2배씩 늘어나는 간격으로 재전송하고,
+      MAX_SEND_ATTEMPTS를 넘기거나 피어가 떠나면 포기합니다.
+    - ACK를 지원하지 않는 구버전 피어는 TCP 전송 성공을 전달로 간주합니다 (실패 시에만 재전송).
+    - 미확인 프레임은 피어별/전체 바이트 상한을 넘으면 가장 오래된 것부터 포기하므로 메모리가 제한됩니다.
+    - 메시지별 전달 상태(delivered k / total N)를 on_state로 알립니다 (잠금 해제 후 호출).
+    """
+
+    def __init__(self, transmit: Callable[[str, bytes, Callable[[bool], None]], None],
+                 on_state: Optional[DeliveryCallback] = None,
+                 base_delay: float = RETRANSMIT_BASE_DELAY, max_delay: float = RETRANSMIT_MAX_DELAY,
+                 max_attempts: int = MAX_SEND_ATTEMPTS, max_peer_bytes: int = MAX_PEER_QUEUE_BYTES,
+                 max_total_bytes: int = MAX_TOTAL_QUEUE_BYTES):
+        self.transmit = transmit  # (peer_id, data, done) — 1회 전송을 예약하고 끝나면 done(성공 여부) 호출
+        self.on_state = on_state
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.max_peer_bytes = max_peer_bytes
+        self.max_total_bytes = max_total_bytes
+
+        self._cond = threading.Condition()
+        self._queues: Dict[str, "OrderedDict[str, _Pending]"] = {}  # {peer_id: {msg_id: pending}} 오래된 순
+        self._peer_bytes: Dict[str, int] = {}
+        self._total_bytes = 0
+        self._retry_heap: List[Tuple[float, int, _Pending]] = []
+        self._seq = 0
+        self._deliveries: "OrderedDict[str, _Delivery]" = OrderedDict()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._retransmit_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    # ---------- 전송 ----------
+    def submit(self, room_name: str, msg_id: str, frames: Iterable[Tuple[str, bytes, bool]], notify: bool = True) -> int:
+        """frames: [(peer_id, data, needs_ack), ...]의 첫 전송을 예약하고 확인될 때까지 추적합니다.
+
+        notify=False이면 전달 상태 콜백을 호출하지 않습니다 (중계처럼 내 메시지가 아닌 경우).
+        반환: 전송을 예약한 피어 수 (결과는 on_state로 통지)
+        """
+        pendings = [_Pending(peer_id, msg_id, data, needs_ack) for peer_id, data, needs_ack in frames]
+        evicted = []
+        with self._cond:
+            self._deliveries[msg_id] = _Delivery(room_name, len(pendings), notify)
+            self._deliveries.move_to_end(msg_id)
+            while len(self._deliveries) > DELIVERY_STATE_HISTORY:
+                self._deliveries.popitem(last=False)
+            for pending in pendings:
+                self._enqueue_locked(pending)
+                evicted.extend(self._evict_locked(pending.peer_id))
+        self._report(msg_id)
+        for evicted_id in evicted:
+            self._report(evicted_id)
+
+        for pending in pendings:
+            self._attempt(pending)
+        return len(pendings)
+
+    def _attempt(self, pending: _Pending):
+        with self._cond:
+            if pending.done:
+                return  # 예약 전에 ACK가 도착했거나 피어가 떠남
+            pending.sending = True
+            data = pending.data
+            if pending.attempts:
+                RETRANSMITS.inc()
+        try:
+            self.transmit(pending.peer_id, data, lambda ok: self._after_attempt(pending, ok))
+        except Exception as e:
+            logger.warning("transmit error (%s, %s): %s", pending.peer_id, pending.msg_id, e)
+            self._after_attempt(pending, False)
+
+    def _after_attempt(self, pending: _Pending, ok: bool):
+        resolved = None
+        with self._cond:
+            pending.sending = False
+            if pending.done:
+                return  # 전송 중에 ACK가 먼저 도착했거나 피어가 떠남
+            pending.attempts += 1
+            if ok and not pending.needs_ack:
+                resolved = self._resolve_locked(pending, delivered=True)
+            elif pending.attempts >= self.max_attempts:
+                resolved = self._resolve_locked(pending, delivered=False)
+                logger.warning("gave up on %s -> %s after %s attempts", pending.msg_id, pending.peer_id, pending.attempts)
+            else:
+                # 다음 재전송은 이번 전송이 끝난 뒤에만 예약되므로 같은 프레임이 큐에 겹쳐 쌓이지 않음
+                delay = min(self.max_delay, self.base_delay * (2 ** (pending.attempts - 1)))
+                pending.next_retry = time.time() + delay
+                self._seq += 1
+                heapq.heappush(self._retry_heap, (pending.next_retry, self._seq, pending))
+                self._cond.notify()
+        if resolved:
+            self._report(resolved)
+
+    # ---------- 확인 ----------
+    def ack(self, peer_id: str, msg_ids: Iterable[str]):
+        resolved = []
+        with self._cond:
+            queue = self._queues.get(peer_id)
+            if not queue:
+                return
+            for msg_id in msg_ids:
+                pending = queue.get(msg_id)
+                if pending is not None:
+                    resolved.append(self._resolve_locked(pending, delivered=True))
+        for msg_id in resolved:
+            self._report(msg_id)
+
+    def retry_peer(self, peer_id: str):
+        """응답하지 않던 피어가 돌아오면 백오프를 기다리지 않고 남은 프레임을 바로 재전송"""
+        with self._cond:
+            now = time.time()
+            for pending in self._queues.get(peer_id, {}).values():
+                if pending.sending or pending.next_retry <= now:
+                    continue
+                pending.next_retry = now  # 기존 힙 항목은 시각이 달라져 꺼낼 때 건너뜀
+                self._seq += 1
+                heapq.heappush(self._retry_heap, (now, self._seq, pending))
+            self._cond.notify()
+
+    def forget_peer(self, peer_id: str):
+        """피어가 떠났으면 그 피어에게 남은 프레임을 모두 포기 처리"""
+        resolved = []
+        with self._cond:
+            for pending in list(self._queues.get(peer_id, {}).values()):
+                resolved.append(self._resolve_locked(pending, delivered=False))
+        for msg_id in resolved:
+            self._report(msg_id)
+
+    def state(self, msg_id: str) -> Optional[Tuple[int, int, str]]:
+        """(delivered, total, state). 추적 중이 아니면 None"""
+        with self._cond:
+            delivery = self._deliveries.get(msg_id)
+            if delivery is None:
+                return None
+            return delivery.delivered, delivery.total, delivery.state
+
+    def pending_bytes(self, peer_id: Optional[str] = None) -> int:
+        with self._cond:
+            return self._total_bytes if peer_id is None else self._peer_bytes.get(peer_id, 0)
+
+    # ---------- 내부 ----------
+    def _enqueue_locked(self, pending: _Pending):
+        queue = self._queues.setdefault(pending.peer_id, OrderedDict())
+        previous = queue.pop(pending.msg_id, None)
+        if previous is not None:
+            # 같은 메시지를 같은 피어에게 다시 보냄 (다시 보내기 등) — 이전 프레임을 대체하고 바이트를 두 번 세지 않음
+            previous.done = True
+            self._peer_bytes[pending.peer_id] -= len(previous.data)
+            self._total_bytes -= len(previous.data)
+            previous.data = b""
+        queue[pending.msg_id] = pending
+        size = len(pending.data)
+        self._peer_bytes[pending.peer_id] = self._peer_bytes.get(pending.peer_id, 0) + size
+        self._total_bytes += size
+
+    def _evict_locked(self, peer_id: str) -> List[str]:
+        """바이트 상한을 넘으면 가장 오래된 미확인 프레임부터 포기"""
+        evicted = []
+        queue = self._queues.get(peer_id)
+        while queue and self._peer_bytes.get(peer_id, 0) > self.max_peer_bytes:
+            evicted.append(self._resolve_locked(next(iter(queue.values())), delivered=False))
+            queue = self._queues.get(peer_id)
+        while self._total_bytes > self.max_total_bytes and self._queues:
+            # 가장 많이 쌓인 피어에서 제거
+            heaviest = max(self._peer_bytes, key=self._peer_bytes.get)
+            evicted.append(self._resolve_locked(next(iter(self._queues[heaviest].values())), delivered=False))
+        return evicted
+
+    def _resolve_locked(self, pending: _Pending, delivered: bool) -> str:
+        pending.done = True  # 재전송 힙의 항목은 꺼낼 때 건너뜀
+        queue = self._queues.get(pending.peer_id)
+        if queue is not None and queue.pop(pending.msg_id, None) is not None:
+            size = len(pending.data)
+            self._total_bytes -= size
+            remaining = self._peer_bytes.get(pending.peer_id, 0) - size
+            if queue:
+                self._peer_bytes[pending.peer_id] = remaining
+            else:
+                del self._queues[pending.peer_id]
+                self._peer_bytes.pop(pending.peer_id, None)
+        pending.data = b""
+        delivery = self._deliveries.get(pending.msg_id)
+        if delivery is not None:
+            if delivered:
+                delivery.delivered += 1
+                DELIVERY_SECONDS.observe(time.perf_counter() - delivery.created)
+            else:
+                delivery.failed += 1
+        DELIVERIES.inc("delivered" if delivered else "failed")
+        return pending.msg_id
+
+    def _report(self, msg_id: str):
+        callback = self.on_state
+        with self._cond:
+            delivery = self._deliveries.get(msg_id)
+            if delivery is None or not delivery.notify or callback is None:
+                return
+            args = (delivery.room_name, msg_id, delivery.delivered, delivery.total, delivery.state)
+        try:
+            callback(*args)
+        except Exception as e:
+            logger.error("state callback error (%s): %s", msg_id, e)
+
+    def _retransmit_loop(self):
+        while True:
+            with self._cond:
+                while self._running:
+                    while self._retry_heap and (self._retry_heap[0][2].done
+                                                or self._retry_heap[0][0] != self._retry_heap[0][2].next_retry):
+                        heapq.heappop(self._retry_heap)
+                    if self._retry_heap and self._retry_heap[0][0] <= time.time():
+                        break
+                    timeout = self._retry_heap[0][0] - time.time() if self._retry_heap else None
+                    self._cond.wait(timeout=timeout)
+                if not self._running:
+                    return
+                _, _, pending = heapq.heappop(self._retry_heap)
+            self._attempt(pending)
@@ -1,9 +1,23 @@
 import json
 import socket
 import struct
+import time
 
+from backend.core.compression import ChunkCompressor
 from backend.core.security import SessionSecurity
 from backend.utils.file_manager import BandwidthThrottler
+from backend.utils.logger import get_logger
+from backend.utils.metrics import registry as metrics
+
+logger = get_logger("tcp_client")
+transfer_logger = get_logger("file_transfer")
+
+# 송신 계측 — Wi-Fi/네트워크 지연(TCP), 암호화, 디스크 중 어디가 느린지 구분하기 위함
+TCP_SEND_SECONDS = metrics.histogram("lanchat_tcp_send_seconds", "연결부터 전송 완료까지 걸린 시간 (연결 1개)", ("kind",))
+TCP_SENT_BYTES = metrics.counter("lanchat_tcp_sent_bytes_total", "TCP로 실제 전송한 바이트 (길이 헤더·재전송 포함)", ("kind",))
+TCP_SEND_FAILURES = metrics.counter("lanchat_tcp_send_failures_total", "실패한 TCP 전송", ("kind",))
+CODEC_SECONDS = metrics.histogram("lanchat_codec_seconds", "프레임/청크 1개의 압축·암호화·복호화·압축 해제 시간", ("op",))
+DISK_SECONDS = metrics.histogram("lanchat_disk_seconds", "파일 청크 1개의 디스크 읽기/쓰기 시간", ("op",))
 
 
 class P2PClient:
@@ -11,15 +25,46 @@ class P2PClient:
 
     @staticmethod
     def send_data(ip: str, port: int, payload: bytes) -> bool:
+        started = time.perf_counter()
         try:
             with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
                 sock.settimeout(5.0)
                 sock.connect((ip, port))
                 sock.sendall(struct.pack("!I", len(payload)) + payload)
+        except Exception as e:
+            TCP_SEND_FAILURES.inc("frame")
+            logger.warning("send failed (%s:%s): %s", ip, port, e)
+            return False
+        TCP_SEND_SECONDS.observe(time.perf_counter() - started, "frame")
+        TCP_SENT_BYTES.inc("frame", amount=len(payload) + 4)
+        return True
+
+    @staticmethod
+    def probe(ip: str, port: int, timeout: float = 1.0) -> bool:
+        """연결만 맺고 바로 닫아 피어의 TCP 서버가 응답하는지 확인 (수신측은 빈 연결로 보고 무시)"""
+        try:
+            with socket.create_connection((ip, port), timeout=timeout):
                 return True
+        except OSError:
+            return False
+
+    @staticmethod
+    def send_frames(ip: str, port: int, payloads: list[bytes]) -> bool:
+        """여러 프레임을 연결 하나로 이어서 전송 (수신측이 연결이 닫힐 때까지 프레임을 읽는 피어 전용)"""
+        started = time.perf_counter()
+        data = b"".join(struct.pack("!I", len(payload)) + payload for payload in payloads)
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+                sock.settimeout(5.0)
+                sock.connect((ip, port))
+                sock.sendall(data)
         except Exception as e:
-            print(f"[TCP Client] send failed ({ip}:{port}): {e}")
+            TCP_SEND_FAILURES.inc("batch")
+            logger.warning("batch send failed (%s:%s, %s frames): %s", ip, port, len(payloads), e)
             return False
+        TCP_SEND_SECONDS.observe(time.perf_counter() - started, "batch")
+        TCP_SENT_BYTES.inc("batch", amount=len(data))
+        return True
 
     @staticmethod
     def send_file_stream(
@@ -31,6 +76,8 @@ class P2PClient:
         throttler: BandwidthThrottler,
         expected_size: int | None = None,
         expected_sha256: str | None = None,
+        frame_prefix: bytes = b"",
+        chunk_codec: str | None = None,
     ) -> bool:
         try:
             with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
@@ -43,21 +90,39 @@ class P2PClient:
                     "expected_size": expected_size,
                     "expected_sha256": expected_sha256,
                 }
-                enc_header = security.encrypt(json.dumps(header).encode("utf-8"))
+                # chunk_codec: 수신측과 합의한 압축 코덱. 알린 경우 모든 청크 앞에 코덱 플래그가 붙음 (구버전 수신측에는 None)
+                compressor = None
+                if chunk_codec:
+                    header["chunk_codec"] = chunk_codec
+                    compressor = ChunkCompressor(chunk_codec)
+                # frame_prefix: 수신측이 방별 키를 고르도록 헤더 프레임 앞에 붙이는 방 ID (후속 청크는 같은 방으로 처리됨)
+                enc_header = frame_prefix + security.encrypt(json.dumps(header).encode("utf-8"))
                 sock.sendall(struct.pack("!I", len(enc_header)) + enc_header)
 
+                sent = 4 + len(enc_header)
                 chunk_size = 65536
                 with open(filepath, "rb") as f:
                     while True:
+                        t0 = time.perf_counter()
                         raw_chunk = f.read(chunk_size)
+                        t1 = time.perf_counter()
+                        DISK_SECONDS.observe(t1 - t0, "read")
                         if not raw_chunk:
                             break
 
+                        if compressor is not None:
+                            raw_chunk = compressor.pack(raw_chunk)
+                            t0, t1 = t1, time.perf_counter()
+                            CODEC_SECONDS.observe(t1 - t0, "compress")
                         enc_chunk = security.encrypt(raw_chunk)
+                        CODEC_SECONDS.observe(time.perf_counter() - t1, "encrypt")
                         throttler.wait_for_tokens(len(enc_chunk))
                         sock.sendall(struct.pack("!I", len(enc_chunk)) + enc_chunk)
+                        sent += 4 + len(enc_chunk)
 
+                TCP_SENT_BYTES.inc("stream", amount=sent)
                 return True
         except Exception as e:
-            print(f"[File Transfer] stream send error: {e}")
+            TCP_SEND_FAILURES.inc("stream")
+            transfer_logger.warning("stream send error: %s", e)
             return False
@@ -1,13 +1,93 @@
+import queue
 import socket
 import threading
+import time
+
+from backend.utils.logger import get_logger
+
+logger = get_logger("tcp_server")
+
+DEFAULT_BACKLOG = 128  # listen() 대기열 — 피어가 동시에 몰려도 SYN이 버려지지 않을 정도
+DEFAULT_HANDLER_WORKERS = 16  # 수신 연결을 처리하는 고정 스레드 수
+MAX_PENDING_CONNECTIONS = 256  # 워커를 기다리는 수락된 연결 수 상한 (넘으면 즉시 닫음)
+MAX_CONNECTIONS_PER_IP = 8  # 한 IP가 동시에 점유할 수 있는 연결 수 (대기 + 처리 중)
+IP_CONNECT_RATE = 20.0  # 초당 — IP별 새 연결 허용 속도 (토큰 버킷 보충 속도)
+IP_CONNECT_BURST = 50  # IP별 순간 허용량 (토큰 버킷 크기)
+DEFAULT_INFLIGHT_BYTES = 128 * 1024 * 1024  # 모든 연결이 동시에 들고 있을 수 있는 수신 프레임 버퍼 총량
+
+
+class InflightBudget:
+    """수신 중인 프레임 버퍼의 전체 메모리 예산.
+
+    프레임 길이를 읽은 뒤 본문을 받기 전에 acquire하고 처리가 끝나면 release합니다.
+    예산이 모자라면 잠시 기다렸다가 그래도 없으면 False를 반환하므로, 호출자는 그 연결을 끊어
+    부하가 몰려도 메모리 대신 연결을 버리게 됩니다.
+    """
+
+    def __init__(self, limit: int = DEFAULT_INFLIGHT_BYTES):
+        self.limit = limit
+        self.in_use = 0
+        self.peak = 0
+        self.rejected = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, size: int, timeout: float = 1.0) -> bool:
+        if size > self.limit:
+            with self._cond:
+                self.rejected += 1
+            return False
+        deadline = time.time() + timeout
+        with self._cond:
+            while self.in_use + size > self.limit:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    self.rejected += 1
+                    return False
+                self._cond.wait(remaining)
+            self.in_use += size
+            self.peak = max(self.peak, self.in_use)
+            return True
+
+    def release(self, size: int):
+        if size <= 0:
+            return
+        with self._cond:
+            self.in_use -= size
+            self._cond.notify_all()
+
+
+class _TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, now: float):
+        self.tokens = float(IP_CONNECT_BURST)
+        self.updated = now
+
 
 class P2PServer:
-    """수신용 단독 TCP 서버. 동적 포트 할당 기능을 포함합니다."""
-    def __init__(self, host='0.0.0.0', start_port=50001, max_port=50100):
+    """수신용 단독 TCP 서버. 동적 포트 할당 기능을 포함합니다.
+
+    수락한 연결은 고정 크기 워커 풀이 처리하며, IP별 동시 연결 수와 연결 속도(토큰 버킷)를 넘거나
+    대기열이 가득 차면 처리하지 않고 바로 닫습니다. 스레드 수는 부하와 무관하게 일정합니다.
+    """
+    def __init__(self, host='0.0.0.0', start_port=50001, max_port=50100, backlog: int = DEFAULT_BACKLOG,
+                 handler_workers: int = DEFAULT_HANDLER_WORKERS, max_per_ip: int = MAX_CONNECTIONS_PER_IP,
+                 ip_rate: float = IP_CONNECT_RATE):
         self.host = host
         self.port = start_port
+        self.backlog = backlog
+        self.handler_workers = handler_workers
+        self.max_per_ip = max_per_ip
+        self.ip_rate = ip_rate
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.running = False
+
+        self._pending = queue.Queue(maxsize=MAX_PENDING_CONNECTIONS)
+        self._admission_lock = threading.Lock()
+        self._active_per_ip = {}  # {ip: 대기 + 처리 중 연결 수}
+        self._buckets = {}  # {ip: _TokenBucket}
+        self._buckets_swept_at = time.time()
+        self.stats = {"accepted": 0, "rejected_rate": 0, "rejected_ip_limit": 0, "rejected_overload": 0}
         
         # 포트 동적 할당 로직 (Port Fallback)
         bound = False
@@ -23,7 +103,7 @@ class P2PServer:
         if not bound:
             raise RuntimeError(f"사용 가능한 TCP 포트를 찾을 수 없습니다. ({start_port}~{max_port})")
             
-        print(f"[TCP Server] 바인딩 성공 (Port: {self.port})")
+        logger.info("바인딩 성공 (Port: %s)", self.port)
 
     def start(self, connection_callback):
         """
@@ -31,8 +111,10 @@ class P2PServer:
         형태: def callback(client_sock, addr): ...
         """
         self.running = True
-        self.server_socket.listen(10)
-        self.thread = threading.Thread(target=self._accept_loop, args=(connection_callback,), daemon=True)
+        self.server_socket.listen(self.backlog)
+        for _ in range(self.handler_workers):
+            threading.Thread(target=self._handler_loop, args=(connection_callback,), daemon=True).start()
+        self.thread = threading.Thread(target=self._accept_loop, daemon=True)
         self.thread.start()
 
     def stop(self):
@@ -41,14 +123,115 @@ class P2PServer:
             self.server_socket.close()
         except:
             pass
+        # 대기 중인 연결을 닫고 워커를 깨워 종료시킴
+        while True:
+            try:
+                item = self._pending.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                self._close(item[0])
+        for _ in range(self.handler_workers):
+            try:
+                self._pending.put_nowait(None)
+            except queue.Full:
+                break
+
+    def get_stats(self) -> dict:
+        with self._admission_lock:
+            stats = dict(self.stats)
+            stats["active"] = sum(self._active_per_ip.values())
+        stats["queued"] = self._pending.qsize()
+        return stats
+
+    @staticmethod
+    def _close(sock):
+        try:
+            sock.close()
+        except OSError:
+            pass
 
-    def _accept_loop(self, callback):
+    def _admit(self, ip: str, now: float):
+        """연결 수락 여부 판정. 허용하면 None, 아니면 거절 사유(stats 키)를 반환"""
+        with self._admission_lock:
+            if self._active_per_ip.get(ip, 0) >= self.max_per_ip:
+                return "rejected_ip_limit"
+            bucket = self._buckets.get(ip)
+            if bucket is None:
+                bucket = self._buckets[ip] = _TokenBucket(now)
+            bucket.tokens = min(float(IP_CONNECT_BURST), bucket.tokens + (now - bucket.updated) * self.ip_rate)
+            bucket.updated = now
+            if bucket.tokens < 1.0:
+                return "rejected_rate"
+            bucket.tokens -= 1.0
+            self._active_per_ip[ip] = self._active_per_ip.get(ip, 0) + 1
+            # 가득 찬 채로 오래 쓰이지 않은 버킷은 정리 (스푸핑된 다수 IP로 인한 메모리 증가 방지)
+            if now - self._buckets_swept_at > 60:
+                idle = IP_CONNECT_BURST / self.ip_rate
+                self._buckets = {
+                    key: b for key, b in self._buckets.items()
+                    if now - b.updated < idle or key in self._active_per_ip
+                }
+                self._buckets_swept_at = now
+            return None
+
+    def _release(self, ip: str):
+        with self._admission_lock:
+            count = self._active_per_ip.get(ip, 0) - 1
+            if count > 0:
+                self._active_per_ip[ip] = count
+            else:
+                self._active_per_ip.pop(ip, None)
+
+    def _reject(self, client_sock, reason: str):
+        with self._admission_lock:
+            self.stats[reason] += 1
+            count = self.stats[reason]
+        self._close(client_sock)
+        # 폭주 중 로그가 넘치지 않도록 처음과 이후 1000건마다만 출력
+        if count == 1 or count % 1000 == 0:
+            logger.warning("연결 거절 (%s, 누적 %s건)", reason, count)
+
+    def _accept_loop(self):
         while self.running:
             try:
                 client_sock, addr = self.server_socket.accept()
-                # 수락된 소켓은 상위 로직(콜백)으로 넘겨서 데이터 수신을 처리
-                if callback:
-                    threading.Thread(target=callback, args=(client_sock, addr), daemon=True).start()
             except Exception as e:
                 if self.running:
-                    print(f"[TCP Server] 수락 대기 오류: {e}")
+                    logger.warning("수락 대기 오류: %s", e)
+                    time.sleep(0.05)  # 파일 디스크립터 고갈 등으로 accept가 계속 실패할 때 바쁜 루프 방지
+                continue
+
+            reason = self._admit(addr[0], time.time())
+            if reason is not None:
+                self._reject(client_sock, reason)
+                continue
+            try:
+                # 수락된 소켓은 워커 풀로 넘겨서 데이터 수신을 처리
+                self._pending.put_nowait((client_sock, addr))
+            except queue.Full:
+                self._release(addr[0])
+                self._reject(client_sock, "rejected_overload")
+                continue
+            with self._admission_lock:
+                self.stats["accepted"] += 1
+
+    def _handler_loop(self, callback):
+        while True:
+            item = self._pending.get()
+            if item is None or not self.running:
+                if item is not None:
+                    self._release(item[1][0])
+                    self._close(item[0])
+                return
+            client_sock, addr = item
+            try:
+                if callback:
+                    callback(client_sock, addr)
+                else:
+                    self._close(client_sock)
+            except Exception as e:
+                logger.warning("연결 처리 오류 (%s): %s", addr, e)
+                self._close(client_sock)
+            finally:
+                self._release(addr[0])
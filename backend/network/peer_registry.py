@@ -0,0 +1,276 @@
+import heapq
+import threading
+import time
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, NamedTuple, Optional, Set, Tuple
+
+from backend.utils.logger import get_logger
+
+logger = get_logger("peer_registry")
+
+# listener(event, session_id, info, previous) — event: "join" | "update" | "leave"
+PeerListener = Callable[[str, str, Mapping, Optional[Mapping]], None]
+# room_listener(event, room_name, entry) — event: "room_added" | "room_changed" | "room_removed"
+#   entry: {"is_private": bool, "count": int} (room_removed이면 None)
+RoomListener = Callable[[str, str, Optional[Mapping]], None]
+
+
+def peer_rooms(info: Mapping) -> Tuple[Tuple[str, bool], ...]:
+    """피어가 참여 중인 ((방 이름, 비공개 여부), ...). 방 목록을 광고하지 않는 구버전 피어는 room_name 하나"""
+    rooms = info.get("rooms")
+    if rooms is None:
+        return ((info.get("room_name", ""), bool(info.get("is_private", False))),)
+    return rooms
+
+
+class PeerSnapshot(NamedTuple):
+    """특정 시점의 피어 테이블. version이 같으면 내용도 같으므로 호출자는 작업을 건너뛸 수 있습니다."""
+
+    version: int
+    peers: Mapping[str, Mapping]
+
+
+class PeerRegistry:
+    """스레드 안전 피어 테이블.
+
+    - session_id 조회, 방/ip 별 조회는 인덱스를 통해 O(1) (여러 방에 참여한 피어는 각 방에 색인)
+    - 만료는 (deadline, session_id) 최소 힙으로 처리하여 만료된 피어만 O(log n)에 제거
+    - 피어 정보는 읽기 전용 매핑으로 보관하고, 구성원/속성이 바뀔 때만 version을 올림
+      (단순 생존 신호 갱신은 version을 바꾸지 않음)
+    - 구성원 변화는 등록된 listener에게 즉시 join/update/leave 이벤트로 통지 (잠금 해제 후 호출)
+    - 방별 인원/비공개 여부는 증분으로 유지하고, 실제로 바뀐 방만 room listener에게 델타로 통지
+    """
+
+    def __init__(self, default_ttl: float = 10.0):
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._peers: Dict[str, Mapping] = {}
+        self._deadlines: Dict[str, float] = {}
+        self._ttls: Dict[str, float] = {}  # 마지막 갱신 때 적용한 만료 시간 (lease 조회용)
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._by_room: Dict[str, Set[str]] = {}
+        self._by_ip: Dict[str, Set[str]] = {}
+        self._room_private: Dict[str, int] = {}  # {room_name: 비공개로 광고한 구성원 수}
+        self._room_state: Dict[str, Mapping] = {}  # 마지막으로 통지한 방별 entry
+        self._touched_rooms: Set[str] = set()
+        self._version = 0
+        self._snapshot = PeerSnapshot(0, MappingProxyType({}))
+        self._room_summary = (-1, MappingProxyType({}))
+        self._listeners: List[PeerListener] = []
+        self._room_listeners: List[RoomListener] = []
+
+    def add_listener(self, listener: PeerListener):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: PeerListener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def add_room_listener(self, listener: RoomListener):
+        self._room_listeners.append(listener)
+
+    def remove_room_listener(self, listener: RoomListener):
+        if listener in self._room_listeners:
+            self._room_listeners.remove(listener)
+
+    def _emit_rooms(self, deltas):
+        for event, room_name, entry in deltas:
+            for listener in list(self._room_listeners):
+                try:
+                    listener(event, room_name, entry)
+                except Exception as e:
+                    logger.error("room listener error (%s, %s): %s", event, room_name, e)
+
+    def _emit(self, events):
+        for event, session_id, info, previous in events:
+            for listener in list(self._listeners):
+                try:
+                    listener(event, session_id, info, previous)
+                except Exception as e:
+                    logger.error("listener error (%s, %s): %s", event, session_id, e)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    # ---------- 갱신 ----------
+    def upsert(self, session_id: str, info: dict, ttl: Optional[float] = None, now: Optional[float] = None) -> str:
+        """피어 정보를 기록합니다. 반환값: "join" | "update" | "refresh"(변경 없음)"""
+        now = time.time() if now is None else now
+        deadline = now + (ttl if ttl is not None else self.default_ttl)
+        frozen = None
+        with self._lock:
+            old = self._peers.get(session_id)
+            if old is not None and dict(old) == info:
+                change = "refresh"
+            else:
+                if old is not None:
+                    self._unindex(session_id, old)
+                frozen = MappingProxyType(dict(info))
+                self._peers[session_id] = frozen
+                self._index(session_id, frozen)
+                self._version += 1
+                change = "join" if old is None else "update"
+
+            self._deadlines[session_id] = deadline
+            self._ttls[session_id] = deadline - now
+            heapq.heappush(self._expiry_heap, (deadline, session_id))
+            room_deltas = self._collect_room_deltas()
+
+        if frozen is not None:
+            self._emit([(change, session_id, frozen, old)])
+        if room_deltas:
+            self._emit_rooms(room_deltas)
+        return change
+
+    def remove(self, session_id: str) -> Optional[Mapping]:
+        with self._lock:
+            info = self._remove_locked(session_id)
+            room_deltas = self._collect_room_deltas()
+        if info is not None:
+            self._emit([("leave", session_id, info, info)])
+        if room_deltas:
+            self._emit_rooms(room_deltas)
+        return info
+
+    def expire(self, now: Optional[float] = None) -> Dict[str, Mapping]:
+        """deadline이 지난 피어를 제거하고 {session_id: 마지막 정보}를 반환합니다."""
+        now = time.time() if now is None else now
+        expired = {}
+        with self._lock:
+            heap = self._expiry_heap
+            while heap and heap[0][0] <= now:
+                deadline, session_id = heapq.heappop(heap)
+                # 이후 갱신으로 deadline이 늘어난 항목은 지연 삭제된 힙 엔트리이므로 무시
+                if self._deadlines.get(session_id) != deadline:
+                    continue
+                info = self._remove_locked(session_id)
+                if info is not None:
+                    expired[session_id] = info
+            room_deltas = self._collect_room_deltas()
+        if expired:
+            self._emit([("leave", sid, info, info) for sid, info in expired.items()])
+        if room_deltas:
+            self._emit_rooms(room_deltas)
+        return expired
+
+    def next_deadline(self) -> Optional[float]:
+        with self._lock:
+            while self._expiry_heap and self._deadlines.get(self._expiry_heap[0][1]) != self._expiry_heap[0][0]:
+                heapq.heappop(self._expiry_heap)
+            return self._expiry_heap[0][0] if self._expiry_heap else None
+
+    # ---------- 조회 ----------
+    def lease(self, session_id: str) -> Optional[Tuple[float, float]]:
+        """(만료 시각, 마지막 갱신 때의 만료 시간) — 신호가 끊긴 피어를 만료 전에 알아보는 용도"""
+        with self._lock:
+            deadline = self._deadlines.get(session_id)
+            return (deadline, self._ttls[session_id]) if deadline is not None else None
+
+    def get(self, session_id: str) -> Optional[Mapping]:
+        return self._peers.get(session_id)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._peers
+
+    def __len__(self) -> int:
+        return len(self._peers)
+
+    def in_room(self, room_name: str) -> Dict[str, Mapping]:
+        with self._lock:
+            return {sid: self._peers[sid] for sid in self._by_room.get(room_name, ())}
+
+    def at_ip(self, ip: str) -> Dict[str, Mapping]:
+        with self._lock:
+            return {sid: self._peers[sid] for sid in self._by_ip.get(ip, ())}
+
+    def rooms(self) -> List[str]:
+        with self._lock:
+            return list(self._by_room)
+
+    def room_entry(self, room_name: str) -> Optional[Mapping]:
+        """방 하나의 {"is_private", "count"}. 구성원이 없으면 None"""
+        with self._lock:
+            return self._room_entry_locked(room_name)
+
+    def room_summary(self, exclude=()) -> Mapping[str, Mapping]:
+        """방별 집계 {room_name: {"is_private": bool, "count": int}}. 증분 상태에서 만들고 version 단위로 캐시합니다."""
+        version, summary = self._room_summary
+        if version != self._version:
+            with self._lock:
+                summary = MappingProxyType(
+                    {name: self._room_entry_locked(name) for name in self._by_room if name}
+                )
+                self._room_summary = (self._version, summary)
+        if exclude:
+            return {name: info for name, info in summary.items() if name not in exclude}
+        return summary
+
+    def snapshot(self) -> PeerSnapshot:
+        """읽기 전용 스냅샷. 내용이 바뀌었을 때만 새로 만들고, 그 외에는 캐시된 객체를 반환합니다."""
+        snap = self._snapshot
+        if snap.version == self._version:
+            return snap
+        with self._lock:
+            if self._snapshot.version != self._version:
+                self._snapshot = PeerSnapshot(self._version, MappingProxyType(dict(self._peers)))
+            return self._snapshot
+
+    # ---------- 내부 ----------
+    def _room_entry_locked(self, room_name: str) -> Optional[Mapping]:
+        members = self._by_room.get(room_name)
+        if not room_name or not members:
+            return None
+        return MappingProxyType({"is_private": self._room_private.get(room_name, 0) > 0, "count": len(members)})
+
+    def _collect_room_deltas(self) -> list:
+        """이번 갱신으로 건드린 방 중 집계가 실제로 바뀐 방만 (event, room_name, entry)로 반환"""
+        deltas = []
+        for room_name in self._touched_rooms:
+            entry = self._room_entry_locked(room_name)
+            old = self._room_state.get(room_name)
+            if entry == old:
+                continue
+            if entry is None:
+                del self._room_state[room_name]
+                deltas.append(("room_removed", room_name, None))
+            else:
+                self._room_state[room_name] = entry
+                deltas.append(("room_added" if old is None else "room_changed", room_name, entry))
+        self._touched_rooms.clear()
+        return deltas
+
+    def _index(self, session_id: str, info: Mapping):
+        for room_name, private in peer_rooms(info):
+            self._by_room.setdefault(room_name, set()).add(session_id)
+            if private:
+                self._room_private[room_name] = self._room_private.get(room_name, 0) + 1
+            self._touched_rooms.add(room_name)
+        self._by_ip.setdefault(info.get("ip", ""), set()).add(session_id)
+
+    def _unindex(self, session_id: str, info: Mapping):
+        for room_name, private in peer_rooms(info):
+            if private:
+                remaining = self._room_private.get(room_name, 0) - 1
+                if remaining > 0:
+                    self._room_private[room_name] = remaining
+                else:
+                    self._room_private.pop(room_name, None)
+            self._touched_rooms.add(room_name)
+        keys = [(self._by_room, room_name) for room_name, _ in peer_rooms(info)]
+        keys.append((self._by_ip, info.get("ip", "")))
+        for index, key in keys:
+            members = index.get(key)
+            if members is not None:
+                members.discard(session_id)
+                if not members:
+                    del index[key]
+
+    def _remove_locked(self, session_id: str) -> Optional[Mapping]:
+        info = self._peers.pop(session_id, None)
+        self._deadlines.pop(session_id, None)
+        self._ttls.pop(session_id, None)
+        if info is not None:
+            self._unindex(session_id, info)
+            self._version += 1
+        return info
@@ -0,0 +1,197 @@
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from backend.network.p2p_client import P2PClient
+from backend.utils.logger import get_logger
+
+logger = get_logger("send_queue")
+
+SEND_WORKERS = 4  # 송신 스레드 수 (부하와 무관하게 고정)
+MAX_BATCH_FRAMES = 64  # 한 연결에 이어 보낼 최대 프레임 수
+MAX_BATCH_BYTES = 256 * 1024
+BACKPRESSURE_HIGH = 512 * 1024  # 피어 하나에 이만큼 쌓이면 느린 피어로 표시
+BACKPRESSURE_LOW = 128 * 1024  # 이 아래로 빠지면 해제
+
+# resolve(peer_id) -> (ip, port, 연결 하나에 여러 프레임 수신 가능 여부) 또는 None(피어 없음)
+PeerResolver = Callable[[str], Optional[Tuple[str, int, bool]]]
+# on_backpressure(peer_id, congested)
+BackpressureCallback = Callable[[str, bool], None]
+# on_result(peer_id, ok) — 실제로 연결을 시도한 전송의 결과 (주소가 없어 보내지 않은 경우는 제외)
+ResultCallback = Callable[[str, bool], None]
+
+
+class PeerSendQueue:
+    """피어별 순서 보장 송신 큐.
+
+    - 고정된 워커 스레드가 피어 큐를 하나씩 맡아 처리하므로, 한 피어에게 가는 프레임은 넣은 순서대로 전송되고
+      송신이 몰려도 스레드 수가 늘지 않습니다.
+    - 워커는 피어 큐에 쌓인 프레임을 최대 MAX_BATCH_FRAMES/MAX_BATCH_BYTES까지 모아 연결 하나로 보냅니다
+      (수신측이 이를 지원한다고 광고한 경우). 연결 수립 비용이 메시지마다가 아니라 묶음마다 듭니다.
+      묶음마다 연결이 다르고 수신측은 연결을 여러 워커가 동시에 읽으므로, 연결 사이의 순서는 수신측이
+      인과 순서 버퍼와 방별 전달 대기열(P2PEngine._drain_dispatch)로 복원합니다.
+    - 피어 하나에 BACKPRESSURE_HIGH 이상 쌓이면 on_backpressure(peer_id, True), LOW 아래로 빠지면 False를 알립니다.
+    - 각 프레임의 전송 결과는 submit에 넘긴 done(성공 여부)으로 통지합니다 (워커 스레드에서 호출).
+    - resolve가 None을 반환하면(피어가 없거나 응답하지 않는 피어) 연결을 시도하지 않고 바로 실패 처리합니다.
+    """
+
+    def __init__(self, resolve: PeerResolver, workers: int = SEND_WORKERS,
+                 on_backpressure: Optional[BackpressureCallback] = None,
+                 on_result: Optional[ResultCallback] = None):
+        self.resolve = resolve
+        self.worker_count = workers
+        self.on_backpressure = on_backpressure
+        self.on_result = on_result
+
+        self._cond = threading.Condition()
+        self._queues: Dict[str, Deque[Tuple[bytes, Optional[Callable[[bool], None]]]]] = {}
+        self._bytes: Dict[str, int] = {}
+        self._ready: Deque[str] = deque()  # 보낼 프레임이 있고 어느 워커도 맡지 않은 피어
+        self._busy: Set[str] = set()
+        self._congested: Set[str] = set()
+        self._running = False
+        self._workers: List[threading.Thread] = []
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        for i in range(self.worker_count):
+            thread = threading.Thread(target=self._worker_loop, name=f"send-worker-{i}", daemon=True)
+            thread.start()
+            self._workers.append(thread)
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._queues.clear()
+            self._bytes.clear()
+            self._ready.clear()
+            self._cond.notify_all()
+
+    def submit(self, peer_id: str, data: bytes, done: Optional[Callable[[bool], None]] = None):
+        """프레임을 피어 큐 끝에 넣고 바로 반환합니다."""
+        congested = False
+        with self._cond:
+            if not self._running:
+                rejected = True
+            else:
+                rejected = False
+                queue = self._queues.get(peer_id)
+                if queue is None:
+                    queue = self._queues[peer_id] = deque()
+                queue.append((data, done))
+                total = self._bytes.get(peer_id, 0) + len(data)
+                self._bytes[peer_id] = total
+                if total >= BACKPRESSURE_HIGH and peer_id not in self._congested:
+                    self._congested.add(peer_id)
+                    congested = True
+                if peer_id not in self._busy and len(queue) == 1:
+                    self._ready.append(peer_id)
+                    self._cond.notify()
+        if rejected:
+            if done is not None:
+                done(False)
+            return
+        if congested:
+            self._emit_backpressure(peer_id, True)
+
+    def drop_peer(self, peer_id: str):
+        """떠난 피어에게 남은 프레임을 실패로 처리"""
+        with self._cond:
+            queue = self._queues.pop(peer_id, None)
+            self._bytes.pop(peer_id, None)
+            relieved = peer_id in self._congested
+            self._congested.discard(peer_id)
+        for _data, done in queue or ():
+            if done is not None:
+                done(False)
+        if relieved:
+            self._emit_backpressure(peer_id, False)
+
+    def queued_bytes(self, peer_id: Optional[str] = None) -> int:
+        with self._cond:
+            return sum(self._bytes.values()) if peer_id is None else self._bytes.get(peer_id, 0)
+
+    def is_congested(self, peer_id: str) -> bool:
+        return peer_id in self._congested
+
+    def _emit_backpressure(self, peer_id: str, congested: bool):
+        if self.on_backpressure is None:
+            return
+        try:
+            self.on_backpressure(peer_id, congested)
+        except Exception as e:
+            logger.error("backpressure callback error (%s): %s", peer_id, e)
+
+    def _take_batch(self, peer_id: str, can_batch: bool) -> list:
+        """(잠금 보유 상태에서 호출) 피어 큐 앞쪽에서 한 번에 보낼 프레임을 꺼냄"""
+        queue = self._queues.get(peer_id)
+        batch = []
+        size = 0
+        while queue:
+            data, done = queue[0]
+            if batch and (not can_batch or len(batch) >= MAX_BATCH_FRAMES or size + len(data) > MAX_BATCH_BYTES):
+                break
+            queue.popleft()
+            batch.append((data, done))
+            size += len(data)
+        return batch
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                while self._running and not self._ready:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                peer_id = self._ready.popleft()
+                self._busy.add(peer_id)
+
+            target = self.resolve(peer_id)
+            can_batch = bool(target and target[2])
+            with self._cond:
+                batch = self._take_batch(peer_id, can_batch)
+
+            if not batch:
+                ok = False
+            elif target is None:
+                ok = False
+            elif len(batch) == 1:
+                ok = P2PClient.send_data(target[0], target[1], batch[0][0])
+            else:
+                ok = P2PClient.send_frames(target[0], target[1], [data for data, _ in batch])
+
+            if batch and target is not None and self.on_result is not None:
+                try:
+                    self.on_result(peer_id, ok)
+                except Exception as e:
+                    logger.error("result callback error (%s): %s", peer_id, e)
+
+            relieved = False
+            with self._cond:
+                self._busy.discard(peer_id)
+                sent = sum(len(data) for data, _ in batch)
+                remaining = self._bytes.get(peer_id, 0) - sent
+                queue = self._queues.get(peer_id)
+                if queue:
+                    self._bytes[peer_id] = remaining
+                    self._ready.append(peer_id)
+                    self._cond.notify()
+                else:
+                    self._queues.pop(peer_id, None)
+                    self._bytes.pop(peer_id, None)
+                    remaining = 0
+                if remaining < BACKPRESSURE_LOW and peer_id in self._congested:
+                    self._congested.discard(peer_id)
+                    relieved = True
+
+            for _data, done in batch:
+                if done is not None:
+                    try:
+                        done(ok)
+                    except Exception as e:
+                        logger.error("completion callback error (%s): %s", peer_id, e)
+            if relieved:
+                self._emit_backpressure(peer_id, False)
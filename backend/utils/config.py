@@ -1,6 +1,10 @@
 import os
 import json
 
+from backend.utils.logger import get_logger
+
+logger = get_logger("config")
+
 CONFIG_FILE = "config.json"
 
 class AppConfig:
@@ -8,6 +12,16 @@ class AppConfig:
     def __init__(self):
         self.nickname = ""
         self.port = 50000
+        # 라우터를 넘는 랩 네트워크 등에서 사용할 디스커버리 멀티캐스트 그룹 (빈 값이면 브로드캐스트만 사용)
+        self.multicast_group = ""
+        self.multicast_ttl = 1
+        # 큰 방용 gossip 중계: 메시지 1건을 relay_fanout명에게만 보내고 받은 피어가 다시 전달 (0이면 모두에게 직접 전송)
+        self.relay_fanout = 0
+        self.relay_ttl = 6
+        # 수신 TCP 서버의 listen() 대기열 크기
+        self.tcp_backlog = 128
+        # 구버전(JSON 디스커버리만 이해하는) 피어에게도 보이도록 호환용 JSON 알림을 함께 보냄. 모두 업그레이드되면 끌 수 있음
+        self.legacy_discovery = True
         self.load()
 
     def load(self):
@@ -17,19 +31,31 @@ class AppConfig:
                     data = json.load(f)
                     self.nickname = data.get("nickname", self.nickname)
                     self.port = data.get("port", self.port)
+                    self.multicast_group = data.get("multicast_group", self.multicast_group)
+                    self.multicast_ttl = data.get("multicast_ttl", self.multicast_ttl)
+                    self.relay_fanout = data.get("relay_fanout", self.relay_fanout)
+                    self.relay_ttl = data.get("relay_ttl", self.relay_ttl)
+                    self.tcp_backlog = data.get("tcp_backlog", self.tcp_backlog)
+                    self.legacy_discovery = data.get("legacy_discovery", self.legacy_discovery)
             except Exception as e:
-                print(f"[Config] 설정 파일 읽기 오류: {e}")
+                logger.warning("설정 파일 읽기 오류: %s", e)
 
     def save(self):
         data = {
             "nickname": self.nickname,
-            "port": self.port
+            "port": self.port,
+            "multicast_group": self.multicast_group,
+            "multicast_ttl": self.multicast_ttl,
+            "relay_fanout": self.relay_fanout,
+            "relay_ttl": self.relay_ttl,
+            "tcp_backlog": self.tcp_backlog,
+            "legacy_discovery": self.legacy_discovery
         }
         try:
             with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=4)
         except Exception as e:
-            print(f"[Config] 설정 파일 저장 오류: {e}")
+            logger.warning("설정 파일 저장 오류: %s", e)
 
 # 전역 싱글톤 설정 객체
 global_config = AppConfig()
@@ -1,7 +1,6 @@
 import hashlib
 import os
 import time
-import zipfile
 
 
 class BandwidthThrottler:
@@ -51,6 +50,8 @@ class FileManager:
             name = os.path.basename(file_path)
             return {"is_zip": False, "target_path": file_path, "name": name, "size": size}
 
+        import zipfile  # 폴더/다중 파일 공유에서만 필요하므로 시작 시간에 포함하지 않음
+
         with zipfile.ZipFile(output_zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
             for path in paths:
                 if os.path.isfile(path):
@@ -68,6 +69,8 @@ class FileManager:
 
     @staticmethod
     def extract_zip(zip_path: str, extract_dir: str):
+        import zipfile
+
         abs_extract_dir = os.path.realpath(extract_dir)
         with zipfile.ZipFile(zip_path, "r") as zipf:
             for member in zipf.namelist():
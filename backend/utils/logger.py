@@ -0,0 +1,238 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+ROOT_LOGGER = "lanchat"
+LOG_LEVEL_ENV = "LANCHAT_LOG_LEVEL"  # 전체 기본 레벨 (debug/info/warning/error, 기본 info)
+LOG_LEVELS_ENV = "LANCHAT_LOG_LEVELS"  # 카테고리별 레벨 (예: "discovery=debug,tcp_client=error")
+LOG_FORMAT_ENV = "LANCHAT_LOG_FORMAT"  # "text"(기본, "[Engine] ..." 형식) 또는 "json"(한 줄에 하나씩)
+
+LOG_QUEUE_SIZE = 10000  # 출력 스레드가 밀리면 이보다 많은 기록은 버리고 건수만 알림 (네트워크 스레드를 막지 않음)
+REPEAT_WINDOW = 10.0  # 초 — 같은 메시지(같은 형식 문자열)의 반복을 세는 구간
+REPEAT_BURST = 5  # 구간마다 같은 메시지를 이만큼까지만 출력하고 나머지는 생략 건수로 합침
+_MAX_REPEAT_KEYS = 1024
+
+# 카테고리 → 출력 태그. 기존 print("[Engine] ...") 출력과 같은 모양을 유지
+CATEGORIES = {
+    "engine": "Engine",
+    "discovery": "Discovery",
+    "peer_registry": "PeerRegistry",
+    "tcp_server": "TCP Server",
+    "tcp_client": "TCP Client",
+    "file_transfer": "File Transfer",
+    "send_queue": "SendQueue",
+    "outbox": "Outbox",
+    "liveness": "Liveness",
+    "events": "Events",
+    "event": "Event",
+    "control_api": "ControlAPI",
+    "headless": "Headless",
+    "config": "Config",
+    "metrics": "Metrics",
+    "startup": "Startup",
+    "ui": "UIController",
+}
+
+
+class RepeatFilter(logging.Filter):
+    """같은 로거·레벨·형식 문자열의 기록을 REPEAT_WINDOW마다 REPEAT_BURST건까지만 통과시킴.
+
+    발견 오류 루프나 히스토리 폭주처럼 같은 오류가 초당 수백 번 나는 상황에서 출력 비용이 그 코드를 더 느리게
+    만들지 않도록 하기 위함. 생략한 건수는 다음 구간에 처음 통과하는 기록의 suppressed 속성으로 알립니다.
+    호출 스레드에서 실행되므로 형식 문자열(record.msg)만 보고 판단하며 인자는 포맷하지 않습니다.
+    """
+
+    def __init__(self, window: float = REPEAT_WINDOW, burst: int = REPEAT_BURST):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._seen: Dict[tuple, list] = {}  # {(logger, level, msg): [구간 시작, 통과 수, 생략 수]}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            state = self._seen.get(key)
+            if state is None or now - state[0] >= self.window:
+                suppressed = state[2] if state is not None else 0
+                if state is None and len(self._seen) >= _MAX_REPEAT_KEYS:
+                    self._prune(now)
+                self._seen[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if state[1] < self.burst:
+                state[1] += 1
+                return True
+            state[2] += 1
+            return False
+
+    def _prune(self, now: float):
+        for key in [k for k, state in self._seen.items() if now - state[0] >= self.window]:
+            del self._seen[key]
+        if len(self._seen) >= _MAX_REPEAT_KEYS:
+            self._seen.clear()
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차면 기다리지 않고 버림. 버린 건수는 다음에 들어가는 기록의 dropped 속성으로 알림"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self._dropped = 0
+        self._dropped_lock = threading.Lock()  # 여러 스레드가 동시에 로그를 남겨도 버린 건수가 어긋나지 않도록
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 같은 프로세스 안의 큐이므로 기본 구현처럼 호출 스레드에서 Formatter를 돌리지 않고,
+        # 인자만 문자열로 합쳐 (이후 변경되는 객체를 참조하지 않도록) 출력 스레드로 넘김
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        with self._dropped_lock:
+            if self._dropped:
+                record.dropped, dropped = self._dropped, self._dropped
+            else:
+                dropped = 0
+            try:
+                self.queue.put_nowait(record)
+                self._dropped -= dropped
+            except queue.Full:
+                self._dropped += 1
+
+
+def _tag(record: logging.LogRecord) -> str:
+    category = record.name[len(ROOT_LOGGER) + 1:] if record.name.startswith(ROOT_LOGGER + ".") else record.name
+    return CATEGORIES.get(category, category)
+
+
+def _notes(record: logging.LogRecord) -> str:
+    notes = []
+    if getattr(record, "suppressed", 0):
+        notes.append(f"같은 메시지 {record.suppressed}건 생략")
+    if getattr(record, "dropped", 0):
+        notes.append(f"출력 지연으로 기록 {record.dropped}건 버림")
+    return f" ({', '.join(notes)})" if notes else ""
+
+
+class TextFormatter(logging.Formatter):
+    """[Engine] message — WARNING 이상은 레벨을 함께 표시"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        level = f"{record.levelname}: " if record.levelno >= logging.WARNING else ""
+        text = f"[{_tag(record)}] {level}{record.getMessage()}{_notes(record)}"
+        if record.exc_info:
+            text += "\n" + self.formatException(record.exc_info)
+        return text
+
+
+class JsonFormatter(logging.Formatter):
+    """수집기용 한 줄 JSON: ts, level, category, thread, message (+ suppressed/dropped/exc)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": record.created,
+            "level": record.levelname.lower(),
+            "category": record.name[len(ROOT_LOGGER) + 1:] or ROOT_LOGGER,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for key in ("suppressed", "dropped"):
+            if getattr(record, key, 0):
+                entry[key] = getattr(record, key)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+_handler: Optional[_NonBlockingQueueHandler] = None
+
+
+def _parse_level(value, default=logging.INFO) -> int:
+    if value is None or value == "":
+        return default
+    if isinstance(value, int):
+        return value
+    level = logging.getLevelName(str(value).strip().upper())
+    return level if isinstance(level, int) else default
+
+
+def configure(level=None, levels: Optional[Dict[str, str]] = None, fmt: Optional[str] = None, stream=None):
+    """로깅 설정 (다시 호출하면 교체). 인자가 없으면 LANCHAT_LOG_* 환경변수, 그 외 기본값(info, text, stderr)
+
+    각 모듈은 get_logger(카테고리)만 호출하면 되고, 설정하지 않았으면 첫 사용 시 기본값으로 설정됩니다.
+    """
+    with _lock:
+        _configure_locked(level, levels, fmt, stream)
+
+
+def _configure_locked(level, levels, fmt, stream):
+    global _listener, _handler
+    _shutdown_locked()
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(_parse_level(level if level is not None else os.environ.get(LOG_LEVEL_ENV)))
+    root.propagate = False
+    if levels is None:
+        levels = {}
+        for item in os.environ.get(LOG_LEVELS_ENV, "").split(","):
+            name, _, value = item.partition("=")
+            if name.strip() and value.strip():
+                levels[name.strip()] = value.strip()
+    for category, value in levels.items():
+        logging.getLogger(f"{ROOT_LOGGER}.{category}").setLevel(_parse_level(value, logging.NOTSET))
+
+    fmt = fmt or os.environ.get(LOG_FORMAT_ENV) or "text"
+    stream = stream if stream is not None else sys.stderr
+    # PyInstaller --noconsole 빌드에서는 sys.stderr가 None
+    output = logging.StreamHandler(stream) if stream is not None else logging.NullHandler()
+    output.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+    # 호출 스레드는 큐에 넣기만 하고, 실제 출력(콘솔/파이프 쓰기)은 별도 스레드가 담당
+    log_queue = queue.Queue(LOG_QUEUE_SIZE)
+    _handler = _NonBlockingQueueHandler(log_queue)
+    _handler.addFilter(RepeatFilter())
+    root.addHandler(_handler)
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+
+
+def _shutdown_locked():
+    global _listener, _handler
+    if _handler is not None:
+        logging.getLogger(ROOT_LOGGER).removeHandler(_handler)
+        _handler = None
+    if _listener is not None:
+        try:
+            _listener.stop()  # 남은 기록을 모두 출력한 뒤 종료
+        except queue.Full:
+            pass
+        _listener = None
+
+
+def shutdown():
+    """남은 기록을 출력하고 출력 스레드 종료 (프로세스 종료 시 자동 호출)"""
+    with _lock:
+        _shutdown_locked()
+
+
+def get_logger(category: str) -> logging.Logger:
+    """카테고리(CATEGORIES의 키) 로거. 레벨은 configure/LANCHAT_LOG_LEVELS로 카테고리별 조정 가능"""
+    if _handler is None:
+        with _lock:
+            if _handler is None:
+                _configure_locked(None, None, None, None)
+    return logging.getLogger(f"{ROOT_LOGGER}.{category}")
+
+
+atexit.register(shutdown)
@@ -0,0 +1,385 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from backend.utils.logger import get_logger
+
+logger = get_logger("metrics")
+
+METRICS_PORT_ENV = "LANCHAT_METRICS_PORT"  # 지정하면 127.0.0.1:<port>/metrics 로 Prometheus 텍스트 노출
+METRICS_FILE_ENV = "LANCHAT_METRICS_FILE"  # 지정하면 이 경로에 주기적으로 JSON 스냅샷 기록
+METRICS_INTERVAL_ENV = "LANCHAT_METRICS_INTERVAL"  # JSON 기록 주기(초)
+DEFAULT_DUMP_INTERVAL = 10.0
+DEFAULT_METRICS_HOST = "127.0.0.1"
+
+# 기본 히스토그램 구간
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+                   2.5, 5.0)  # 초
+COUNT_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+THROUGHPUT_BUCKETS = (64 * 1024, 256 * 1024, 1024 ** 2, 4 * 1024 ** 2, 16 * 1024 ** 2, 64 * 1024 ** 2,
+                      256 * 1024 ** 2, 1024 ** 3)  # 바이트/초
+
+_START = time.time()
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _label_pairs(self, values: Tuple) -> Dict[str, str]:
+        return dict(zip(self.labels, (str(v) for v in values)))
+
+
+class Counter(_Metric):
+    """단조 증가 값. 라벨 값은 위치 인자로 (예: frames_sent.inc("MESSAGE"))"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def values(self) -> Dict[Tuple, float]:
+        with self._lock:
+            return dict(self._values)
+
+
+class Histogram(_Metric):
+    """구간별 관측 수 + 합계/개수/최댓값. p50/p95는 구간 상한으로 근사"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple, list] = {}  # {라벨: [구간별 개수(+Inf 포함), 합계, 개수, 최댓값]}
+
+    def observe(self, value: float, *label_values):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            state = self._values.get(label_values)
+            if state is None:
+                state = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0, 0.0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+            if value > state[3]:
+                state[3] = value
+
+    def time(self, *label_values) -> "_Timer":
+        """with hist.time("encrypt"): ... — 블록 실행 시간을 초 단위로 기록"""
+        return _Timer(self, label_values)
+
+    def values(self) -> Dict[Tuple, tuple]:
+        with self._lock:
+            return {labels: (list(state[0]), state[1], state[2], state[3]) for labels, state in self._values.items()}
+
+    def _quantile(self, counts: list, total: int, q: float, peak: float) -> float:
+        """버킷 상한으로 근사한 분위수 (관측 최댓값을 넘지 않음)"""
+        target = total * q
+        seen = 0
+        for i, count in enumerate(counts):
+            seen += count
+            if seen >= target:
+                return min(self.buckets[i], peak) if i < len(self.buckets) else peak
+        return peak
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: Histogram, labels: Tuple):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *_exc):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+        return False
+
+
+class Gauge(_Metric):
+    """조회 시점에 함수로 읽는 값. 함수는 숫자 또는 {라벨 값 튜플: 숫자}를 반환"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (), fn: Optional[Callable] = None):
+        super().__init__(name, help_text, labels)
+        self.fn = fn
+
+    def values(self) -> Dict[Tuple, float]:
+        fn = self.fn
+        if fn is None:
+            return {}
+        try:
+            value = fn()
+        except Exception as e:
+            logger.warning("gauge %s failed: %s", self.name, e)
+            return {}
+        if isinstance(value, dict):
+            return {labels if isinstance(labels, tuple) else (labels,): v for labels, v in value.items()}
+        return {(): value}
+
+
+class MetricsRegistry:
+    """프로세스 전체의 계측 값. 같은 이름으로 다시 등록하면 기존 객체를 돌려줌 (엔진을 여러 번 만들어도 누적)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"metric {name} already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help_text, labels)
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, labels, buckets)
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str] = (), fn: Optional[Callable] = None) -> Gauge:
+        """fn을 주면 (마지막으로 등록한) 그 함수로 값을 읽음"""
+        gauge = self._get_or_create(Gauge, name, help_text, labels)
+        if fn is not None:
+            gauge.fn = fn
+        return gauge
+
+    def unset_gauge(self, name: str, fn: Callable):
+        """fn이 아직 그 게이지의 함수이면 해제 (엔진 종료 시)"""
+        with self._lock:
+            gauge = self._metrics.get(name)
+        if isinstance(gauge, Gauge) and gauge.fn == fn:
+            gauge.fn = None
+
+    def metrics(self):
+        with self._lock:
+            return sorted(self._metrics.values(), key=lambda m: m.name)
+
+    def snapshot(self) -> dict:
+        """JSON으로 직렬화 가능한 현재 값.
+
+        {"ts", "uptime", "metrics": {이름: 값}} — 라벨이 없으면 숫자, 있으면 {"라벨값[,라벨값]": 값}.
+        히스토그램 값은 {"count", "sum", "mean", "max", "p50", "p95"}.
+        """
+        result = {}
+        for metric in self.metrics():
+            entries = {}
+            for labels, value in metric.values().items():
+                if isinstance(metric, Histogram):
+                    counts, total, count, peak = value
+                    value = {
+                        "count": count,
+                        "sum": total,
+                        "mean": total / count if count else 0.0,
+                        "max": peak,
+                        "p50": metric._quantile(counts, count, 0.5, peak),
+                        "p95": metric._quantile(counts, count, 0.95, peak),
+                    }
+                entries[",".join(str(v) for v in labels)] = value
+            if not entries:
+                continue
+            result[metric.name] = entries[""] if not metric.labels and "" in entries else entries
+        now = time.time()
+        return {"ts": now, "uptime": now - _START, "metrics": result}
+
+    def prometheus_text(self) -> str:
+        """Prometheus 텍스트 노출 형식 (0.0.4)"""
+        lines = []
+        for metric in self.metrics():
+            values = metric.values()
+            if not values:
+                continue
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.help)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for labels, value in sorted(values.items(), key=lambda item: tuple(str(v) for v in item[0])):
+                pairs = metric._label_pairs(labels)
+                if isinstance(metric, Histogram):
+                    counts, total, count, _peak = value
+                    cumulative = 0
+                    for bound, bucket_count in zip(metric.buckets + (float("inf"),), counts):
+                        cumulative += bucket_count
+                        le = "+Inf" if bound == float("inf") else repr(float(bound))
+                        lines.append(f"{metric.name}_bucket{_format_labels(dict(pairs, le=le))} {cumulative}")
+                    lines.append(f"{metric.name}_sum{_format_labels(pairs)} {_format_value(total)}")
+                    lines.append(f"{metric.name}_count{_format_labels(pairs)} {count}")
+                else:
+                    lines.append(f"{metric.name}{_format_labels(pairs)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(pairs: Dict[str, str]) -> str:
+    if not pairs:
+        return ""
+    escaped = (
+        f'{key}="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for key, value in pairs.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+registry = MetricsRegistry()
+
+# 공통 게이지 — 어느 진입점에서든 같은 값
+registry.gauge("lanchat_threads", "실행 중인 스레드 수", fn=threading.active_count)
+
+
+class MetricsDumper:
+    """interval마다 스냅샷을 path에 JSON으로 기록 (임시 파일에 쓴 뒤 교체하므로 읽는 쪽이 반쯤 쓴 파일을 보지 않음).
+
+    카운터는 직전 기록 이후 초당 증가량을 "rates"에 함께 기록합니다 (예: 디스커버리 패킷 속도).
+    """
+
+    def __init__(self, path: str, interval: float = DEFAULT_DUMP_INTERVAL, metrics: MetricsRegistry = registry):
+        self.path = path
+        self.interval = max(0.5, float(interval))
+        self.metrics = metrics
+        self._stop = threading.Event()
+        self._previous = None  # (ts, {이름: {라벨: 값}})
+
+    def start(self):
+        threading.Thread(target=self._loop, name="metrics-dump", daemon=True).start()
+        logger.info("writing JSON snapshots to %s every %ss", self.path, self.interval)
+
+    def stop(self):
+        self._stop.set()
+        self.dump()
+
+    def dump(self):
+        snapshot = self.metrics.snapshot()
+        counters = {
+            metric.name: {",".join(str(v) for v in labels): value for labels, value in metric.values().items()}
+            for metric in self.metrics.metrics()
+            if isinstance(metric, Counter)
+        }
+        if self._previous is not None:
+            prev_ts, prev_counters = self._previous
+            elapsed = max(1e-6, snapshot["ts"] - prev_ts)
+            snapshot["rates"] = {
+                name: {labels: (value - prev_counters.get(name, {}).get(labels, 0)) / elapsed
+                       for labels, value in entries.items()}
+                for name, entries in counters.items()
+            }
+        self._previous = (snapshot["ts"], counters)
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning("metrics dump failed (%s): %s", self.path, e)
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.dump()
+
+
+class MetricsServer:
+    """GET /metrics (Prometheus 텍스트), GET /metrics.json (스냅샷)만 제공하는 읽기 전용 HTTP 서버. 기본은 127.0.0.1"""
+
+    def __init__(self, port: int, host: str = DEFAULT_METRICS_HOST, metrics: MetricsRegistry = registry):
+        self.host = host
+        self.port = port
+        self.metrics = metrics
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def start(self):
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path == "/metrics":
+                    body = metrics.prometheus_text().encode("utf-8")
+                    content_type = "text/plain; version=0.0.4; charset=utf-8"
+                elif path == "/metrics.json":
+                    body = json.dumps(metrics.snapshot(), ensure_ascii=False, default=str).encode("utf-8")
+                    content_type = "application/json; charset=utf-8"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *_args):
+                pass  # 스크레이프마다 접근 로그를 남기지 않음
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        logger.info("serving http://%s:%s/metrics", self.host, self.port)
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def start_exporters(port: int = 0, dump_path: Optional[str] = None, interval: float = DEFAULT_DUMP_INTERVAL) -> list:
+    """설정된 내보내기(HTTP, JSON 파일)를 시작하고 목록을 반환. 종료 시 각각 stop() 호출"""
+    exporters = []
+    if port:
+        server = MetricsServer(port)
+        try:
+            server.start()
+            exporters.append(server)
+        except OSError as e:
+            logger.warning("metrics endpoint unavailable on port %s: %s", port, e)
+    if dump_path:
+        dumper = MetricsDumper(dump_path, interval)
+        dumper.start()
+        exporters.append(dumper)
+    return exporters
+
+
+def start_exporters_from_env() -> list:
+    """LANCHAT_METRICS_PORT / LANCHAT_METRICS_FILE / LANCHAT_METRICS_INTERVAL로 start_exporters 호출"""
+    try:
+        port = int(os.environ.get(METRICS_PORT_ENV) or 0)
+        interval = float(os.environ.get(METRICS_INTERVAL_ENV) or DEFAULT_DUMP_INTERVAL)
+    except ValueError as e:
+        logger.warning("ignoring invalid metrics setting: %s", e)
+        return []
+    return start_exporters(port, os.environ.get(METRICS_FILE_ENV) or None, interval)
@@ -0,0 +1,41 @@
+import time
+
+_T0 = time.perf_counter()  # main.py가 가장 먼저 import하므로 사실상 인터프리터 초기화 직후 (다른 import보다 먼저 측정)
+
+import os
+import threading
+
+from backend.utils.logger import get_logger
+
+logger = get_logger("startup")
+
+STARTUP_TIMING_ENV = "LANCHAT_STARTUP_TIMING"  # 1이면 시작 단계별 소요 시간을 출력
+
+
+class StartupTimer:
+    """콜드 스타트 단계별 시간 측정.
+
+    mark(phase)는 (어느 스레드든) 직전 mark부터의 구간 시간과 시작 후 경과 시간을 기록하고,
+    활성화되어 있으면 바로 출력합니다. UI 스레드와 네트워크 시작 스레드가 함께 호출하므로 잠금을 사용합니다.
+    PyInstaller --onefile의 압축 해제 시간은 인터프리터 시작 전이라 여기에 포함되지 않습니다.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._last = _T0
+        self.phases = []  # [(phase, 구간 ms, 누적 ms, 스레드 이름)]
+
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        with self._lock:
+            step = (now - self._last) * 1000
+            total = (now - _T0) * 1000
+            self._last = now
+            thread = threading.current_thread().name
+            self.phases.append((phase, step, total, thread))
+        if self.enabled:
+            logger.info("%8.1f ms  +%7.1f ms  %s [%s]", total, step, phase, thread)
+
+
+timer = StartupTimer(enabled=os.environ.get(STARTUP_TIMING_ENV, "") not in ("", "0"))
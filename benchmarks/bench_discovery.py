@@ -0,0 +1,124 @@
+"""디스커버리 첫 피어 발견 지연 측정.
+
+    python benchmarks/bench_discovery.py                      # 기존 피어 1개, 10회
+    python benchmarks/bench_discovery.py --runs 30 --existing 3 --port 50090
+
+기존 피어(--existing개)를 먼저 띄워 알림 주기가 최대치로 늘어날 때까지 기다린 뒤(--settle),
+새 피어를 띄웠다 내리기를 --runs회 반복합니다. 매 회차마다
+- 새 피어가 기존 피어를 처음 발견하기까지 (DISCOVERY_PROBE 응답 경로)
+- 새 피어가 기존 피어 전부를 발견하기까지
+- 기존 피어가 새 피어를 발견하기까지 (새 피어의 첫 알림)
+걸린 시간을 재고 최소/중앙값/최대를 출력합니다.
+실제 LAN과 섞이지 않도록 앱 기본값(50000)이 아닌 UDP 포트를 사용하며, 같은 PC의 루프백/브로드캐스트로
+주고받으므로 네트워크 지연은 포함되지 않습니다. 로그는 LANCHAT_LOG_LEVEL=warning으로 줄일 수 있습니다.
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.network.discovery import PeerDiscovery  # noqa: E402
+
+
+def _watch(discovery: PeerDiscovery, session_ids, started: float):
+    """session_ids 각각의 join 시각(started 기준)을 기록하는 리스너를 등록"""
+    seen = {}
+    done = threading.Event()
+    lock = threading.Lock()
+
+    def listener(event, session_id, *_):
+        if event != "join" or session_id not in session_ids:
+            return
+        with lock:
+            seen.setdefault(session_id, time.perf_counter() - started)
+            if len(seen) == len(session_ids):
+                done.set()
+
+    discovery.add_listener(listener)
+    return seen, done, listener
+
+
+def _run_once(existing, args):
+    started = time.perf_counter()
+    newcomer = PeerDiscovery(nickname="newcomer", tcp_port=0, room_name="Bench", port=args.port)
+    found, found_all, listener = _watch(newcomer, {peer.session_id for peer in existing}, started)
+
+    watchers = []
+    for peer in existing:
+        seen, done, peer_listener = _watch(peer, {newcomer.session_id}, started)
+        watchers.append((peer, seen, done, peer_listener))
+
+    newcomer.start()
+    found_all.wait(args.timeout)
+    for _, _, done, _ in watchers:
+        done.wait(max(0.0, args.timeout - (time.perf_counter() - started)))
+
+    newcomer.remove_listener(listener)
+    newcomer.stop()
+    seen_by_existing = []
+    for peer, seen, _, peer_listener in watchers:
+        peer.remove_listener(peer_listener)
+        seen_by_existing.extend(seen.values())
+        # 다음 회차 전에 기존 피어 목록에서 새 피어가 빠질 때까지 대기 (DISCOVERY_LEAVE)
+        deadline = time.time() + args.timeout
+        while peer.get_peer(newcomer.session_id) is not None and time.time() < deadline:
+            time.sleep(0.01)
+
+    first = min(found.values()) if found else None
+    last = max(found.values()) if len(found) == len(existing) else None
+    seen_by = max(seen_by_existing) if len(seen_by_existing) == len(existing) else None
+    return first, last, seen_by
+
+
+def _report(name: str, samples, runs: int):
+    values = [value for value in samples if value is not None]
+    missed = runs - len(values)
+    if not values:
+        print(f"  {name:<28} 발견 실패 {missed}회")
+        return
+    print(
+        f"  {name:<28} 최소 {min(values) * 1000:8.1f} ms  중앙값 {statistics.median(values) * 1000:8.1f} ms  "
+        f"최대 {max(values) * 1000:8.1f} ms" + (f"  (시간 초과 {missed}회)" if missed else "")
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="새 피어를 띄워 측정할 횟수")
+    parser.add_argument("--existing", type=int, default=1, help="미리 띄워 둘 기존 피어 수")
+    parser.add_argument("--port", type=int, default=50090, help="디스커버리 UDP 포트")
+    parser.add_argument("--settle", type=float, default=8.0, help="기존 피어의 알림 주기가 늘어나도록 기다릴 시간 (초)")
+    parser.add_argument("--gap", type=float, default=0.5, help="회차 사이 대기 시간 (초)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="회차별 발견 제한 시간 (초)")
+    args = parser.parse_args(argv)
+
+    existing = [
+        PeerDiscovery(nickname=f"existing{i}", tcp_port=0, room_name="Bench", port=args.port)
+        for i in range(args.existing)
+    ]
+    for peer in existing:
+        peer.start()
+    print(f"기존 피어 {args.existing}개, 알림 주기 안정화 {args.settle:.1f}초 대기 (UDP {args.port})")
+    time.sleep(args.settle)
+
+    results = []
+    try:
+        for _ in range(args.runs):
+            results.append(_run_once(existing, args))
+            time.sleep(args.gap)
+    finally:
+        for peer in existing:
+            peer.stop()
+
+    print(f"{args.runs}회 측정")
+    _report("새 피어 → 첫 기존 피어 발견", [r[0] for r in results], args.runs)
+    _report("새 피어 → 기존 피어 전부 발견", [r[1] for r in results], args.runs)
+    _report("기존 피어 → 새 피어 발견", [r[2] for r in results], args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""gossip 중계 모드의 메시지 전파 모의 측정 (방 인원별 직접 전송 vs gossip 중계).
+
+    python benchmarks/bench_gossip.py                      # fanout 5, ttl 6
+    python benchmarks/bench_gossip.py --fanout 3 --ttl 8 --sizes 50 100 500
+
+각 노드가 연결을 하나씩 순서대로 맺는다고 보고 메시지 1건이 방 전체로 퍼지는 과정을 이벤트 단위로
+모의 실행하여, 방 인원별 수신 비율, 지연(평균/p95/최대), 수신자 1명당 전송 수(중복), 발신자의 전송 수를
+출력합니다. 실제 네트워크는 쓰지 않습니다.
+"""
+import argparse
+import heapq
+import os
+import random
+import sys
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.core.gossip import DEFAULT_RELAY_FANOUT, DEFAULT_RELAY_TTL  # noqa: E402
+
+
+def simulate_broadcast(room_size: int, fanout: int = 0, ttl: int = DEFAULT_RELAY_TTL, send_cost: float = 0.005,
+                       link_latency: float = 0.002, trials: int = 50, seed: Optional[int] = None) -> Dict[str, float]:
+    """방 인원 room_size에서 메시지 1건이 퍼지는 과정을 이벤트 단위로 모의 실행합니다.
+
+    각 노드는 연결을 하나씩 순서대로 맺으므로 송신 1건마다 send_cost만큼 바쁘고,
+    도착까지 link_latency(±50% 지터)가 더해집니다. fanout=0이면 발신자가 모두에게 직접 보냅니다.
+    반환: coverage(수신 비율), latency_mean/p95/max(초), redundancy(수신자 1명당 전송 수), sender_sends
+    """
+    rng = random.Random(seed)
+    receivers = room_size - 1
+    latencies: List[float] = []
+    coverage = transmissions = sender_sends = 0
+
+    for _ in range(trials):
+        busy_until = [0.0] * room_size
+        received_at: Dict[int, float] = {0: 0.0}
+        events: List[Tuple[float, int, int, int]] = []  # (도착 시각, 수신 노드, 남은 ttl, 보낸 노드)
+
+        def send(node: int, now: float, targets, next_ttl: int):
+            nonlocal transmissions
+            start = max(now, busy_until[node])
+            for target in targets:
+                start += send_cost
+                arrival = start + link_latency * rng.uniform(0.5, 1.5)
+                heapq.heappush(events, (arrival, target, next_ttl, node))
+                transmissions += 1
+            busy_until[node] = start
+
+        others = list(range(1, room_size))
+        if fanout <= 0 or receivers <= fanout:
+            send(0, 0.0, others, 0)
+            sender_sends += receivers
+        else:
+            send(0, 0.0, rng.sample(others, fanout), ttl)
+            sender_sends += fanout
+
+        while events:
+            now, node, remaining, sender = heapq.heappop(events)
+            if node in received_at:
+                continue  # msg_id 중복 — 다시 전달하지 않음
+            received_at[node] = now
+            if remaining > 0:
+                candidates = [n for n in range(1, room_size) if n != node and n != sender]
+                send(node, now, rng.sample(candidates, min(fanout, len(candidates))), remaining - 1)
+
+        coverage += len(received_at) - 1
+        latencies.extend(t for n, t in received_at.items() if n != 0)
+
+    latencies.sort()
+    total = receivers * trials
+    return {
+        "coverage": coverage / total if total else 1.0,
+        "latency_mean": sum(latencies) / len(latencies) if latencies else 0.0,
+        "latency_p95": latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0,
+        "latency_max": latencies[-1] if latencies else 0.0,
+        "redundancy": transmissions / coverage if coverage else 0.0,
+        "sender_sends": sender_sends / trials,
+    }
+
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fanout", type=int, default=DEFAULT_RELAY_FANOUT, help="gossip 모드의 전달 피어 수")
+    parser.add_argument("--ttl", type=int, default=DEFAULT_RELAY_TTL, help="최대 전달 홉 수")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 10, 25, 50, 100, 200], help="모의 실행할 방 인원")
+    parser.add_argument("--send-cost", type=float, default=0.005, help="송신 1건당 노드가 바쁜 시간(초)")
+    parser.add_argument("--link-latency", type=float, default=0.002, help="평균 전달 지연(초)")
+    parser.add_argument("--trials", type=int, default=50, help="방 인원별 반복 횟수")
+    args = parser.parse_args(argv)
+
+    print(f"send_cost={args.send_cost * 1000:g}ms link={args.link_latency * 1000:g}ms, "
+          f"gossip fanout={args.fanout} ttl={args.ttl}")
+    print(f"{'size':>5} {'mode':>7} {'coverage':>9} {'mean(ms)':>9} {'p95(ms)':>8} {'max(ms)':>8} {'redund':>7} {'sender':>7}")
+    for size in args.sizes:
+        for mode, fanout in (("direct", 0), ("gossip", args.fanout)):
+            r = simulate_broadcast(size, fanout=fanout, ttl=args.ttl, send_cost=args.send_cost,
+                                   link_latency=args.link_latency, trials=args.trials, seed=size)
+            print(f"{size:>5} {mode:>7} {r['coverage']:>9.3f} {r['latency_mean'] * 1000:>9.1f} "
+                  f"{r['latency_p95'] * 1000:>8.1f} {r['latency_max'] * 1000:>8.1f} {r['redundancy']:>7.2f} "
+                  f"{r['sender_sends']:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""메시지 중복 판정 상태와 히스토리 레코드의 메모리 사용량 측정.
+
+    python benchmarks/bench_history_memory.py                 # msg_id 1,000,000개, 레코드 100,000개
+    python benchmarks/bench_history_memory.py --ids 1000000 --records 1000000 --senders 50
+
+- msg_id: SeenMessageIds와 (이전 구현인) 문자열 set에 같은 id를 넣고 tracemalloc 최대치를 비교합니다.
+  발신자별로 counter가 대체로 증가하되 일부는 순서가 뒤바뀌어 도착하도록 섞습니다 (--reorder).
+- 레코드: 같은 와이어 패킷을 MessageRecord(슬롯)와 dict로 보관할 때의 메시지당 바이트, 그리고
+  ChatHistoryManager.receive_remote_message로 받았을 때(색인 등 포함)의 메시지당 바이트를 출력합니다.
+시간은 tracemalloc이 켜진 상태의 값이라 실제보다 느립니다.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.core.history import ChatHistoryManager, MessageRecord, SeenMessageIds  # noqa: E402
+
+
+def _message_ids(count: int, senders: int, reorder: float, seed: int):
+    """발신자를 번갈아 가며 {session}_{counter}를 만들고, reorder 비율만큼 인접한 id와 자리를 바꿈"""
+    rng = random.Random(seed)
+    sessions = [f"{rng.getrandbits(32):08x}" for _ in range(senders)]
+    counters = [0] * senders
+    ids = []
+    for i in range(count):
+        index = i % senders
+        counters[index] += 1
+        ids.append(f"{sessions[index]}_{counters[index]}")
+    for i in range(0, count - senders, senders):
+        if rng.random() < reorder:
+            j = i + senders  # 같은 발신자의 다음 메시지와 순서를 바꿈
+            ids[i], ids[j] = ids[j], ids[i]
+    return ids
+
+
+def _measure(build):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak, elapsed
+
+
+def bench_ids(count: int, senders: int, reorder: float, seed: int):
+    ids = _message_ids(count, senders, reorder, seed)
+
+    def fill_seen():
+        seen = SeenMessageIds()
+        for msg_id in ids:
+            seen.add(msg_id)
+        return seen
+
+    def fill_set():
+        seen = set()
+        for msg_id in ids:
+            seen.add(msg_id)
+        return seen
+
+    print(f"msg_id {count:,}개, 발신자 {senders}명, 순서 뒤바뀜 {reorder:.0%}")
+    for name, build in (("SeenMessageIds", fill_seen), ("set[str]", fill_set)):
+        seen, current, peak, elapsed = _measure(build)
+        assert len(seen) == count
+        print(f"  {name:<15} 유지 {current / 1024:>10,.1f} KiB  최대 {peak / 1024:>10,.1f} KiB  {elapsed:6.2f} s")
+        del seen
+
+
+def bench_records(count: int, senders: int, seed: int):
+    rng = random.Random(seed)
+    sessions = [f"{rng.getrandbits(32):08x}" for _ in range(senders)]
+    nicknames = {session: f"user{i}" for i, session in enumerate(sessions)}
+    packets = []
+    clock = {}
+    for i in range(count):
+        session = sessions[i % senders]
+        clock[session] = clock.get(session, 0) + 1
+        packets.append({
+            "type": "MESSAGE",
+            "msg_id": f"{session}_{clock[session]}",
+            "sender_session": session,
+            "sender_nickname": nicknames[session],
+            "content": f"message {i}",
+            "timestamp": 1_700_000_000.0 + i,
+            "vclock": dict(clock),
+        })
+
+    def fill_records():
+        return [MessageRecord.from_wire(packet) for packet in packets]
+
+    def fill_dicts():
+        return [dict(packet, vclock=dict(packet["vclock"])) for packet in packets]
+
+    def fill_history():
+        history = ChatHistoryManager("local")
+        for packet in packets:
+            history.receive_remote_message(MessageRecord.from_wire(packet))
+        return history
+
+    # 본문 등 문자열은 입력 패킷과 공유하므로 세 경우 모두 레코드 구조 자체의 크기만 비교됨
+    print(f"레코드 {count:,}개, 발신자 {senders}명")
+    for name, build in (("MessageRecord", fill_records), ("dict", fill_dicts), ("ChatHistory", fill_history)):
+        result, current, peak, elapsed = _measure(build)
+        print(f"  {name:<15} 유지 {current / count:>8,.0f} B/건  최대 {peak / 1024 ** 2:>8,.1f} MiB  {elapsed:6.2f} s")
+        del result
+    print("  (ChatHistory는 델타 클락, 인과 버퍼, 검색 색인 포함)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ids", type=int, default=1_000_000, help="중복 판정에 넣을 msg_id 수")
+    parser.add_argument("--records", type=int, default=100_000, help="히스토리에 넣을 메시지 수 (0이면 생략)")
+    parser.add_argument("--senders", type=int, default=10)
+    parser.add_argument("--reorder", type=float, default=0.01, help="순서가 뒤바뀌어 도착하는 msg_id 비율")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    bench_ids(args.ids, args.senders, args.reorder, args.seed)
+    if args.records:
+        bench_records(args.records, args.senders, args.seed)
+
+
+if __name__ == "__main__":
+    main()
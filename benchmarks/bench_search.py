@@ -0,0 +1,122 @@
+"""대화 기록 검색(HistorySearchIndex) 질의 지연 측정.
+
+    python benchmarks/bench_search.py                 # 메시지 100,000개, 질의 유형별 200회
+    python benchmarks/bench_search.py --messages 1000000 --queries 50 --linear-queries 5
+
+같은 시드로 만든 방에 대해 색인 구축 시간과, 질의 유형(희귀 단어, AND, 접두어, from:, file:,
+흔한 단어)별 지연의 중앙값/p95/최대를 출력합니다. 비교용으로 색인 없이 모든 메시지를
+최신순으로 훑는 선형 검색(이전 구현)의 지연도 함께 측정합니다. 선형 검색은 질의당 수백 ms가
+걸릴 수 있어 반복 횟수를 따로 둡니다 (--linear-queries, 0이면 생략).
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.core.history import MessageRecord  # noqa: E402
+from backend.core.search import HistorySearchIndex  # noqa: E402
+
+_WORDS = (
+    "meeting lunch report deploy server build release review coffee schedule "
+    "question answer update status network printer backup database design client "
+    "회의 점심 보고서 배포 서버 빌드 검토 일정 질문 답변"
+).split()
+
+
+def _build_room(count: int, senders: int, seed: int):
+    rng = random.Random(seed)
+    nicknames = [f"user{i}" for i in range(senders)]
+    records = []
+    for i in range(count):
+        sender = nicknames[i % senders]
+        if i % 50 == 0:
+            name = f"{rng.choice(_WORDS)}-{i}.{rng.choice(('pdf', 'zip', 'png'))}"
+            records.append(MessageRecord("FILE_REQ", f"{sender}_{i}", sender, sender, "", float(i), extra={"file_name": name}))
+            continue
+        words = rng.choices(_WORDS, k=rng.randint(3, 12))
+        words.append(f"ticket{i}")  # 한 번만 나오는 희귀 단어
+        records.append(MessageRecord("MESSAGE", f"{sender}_{i}", sender, sender, " ".join(words), float(i)))
+    return records
+
+
+def _queries(count: int, senders: int, rng: random.Random):
+    def rare():
+        return f"ticket{rng.randrange(count)}"
+
+    return {
+        "희귀 단어": rare,
+        "AND": lambda: f"{rng.choice(_WORDS)} {rng.choice(_WORDS)} {rng.choice(_WORDS)}",
+        "접두어 *": lambda: f"{rng.choice(_WORDS)[:3]}*",
+        "from:": lambda: f"from:user{rng.randrange(senders)} {rng.choice(_WORDS)}",
+        "file:": lambda: f"file:{rng.choice(_WORDS)}",
+        "흔한 단어": lambda: rng.choice(_WORDS),
+    }
+
+
+def _linear_search(index: HistorySearchIndex, records, query: str, limit: int):
+    terms = index._parse(query)
+    results = []
+    for record in reversed(records):
+        if record.msg_type in index.INDEXED_TYPES and all(index._doc_matches(record, term) for term in terms):
+            results.append(record)
+            if len(results) >= limit:
+                break
+    return results
+
+
+def _report(name: str, samples, hits):
+    samples.sort()
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(
+        f"  {name:<10} 중앙값 {statistics.median(samples) * 1000:8.3f} ms  "
+        f"p95 {p95 * 1000:8.3f} ms  최대 {samples[-1] * 1000:8.3f} ms  평균 결과 {statistics.mean(hits):5.1f}건"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=100_000, help="방에 쌓인 메시지 수")
+    parser.add_argument("--senders", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=200, help="질의 유형별 반복 횟수")
+    parser.add_argument("--limit", type=int, default=50, help="질의당 최대 결과 수")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--linear-queries", type=int, default=20, help="선형 검색의 질의 유형별 반복 횟수 (0이면 생략)")
+    args = parser.parse_args(argv)
+
+    records = _build_room(args.messages, args.senders, args.seed)
+    index = HistorySearchIndex()
+    started = time.perf_counter()
+    for record in records:
+        index.add(record)
+    elapsed = time.perf_counter() - started
+    print(f"메시지 {args.messages:,}개 색인 {elapsed:.2f} s ({elapsed / args.messages * 1e6:.1f} us/건)")
+
+    modes = [("색인", args.queries, lambda query: index.search(query, args.limit))]
+    if args.linear_queries:
+        modes.append(("선형 검색", args.linear_queries, lambda query: _linear_search(index, records, query, args.limit)))
+
+    # 질의를 미리 만들어 두 방식이 같은 질의(선형 검색은 앞쪽 일부)를 사용하도록 함
+    rng = random.Random(args.seed)
+    queries = {
+        name: [make_query() for _ in range(max(args.queries, args.linear_queries))]
+        for name, make_query in _queries(args.messages, args.senders, rng).items()
+    }
+
+    for mode, repeat, search in modes:
+        print(f"{mode} (질의 유형별 {repeat}회, limit {args.limit})")
+        for name, batch in queries.items():
+            samples, hits = [], []
+            for query in batch[:repeat]:
+                started = time.perf_counter()
+                results = search(query)
+                samples.append(time.perf_counter() - started)
+                hits.append(len(results))
+            _report(name, samples, hits)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,4 @@
 import customtkinter as ctk
-from frontend.views.user_list import UserListView
-from frontend.views.chat_panel import ChatPanelView
 from frontend.views.lobby import LobbyView
 
 ctk.set_appearance_mode("Light")
@@ -23,8 +21,39 @@ class LanChatApp(ctk.CTk):
 
         self.views = {}
 
+        # 시작 시에는 로비만 만들고, 채팅방 화면은 처음 입장할 때 만듦 (콜드 스타트 단축)
         self.views["Lobby"] = LobbyView(self.container, lambda r,p: None, lambda r,p: None, lambda n,p: None)
         self.views["Lobby"].grid(row=0, column=0, sticky="nsew")
+        # 콜백은 엔진이 준비되어 컨트롤러가 연결될 때 채워지므로 그 전까지는 버튼을 비활성화
+        self.views["Lobby"].set_actions_enabled(False)
+
+        self.chat_room_frame = None
+        self._user_list_view = None
+        self._chat_panel_view = None
+        self.on_chat_room_created = None  # (app) — 채팅방 화면이 만들어진 직후 호출 (컨트롤러가 콜백 연결)
+
+        self.show_view("Lobby")
+
+    @property
+    def chat_room_created(self) -> bool:
+        return self.chat_room_frame is not None
+
+    @property
+    def user_list_view(self):
+        self._ensure_chat_room()
+        return self._user_list_view
+
+    @property
+    def chat_panel_view(self):
+        self._ensure_chat_room()
+        return self._chat_panel_view
+
+    def _ensure_chat_room(self):
+        """채팅방 화면(유저리스트 + 채팅창)을 처음 필요할 때 생성. UI 스레드에서만 호출"""
+        if self.chat_room_frame is not None:
+            return
+        from frontend.views.user_list import UserListView
+        from frontend.views.chat_panel import ChatPanelView
 
         self.chat_room_frame = ctk.CTkFrame(self.container, fg_color="transparent")
         self.chat_room_frame.grid_rowconfigure(0, weight=1)
@@ -32,18 +61,21 @@ class LanChatApp(ctk.CTk):
         # 비율 조정: 좌측(유저리스트) 1 vs 우측(채팅창) 5
         self.chat_room_frame.grid_columnconfigure(1, weight=5)
 
-        self.user_list_view = UserListView(self.chat_room_frame)
-        self.user_list_view.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+        self._user_list_view = UserListView(self.chat_room_frame)
+        self._user_list_view.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
 
-        self.chat_panel_view = ChatPanelView(self.chat_room_frame)
-        self.chat_panel_view.grid(row=0, column=1, sticky="nsew", padx=(0, 10), pady=10)
+        self._chat_panel_view = ChatPanelView(self.chat_room_frame)
+        self._chat_panel_view.grid(row=0, column=1, sticky="nsew", padx=(0, 10), pady=10)
 
         self.views["ChatRoom"] = self.chat_room_frame
         self.views["ChatRoom"].grid(row=0, column=0, sticky="nsew")
-
-        self.show_view("Lobby")
+        self.views["ChatRoom"].lower()
+        if self.on_chat_room_created is not None:
+            self.on_chat_room_created(self)
 
     def show_view(self, view_name):
+        if view_name == "ChatRoom":
+            self._ensure_chat_room()
         view = self.views.get(view_name)
         if view:
             view.tkraise()
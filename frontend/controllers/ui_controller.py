@@ -3,8 +3,17 @@ import threading
 import time
 from tkinter import filedialog
 
-from backend.core.engine import P2PEngine
+from backend.core.history import MessageRecord
+from backend.network.peer_registry import peer_rooms
 from backend.utils.config import global_config
+from backend.utils.logger import get_logger
+from backend.utils.metrics import registry as metrics
+
+logger = get_logger("ui")
+
+UI_LAG_PROBE_MS = 1000  # Tk 이벤트 루프 지연을 재는 주기
+UI_EVENT_LAG = metrics.histogram("lanchat_ui_event_lag_seconds",
+                                 "예약한 after() 콜백이 늦게 실행된 시간 (UI 스레드가 막힌 정도)")
 
 
 class UIController:
@@ -13,12 +22,13 @@ class UIController:
     def __init__(self, app_view, initial_engine):
         self.app_view = app_view
         self.engine = initial_engine
+        self._slow_peers = set()  # 송신 큐가 밀려 있는 피어 session_id
+        self._suspect_peers = set()  # 생존 확인에 응답하지 않는 피어 session_id
 
-        self.app_view.chat_panel_view.send_btn.configure(command=self.on_send_chat)
-        self.app_view.chat_panel_view.msg_entry.bind("<Return>", lambda _e: self.on_send_chat())
-        self.app_view.chat_panel_view.on_attach_file_callback = self.on_attach_file
-        self.app_view.chat_panel_view.on_attach_folder_callback = self.on_attach_folder
-        self.app_view.user_list_view.leave_btn.configure(command=self.on_leave_room)
+        # 채팅방 화면은 첫 입장 때 만들어지므로 그때 연결 (이미 있으면 바로 연결)
+        self.app_view.on_chat_room_created = self.bind_chat_room_view
+        if self.app_view.chat_room_created:
+            self.bind_chat_room_view(self.app_view)
 
         lobby = self.app_view.views["Lobby"]
         lobby.on_create_room = self.on_create_room
@@ -26,132 +36,199 @@ class UIController:
         lobby.on_save_config = self.on_save_config
         lobby.refresh_btn.configure(command=self.refresh_lobby_ui)
         lobby.set_config_values(global_config.nickname)
+        lobby.set_actions_enabled(True)
 
         self.bind_engine_callbacks()
+        self._schedule_lag_probe()
+
+    def _schedule_lag_probe(self):
+        """UI_LAG_PROBE_MS 뒤 실행을 예약하고, 실제 실행 시각과의 차이를 UI 지연으로 기록"""
+        due = time.perf_counter() + UI_LAG_PROBE_MS / 1000
+
+        def probe():
+            UI_EVENT_LAG.observe(max(0.0, time.perf_counter() - due))
+            self._schedule_lag_probe()
+
+        self.app_view.after(UI_LAG_PROBE_MS, probe)
+
+    def bind_chat_room_view(self, app_view):
+        app_view.chat_panel_view.send_btn.configure(command=self.on_send_chat)
+        app_view.chat_panel_view.msg_entry.bind("<Return>", lambda _e: self.on_send_chat())
+        app_view.chat_panel_view.on_attach_file_callback = self.on_attach_file
+        app_view.chat_panel_view.on_attach_folder_callback = self.on_attach_folder
+        app_view.chat_panel_view.on_search_callback = self.on_search_history
+        app_view.chat_panel_view.on_room_selected_callback = self.on_select_room
+        app_view.chat_panel_view.on_add_room_callback = self.on_add_room
+        app_view.user_list_view.leave_btn.configure(command=self.on_leave_room)
 
     def bind_engine_callbacks(self):
+        self.engine.on_rooms_changed = self.handle_rooms_changed
         self.engine.on_peer_updated = self.handle_peer_update
         self.engine.on_message_received = self.handle_incoming_message
         self.engine.on_file_requested = self.handle_file_request
         self.engine.on_file_transfer_completed = self.handle_file_completed
         self.engine.on_chat_history_received = self.handle_chat_history
-
-    def _switch_engine(self, new_room_name, password=""):
-        self.engine.stop()
-
-        nick = global_config.nickname if global_config.nickname else "Anonymous"
-        new_engine = P2PEngine(nickname=nick, password=password, room_name=new_room_name)
-
-        self.engine = new_engine
-        self.bind_engine_callbacks()
-        self.engine.start()
+        self.engine.on_room_activity = self.handle_room_activity
+        self.engine.on_delivery_state = self.handle_delivery_state
+        self.engine.on_peer_backpressure = self.handle_peer_backpressure
+        self.engine.on_peer_liveness = self.handle_peer_liveness
+
+    def _show_room(self, session, notice=None):
+        # 엔진(소켓)은 그대로 두고 보고 있는 방만 바꿈 — 로컬 기록으로 다시 그리므로 네트워크 재동기화 없음
+        chat_panel = self.app_view.chat_panel_view
+        self.app_view.show_view("ChatRoom")
+        chat_panel.set_room_name(session.room_name)
+        chat_panel.set_encryption_status(session.security.is_encrypted)
+        chat_panel._clear_messages()
+        if notice:
+            chat_panel.add_message("System", notice, is_me=True)
+        cached = session.history_mgr.get_history_snapshot()
+        if cached:
+            self.handle_chat_history(cached)
+        self._refresh_room_switcher()
+        self.handle_peer_update(self.engine.discovery.get_active_peers())
+
+    def _refresh_room_switcher(self):
+        rooms = [(name, session.unread) for name, session in list(self.engine.joined.items())]
+        self.app_view.chat_panel_view.set_joined_rooms(rooms, self.engine.room_name)
 
     def on_save_config(self, nickname):
         global_config.nickname = nickname
         global_config.save()
 
         self.engine.nickname = nickname
-        self.engine.discovery.nickname = nickname
+        self.engine.discovery.update_presence(nickname=nickname)
 
     def on_create_room(self, room_name, password):
         base_name = room_name
-        active_peers = self.engine.discovery.get_active_peers()
-        existing_rooms = {info.get("room_name") for info in active_peers.values() if info.get("room_name")}
-        
+        existing_rooms = set(self.engine.discovery.get_room_names()) | set(self.engine.joined)
+
         counter = 1
         while room_name in existing_rooms:
             room_name = f"{base_name} {counter}"
             counter += 1
 
-        self._switch_engine(new_room_name=room_name, password=password)
-        self.app_view.show_view("ChatRoom")
-        self.app_view.chat_panel_view.set_room_name(room_name)
-        self.app_view.chat_panel_view.set_encryption_status(self.engine.security.is_encrypted)
-        self.app_view.chat_panel_view._clear_messages()
-        self.app_view.chat_panel_view.add_message("System", f"Created room '{room_name}'.", is_me=True)
+        session = self.engine.join_room(room_name, password)
+        self._show_room(session, f"Created room '{room_name}'.")
 
     def on_join_room(self, room_name, password):
-        self._switch_engine(new_room_name=room_name, password=password)
-        self.app_view.show_view("ChatRoom")
-        self.app_view.chat_panel_view.set_room_name(room_name)
-        self.app_view.chat_panel_view.set_encryption_status(self.engine.security.is_encrypted)
-        self.app_view.chat_panel_view._clear_messages()
-        self.app_view.chat_panel_view.add_message("System", f"Joined room '{room_name}'.", is_me=True)
+        if room_name in self.engine.joined:
+            # 이미 참여 중인 방은 전환만
+            self._show_room(self.engine.focus_room(room_name))
+            return
+        session = self.engine.join_room(room_name, password)
+        self._show_room(session, f"Joined room '{room_name}'.")
+
+    def on_select_room(self, room_name):
+        if room_name in self.engine.joined and room_name != self.engine.room_name:
+            self._show_room(self.engine.focus_room(room_name))
+
+    def on_add_room(self):
+        # 참여 중인 방은 유지한 채 로비에서 다른 방을 추가로 선택
+        self.app_view.show_view("Lobby")
+        self.refresh_lobby_ui()
 
     def on_leave_room(self):
-        self._switch_engine(new_room_name="__LOBBY__", password="")
+        self.engine.leave_room()
+        if self.engine.session is not None:
+            self._show_room(self.engine.session)
+            return
         self.app_view.show_view("Lobby")
+        self.refresh_lobby_ui()
 
     def refresh_lobby_ui(self):
-        if self.engine.room_name == "__LOBBY__":
-            self.handle_peer_update(self.engine.discovery.get_active_peers())
+        self.handle_rooms_update(self.engine.room_summary())
 
     def on_send_chat(self):
         msg = self.app_view.chat_panel_view.msg_entry.get().strip()
         if not msg:
             return
 
+        record = self.engine.create_chat_message(msg)
         self.app_view.chat_panel_view.msg_entry.delete(0, "end")
-        self.app_view.chat_panel_view.add_message(self.engine.nickname, msg, is_me=True)
+        self.app_view.chat_panel_view.add_message(self.engine.nickname, msg, is_me=True, msg_id=record.msg_id)
         self.app_view.chat_panel_view.scroll_to_bottom()
 
-        def send_task():
-            try:
-                success = self.engine.broadcast_chat_message(msg)
-                if not success:
-                    self.app_view.after(
-                        0,
-                        lambda: self.app_view.chat_panel_view.add_message(
-                            "System",
-                            "Send failed: no available peers in the current room.",
-                            is_me=True,
-                        ),
-                    )
-            except Exception as e:
-                print(f"[UIController] send_task error: {type(e).__name__}: {e}")
+        # 엔진은 피어별 송신 큐에 넣고 바로 반환하므로 UI 스레드에서 호출해도 막히지 않음 (결과는 전달 상태로 표시)
+        if not self.engine.broadcast_record(record):
+            self.app_view.chat_panel_view.add_message(
+                "System",
+                "Send failed: no available peers in the current room.",
+                is_me=True,
+            )
+
+    def on_search_history(self, query: str) -> list[str]:
+        return [record.msg_id for record in self.engine.search_history(query)]
+
+    def handle_rooms_update(self, rooms: dict):
+        lobby_view = self.app_view.views["Lobby"]
+        self.app_view.after(0, lambda: lobby_view.render_room_list(rooms))
+
+    def handle_rooms_changed(self, changes: dict):
+        lobby_view = self.app_view.views["Lobby"]
+        self.app_view.after(0, lambda: lobby_view.apply_room_deltas(changes))
+
+    def handle_delivery_state(self, room_name: str, msg_id: str, delivered: int, total: int, state: str):
+        if room_name != self.engine.room_name:
+            return  # 다른 방의 말풍선은 화면에 없음 (다시 볼 때 delivery_state로 반영)
+        chat_panel = self.app_view.chat_panel_view
+        self.app_view.after(0, lambda: chat_panel.set_delivery_state(msg_id, delivered, total, state))
 
-        threading.Thread(target=send_task, daemon=True).start()
+    def handle_room_activity(self, room_name: str, unread: int):
+        self.app_view.after(0, self._refresh_room_switcher)
 
     def handle_peer_update(self, peers: dict):
-        if self.engine.room_name == "__LOBBY__":
-            rooms = {}
-            for info in peers.values():
-                room_name = info.get("room_name", "")
-                if not room_name or room_name == "__LOBBY__":
-                    continue
-                if room_name not in rooms:
-                    rooms[room_name] = {"is_private": info.get("is_private", False), "count": 1}
-                else:
-                    rooms[room_name]["count"] += 1
+        if self.engine.session is None:
+            return  # 로비에서는 유저리스트가 보이지 않음 (입장 시 _show_room에서 다시 그림)
+        my_room = self.engine.room_name
+        room_peers = {
+            sid: info for sid, info in peers.items() if any(name == my_room for name, _ in peer_rooms(info))
+        }
+        my_session = self.engine.discovery.session_id
+        my_nickname = self.engine.nickname
+        my_short_id = self.engine.discovery.ip_short_id(self.engine.discovery.local_ip)
+        slow_peers = set(self._slow_peers)
+        suspect_peers = set(self._suspect_peers)
+        self.app_view.after(
+            0,
+            lambda: self.app_view.user_list_view.update_users(
+                room_peers, my_session, my_nickname, my_short_id, slow_peers, suspect_peers
+            ),
+        )
+
+    def handle_peer_backpressure(self, peer_id: str, congested: bool):
+        if congested:
+            self._slow_peers.add(peer_id)
+        else:
+            self._slow_peers.discard(peer_id)
+        if self.engine.session is not None:
+            self.handle_peer_update(self.engine.discovery.get_active_peers())
 
-            lobby_view = self.app_view.views["Lobby"]
-            self.app_view.after(0, lambda: lobby_view.render_room_list(rooms))
+    def handle_peer_liveness(self, peer_id: str, suspect: bool):
+        if suspect:
+            self._suspect_peers.add(peer_id)
         else:
-            my_room = self.engine.room_name
-            room_peers = {sid: info for sid, info in peers.items() if info.get("room_name") == my_room}
-            my_session = self.engine.discovery.session_id
-            my_nickname = self.engine.nickname
-            my_short_id = self.engine.discovery.ip_short_id(self.engine.discovery.local_ip)
-            self.app_view.after(0, lambda: self.app_view.user_list_view.update_users(room_peers, my_session, my_nickname, my_short_id))
+            self._suspect_peers.discard(peer_id)
+        if self.engine.session is not None:
+            self.handle_peer_update(self.engine.discovery.get_active_peers())
 
-    def handle_incoming_message(self, packet: dict):
-        sender = packet.get("sender_nickname", "Unknown")
-        sender_short_id = packet.get("sender_short_id", "")
-        if sender_short_id:
-            sender = f"{sender} #{sender_short_id}"
+    def handle_incoming_message(self, record: MessageRecord):
+        sender = record.sender_nickname or "Unknown"
+        if record.sender_short_id:
+            sender = f"{sender} #{record.sender_short_id}"
             
-        content = packet.get("content", "")
-        timestamp = packet.get("timestamp")
+        content = record.content
+        timestamp = record.timestamp
 
         def update_ui():
-            msg_type = packet.get("type")
+            msg_type = record.msg_type
             if msg_type == "FILE_REQ":
-                file_name = packet.get("file_name", "file")
-                file_size = packet.get("file_size", 0)
-                req_id = packet.get("req_id", "")
+                file_name = record.get("file_name", "file")
+                file_size = record.get("file_size", 0)
+                req_id = record.get("req_id", "")
 
                 on_download_clicked = self._create_download_handler(
-                    req_id, packet.get("sender_session", ""), file_name
+                    req_id, record.sender_session, file_name
                 )
 
                 btn_funcs = self.app_view.chat_panel_view.add_file_message(
@@ -161,26 +238,29 @@ class UIController:
                     timestamp=timestamp,
                     on_download=on_download_clicked,
                     is_me=False,
+                    msg_id=record.msg_id,
                 )
                 if not hasattr(self, "_file_btn_restorers"):
                     self._file_btn_restorers = {}
                 self._file_btn_restorers[req_id] = btn_funcs
 
             elif msg_type == "FILE_CANCEL":
-                req_id = packet.get("req_id", "")
+                req_id = record.get("req_id", "")
                 if hasattr(self, "_file_btn_restorers") and req_id in self._file_btn_restorers:
                     self._file_btn_restorers[req_id]["expire"]()
                     del self._file_btn_restorers[req_id]
 
             elif msg_type == "FILE_DOWNLOADED":
-                req_id = packet.get("req_id", "")
-                downloader_nick = packet.get("downloader_nickname", "Unknown")
-                downloader_short = packet.get("downloader_short_id", "")
+                req_id = record.get("req_id", "")
+                downloader_nick = record.get("downloader_nickname", "Unknown")
+                downloader_short = record.get("downloader_short_id", "")
                 if hasattr(self, "_file_btn_restorers") and req_id in self._file_btn_restorers:
                     self._file_btn_restorers[req_id]["update_dl"](downloader_nick, downloader_short)
 
             else:
-                self.app_view.chat_panel_view.add_message(sender, content, is_me=False, timestamp=timestamp)
+                self.app_view.chat_panel_view.add_message(
+                    sender, content, is_me=False, timestamp=timestamp, msg_id=record.msg_id
+                )
 
             self.app_view.chat_panel_view.scroll_to_bottom()
 
@@ -203,6 +283,7 @@ class UIController:
                         on_download=None,
                         on_cancel_share=lambda: self.engine.cancel_file_sharing(req_id),
                         is_me=True,
+                        msg_id=self.engine.outgoing_file_requests.get(req_id, {}).get("msg_id"),
                     )
                     if not hasattr(self, "_file_btn_restorers"):
                         self._file_btn_restorers = {}
@@ -238,6 +319,7 @@ class UIController:
                         on_download=None,
                         on_cancel_share=lambda: self.engine.cancel_file_sharing(req_id),
                         is_me=True,
+                        msg_id=self.engine.outgoing_file_requests.get(req_id, {}).get("msg_id"),
                     )
                     if not hasattr(self, "_file_btn_restorers"):
                         self._file_btn_restorers = {}
@@ -259,8 +341,7 @@ class UIController:
     def _create_download_handler(self, req_id: str, sender_session: str, file_name: str):
         """다운로드 버튼 콜백을 생성해 반환합니다."""
         def on_download_clicked():
-            peers = self.engine.discovery.get_active_peers()
-            if sender_session not in peers:
+            if self.engine.discovery.get_peer(sender_session) is None:
                 return False
 
             dl_dir = os.path.join(os.path.expanduser("~"), "Downloads")
@@ -282,26 +363,25 @@ class UIController:
     def handle_file_request(self, req_id: str, packet: dict):
         pass
 
-    def handle_chat_history(self, messages: list):
-        sorted_msgs = sorted(messages, key=lambda x: x.get("timestamp", 0))
+    def handle_chat_history(self, messages: list[MessageRecord]):
+        # 엔진이 인과 순서로 전달하므로 재정렬 없이 그대로 이어 붙임
 
         def update_ui():
-            active_peer_ids = set(self.engine.discovery.get_active_peers().keys())
+            active_peer_ids = self.engine.discovery.get_active_peers()
             my_session = self.engine.discovery.session_id
             my_nickname = (self.engine.nickname or "").strip()
             my_short_id = self.engine.discovery.ip_short_id(self.engine.discovery.local_ip)
 
-            for msg in sorted_msgs:
-                sender = msg.get("sender_nickname", "Unknown")
-                sender_short_id_val = (msg.get("sender_short_id", "") or "").strip()
-                if sender_short_id_val:
-                    sender = f"{sender} #{sender_short_id_val}"
+            for msg in messages:
+                sender = msg.sender_nickname or "Unknown"
+                sender_short_id = msg.sender_short_id.strip()
+                if sender_short_id:
+                    sender = f"{sender} #{sender_short_id}"
                     
-                content = msg.get("content", "")
-                timestamp = msg.get("timestamp")
-                sender_session = msg.get("sender_session", "")
-                sender_nickname = (msg.get("sender_nickname", "") or "").strip()
-                sender_short_id = (msg.get("sender_short_id", "") or "").strip()
+                content = msg.content
+                timestamp = msg.timestamp
+                sender_session = msg.sender_session
+                sender_nickname = msg.sender_nickname.strip()
                 is_me = sender_session == my_session
                 if not is_me and sender_short_id:
                     is_me = (
@@ -316,7 +396,7 @@ class UIController:
                         and sender_nickname == my_nickname
                         and sender_session not in active_peer_ids
                     )
-                msg_type = msg.get("type", "MESSAGE")
+                msg_type = msg.msg_type
 
                 if msg_type == "FILE_REQ":
                     file_name = msg.get("file_name", "file")
@@ -332,9 +412,10 @@ class UIController:
                         file_name=file_name,
                         file_size=file_size,
                         timestamp=timestamp,
-                        on_download=self._create_download_handler(req_id, msg.get("sender_session", ""), file_name),
+                        on_download=self._create_download_handler(req_id, sender_session, file_name),
                         on_cancel_share=on_cancel_share,
                         is_me=is_me,
+                        msg_id=msg.msg_id,
                     )
 
                     if not hasattr(self, "_file_btn_restorers"):
@@ -355,7 +436,12 @@ class UIController:
                         self._file_btn_restorers[req_id]["update_dl"](dn_nick, dn_short)
 
                 else:
-                    self.app_view.chat_panel_view.add_message(sender, content, is_me=is_me, timestamp=timestamp)
+                    self.app_view.chat_panel_view.add_message(
+                        sender, content, is_me=is_me, timestamp=timestamp, msg_id=msg.msg_id
+                    )
+                    state = self.engine.delivery_state(msg.msg_id) if is_me else None
+                    if state is not None:
+                        self.app_view.chat_panel_view.set_delivery_state(msg.msg_id, *state)
 
             self.app_view.chat_panel_view.scroll_to_bottom()
 
@@ -420,7 +506,7 @@ class UIController:
                 try:
                     self._file_btn_restorers[req_id]["restore"]()
                 except Exception as e:
-                    print(f"[UIController] button restore error: {e}")
+                    logger.warning("button restore error: %s", e)
                 finally:
                     del self._file_btn_restorers[req_id]
 
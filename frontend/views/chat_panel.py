@@ -10,6 +10,7 @@ BUBBLE_IN_FG   = "#000000"   # 상대 메시지 텍스트
 TIME_OUT_COLOR = "#8CB9FF"   # 내 메시지 시간
 TIME_IN_COLOR  = "#8E8E93"   # 상대 메시지 시간
 NAME_COLOR     = "#8E8E93"   # 닉네임 색상
+HIGHLIGHT_BG   = "#FFF4C2"   # 검색 결과 강조 배경
 
 class ChatPanelView(ctk.CTkFrame):
     """우측 패널: 말풍선이 출력되는 텍스트 채팅창 및 입력 뷰"""
@@ -32,6 +33,20 @@ class ChatPanelView(ctk.CTkFrame):
         )
         # 기본적으로 숨김 (방 진입 시 set_encryption_status로 제어)
 
+        # 대화 검색 (Enter: 다음 결과로 이동)
+        self.search_entry = ctk.CTkEntry(self.top_frame, placeholder_text="대화 검색 (단어*, from:이름, file:이름)", width=220)
+        self.search_entry.pack(side="right")
+        self.search_entry.bind("<Return>", lambda _e: self._run_search())
+        self.search_entry.bind("<Escape>", lambda _e: self._reset_search())
+        self.search_status = ctk.CTkLabel(self.top_frame, text="", font=("Arial", 11), text_color=NAME_COLOR)
+        self.search_status.pack(side="right", padx=(0, 6))
+
+        # 참여 중인 방 전환 (재동기화 없이 로컬 기록으로 다시 그림) 및 로비에서 방 추가
+        self.add_room_btn = ctk.CTkButton(self.top_frame, text="+ 방", width=50, command=self._click_add_room)
+        self.add_room_btn.pack(side="right", padx=(0, 6))
+        self.room_switcher = ctk.CTkOptionMenu(self.top_frame, values=["-"], width=160, command=self._on_room_switch)
+        self.room_switcher.pack(side="right", padx=(0, 6))
+
         # 중앙 스크롤 뷰
         self.chat_scroll = ctk.CTkScrollableFrame(self, fg_color="white")
         self.chat_scroll.grid(row=1, column=0, sticky="nsew", padx=10, pady=5)
@@ -52,9 +67,19 @@ class ChatPanelView(ctk.CTkFrame):
 
         self.on_attach_file_callback = None
         self.on_attach_folder_callback = None
+        self.on_search_callback = None  # (query) -> [msg_id, ...] 최신순
+        self.on_room_selected_callback = None  # (room_name)
+        self.on_add_room_callback = None
+        self._room_labels = {}  # {표시 문자열: 방 이름}
         self.share_menu = None
         self.share_menu_active = False
 
+        self._message_rows = {}  # {msg_id: 말풍선 행 프레임}
+        self._delivery_labels = {}  # {msg_id: (시각 라벨, "HH:MM")} — 내 메시지의 전달 상태 표시
+        self._search_query = ""
+        self._search_results = []
+        self._search_pos = 0
+
     def toggle_share_menu(self):
         """공유 버튼 클릭 시 파일/폴더 선택 플로팅 메뉴 표시 토글"""
         if self.share_menu_active:
@@ -111,6 +136,29 @@ class ChatPanelView(ctk.CTkFrame):
         """방 이름 텍스트 설정"""
         self.title_label.configure(text=room_name)
 
+    def set_joined_rooms(self, rooms: list, current: str):
+        """rooms = [(방 이름, 안 읽은 수), ...] — 방 전환 메뉴를 갱신하고 current를 선택 상태로 표시"""
+        self._room_labels = {}
+        labels = []
+        current_label = "-"
+        for room_name, unread in rooms:
+            label = f"{room_name} ({unread})" if unread else room_name
+            self._room_labels[label] = room_name
+            labels.append(label)
+            if room_name == current:
+                current_label = label
+        self.room_switcher.configure(values=labels or ["-"])
+        self.room_switcher.set(current_label)
+
+    def _on_room_switch(self, label: str):
+        room_name = self._room_labels.get(label)
+        if room_name and self.on_room_selected_callback:
+            self.on_room_selected_callback(room_name)
+
+    def _click_add_room(self):
+        if self.on_add_room_callback:
+            self.on_add_room_callback()
+
     def set_encryption_status(self, is_encrypted: bool):
         """암호화 여부에 따라 경고 레이블 표시/숨김"""
         if is_encrypted:
@@ -118,7 +166,7 @@ class ChatPanelView(ctk.CTkFrame):
         else:
             self.warning_label.pack(side="left", padx=(12, 0))
 
-    def add_message(self, sender: str, msg: str, is_me: bool = False, timestamp: float = None):
+    def add_message(self, sender: str, msg: str, is_me: bool = False, timestamp: float = None, msg_id: str = None):
         """채팅창에 메시지 말풍선을 추가합니다."""
         time_str = time.strftime("%H:%M", time.localtime(timestamp if timestamp else time.time()))
         chat_bg = self.chat_scroll.cget("fg_color") if isinstance(self.chat_scroll.cget("fg_color"), str) else "white"
@@ -126,6 +174,8 @@ class ChatPanelView(ctk.CTkFrame):
         # 메시지 전체 행 컨테이너
         outer = ctk.CTkFrame(self.chat_scroll, fg_color="transparent")
         outer.pack(fill="x", pady=4, padx=8)
+        if msg_id:
+            self._message_rows[msg_id] = outer
 
         if is_me:
             # 내 메시지: 오른쪽 정렬, 닉네임 없음
@@ -148,9 +198,10 @@ class ChatPanelView(ctk.CTkFrame):
             self._auto_height(content)
             self._forward_scroll(content)
 
-            ctk.CTkLabel(bubble, text=time_str, text_color=TIME_OUT_COLOR, font=("Arial", 10)).pack(
-                anchor="e", padx=10, pady=(0, 6)
-            )
+            time_label = ctk.CTkLabel(bubble, text=time_str, text_color=TIME_OUT_COLOR, font=("Arial", 10))
+            time_label.pack(anchor="e", padx=10, pady=(0, 6))
+            if msg_id:
+                self._delivery_labels[msg_id] = (time_label, time_str)
 
         else:
             # 상대 메시지: 닉네임을 말풍선 밖 상단 좌측에 표시
@@ -182,13 +233,16 @@ class ChatPanelView(ctk.CTkFrame):
             )
 
     def add_file_message(self, sender: str, file_name: str, file_size: int, timestamp: float,
-                         on_download: callable = None, on_cancel_share: callable = None, is_me: bool = False):
+                         on_download: callable = None, on_cancel_share: callable = None, is_me: bool = False,
+                         msg_id: str = None):
         """커스텀 파일 전송 메시지 말풍선과 다운로드/취소 버튼을 렌더링합니다."""
         time_str = time.strftime("%H:%M", time.localtime(timestamp if timestamp else time.time()))
         size_mb = file_size / (1024 * 1024)
 
         outer = ctk.CTkFrame(self.chat_scroll, fg_color="transparent")
         outer.pack(fill="x", pady=4, padx=8)
+        if msg_id:
+            self._message_rows[msg_id] = outer
 
         if not is_me:
             ctk.CTkLabel(outer, text=sender, text_color=NAME_COLOR, font=("Arial", 11, "bold")).pack(
@@ -294,7 +348,68 @@ class ChatPanelView(ctk.CTkFrame):
         # 렌더링 이벤트 루프 처리가 완료되도록 대기 (50ms)
         self.after(50, lambda: self.chat_scroll._parent_canvas.yview_moveto(1.0))
 
+    def _run_search(self):
+        """검색어가 바뀌면 새로 검색하고, 같으면 다음(더 오래된) 결과로 이동합니다."""
+        query = self.search_entry.get().strip()
+        if not query:
+            self._reset_search()
+            return
+
+        if query != self._search_query:
+            msg_ids = self.on_search_callback(query) if self.on_search_callback else []
+            self._search_query = query
+            self._search_results = [mid for mid in msg_ids if mid in self._message_rows]
+            self._search_pos = 0
+        elif self._search_results:
+            self._search_pos = (self._search_pos + 1) % len(self._search_results)
+
+        if not self._search_results:
+            self.search_status.configure(text="결과 없음")
+            return
+
+        self.search_status.configure(text=f"{self._search_pos + 1}/{len(self._search_results)}")
+        self.jump_to_message(self._search_results[self._search_pos])
+
+    def _reset_search(self):
+        self._search_query = ""
+        self._search_results = []
+        self._search_pos = 0
+        self.search_status.configure(text="")
+
+    def jump_to_message(self, msg_id: str) -> bool:
+        """msg_id에 해당하는 말풍선으로 스크롤하고 잠시 강조 표시합니다."""
+        row = self._message_rows.get(msg_id)
+        if row is None or not row.winfo_exists():
+            return False
+
+        self.chat_scroll.update_idletasks()
+        total_height = max(1, self.chat_scroll.winfo_height())
+        self.chat_scroll._parent_canvas.yview_moveto(max(0.0, row.winfo_y() / total_height))
+
+        row.configure(fg_color=HIGHLIGHT_BG)
+        self.after(1500, lambda: row.winfo_exists() and row.configure(fg_color="transparent"))
+        return True
+
+    def set_delivery_state(self, msg_id: str, delivered: int, total: int, state: str):
+        """내 메시지의 시각 옆에 전달 상태 표시: 전송 중 k/N, 전원 확인 ✓, 일부 실패 ! k/N"""
+        entry = self._delivery_labels.get(msg_id)
+        if entry is None or total <= 0:
+            return
+        label, time_str = entry
+        if not label.winfo_exists():
+            del self._delivery_labels[msg_id]
+            return
+        if state == "delivered":
+            label.configure(text=f"{time_str} ✓")
+        elif state == "failed":
+            label.configure(text=f"{time_str} ! {delivered}/{total}")
+        else:
+            label.configure(text=f"{time_str} · {delivered}/{total}")
+
     def _clear_messages(self):
         """이전 대화 내역 전체 삭제 (방 이동 시 사용)"""
         for widget in self.chat_scroll.winfo_children():
             widget.destroy()
+        self._message_rows.clear()
+        self._delivery_labels.clear()
+        self._reset_search()
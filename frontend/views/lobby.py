@@ -34,6 +34,9 @@ class LobbyView(ctk.CTkFrame):
         # 좌측 하단: 방 목록 스크롤 뷰
         self.room_scroll = ctk.CTkScrollableFrame(left_panel, fg_color="white")
         self.room_scroll.grid(row=1, column=0, sticky="nsew")
+        self._room_rows = {}  # {room_name: (frame, label, join_button)}
+        self.empty_label = ctk.CTkLabel(self.room_scroll, text="현재 네트워크에 개설된 방이 없습니다.", text_color="gray")
+        self.empty_label.pack(pady=20)
 
         # ==========================================
         # 우측 패널: 설정 및 방 개설 영역
@@ -63,6 +66,24 @@ class LobbyView(ctk.CTkFrame):
         self.create_btn = ctk.CTkButton(right_panel, text="세션 만들기 (+)", command=self._handle_create_room)
         self.create_btn.pack(pady=15, padx=15, fill="x")
 
+        # 엔진이 연결되기 전에는 동작 버튼을 비활성화 (set_actions_enabled)
+        self._actions_enabled = True
+
+    def set_actions_enabled(self, enabled: bool):
+        """방 만들기/참여/새로고침/닉네임 저장 버튼을 켜거나 끔 — 엔진 연결 전의 클릭이 사라지지 않도록"""
+        self._actions_enabled = enabled
+        state = "normal" if enabled else "disabled"
+        for btn in (self.refresh_btn, self.save_cfg_btn, self.create_btn):
+            btn.configure(state=state)
+        for _frame, _label, join_btn in self._room_rows.values():
+            join_btn.configure(state=state)
+
+    def show_startup_error(self, message: str):
+        """네트워크 엔진을 시작하지 못한 경우 방 목록 자리에 오류를 표시"""
+        self.set_actions_enabled(False)
+        self.empty_label.configure(text=f"네트워크를 시작하지 못했습니다.\n{message}", text_color="red")
+        self.empty_label.pack(pady=20)
+
     def _handle_save_config(self):
         nick = self.nickname_entry.get().strip()
         if nick:
@@ -74,27 +95,47 @@ class LobbyView(ctk.CTkFrame):
         self.on_create_room(r_name, r_pw)
 
     def render_room_list(self, rooms: dict):
-        """rooms = { "방이름": {"is_private": bool, "count": int} } 형식의 집계 데이터"""
-        for widget in self.room_scroll.winfo_children():
-            widget.destroy()
+        """rooms = { "방이름": {"is_private": bool, "count": int} } 형식의 전체 집계 데이터.
+        기존 행은 재사용하고 사라진 방의 행만 제거하므로 새로고침해도 목록이 깜빡이지 않습니다."""
+        changes = {room_name: None for room_name in self._room_rows if room_name not in rooms}
+        changes.update(rooms)
+        self.apply_room_deltas(changes)
+
+    def apply_room_deltas(self, changes: dict):
+        """changes = { "방이름": {"is_private", "count"} 또는 사라진 방이면 None } — 바뀐 방의 행만 갱신"""
+        for room_name, info in changes.items():
+            row = self._room_rows.get(room_name)
+            if info is None:
+                if row is not None:
+                    row[0].destroy()
+                    del self._room_rows[room_name]
+                continue
+
+            lock_str = "🔒(비공개)" if info["is_private"] else "🔓(공개)"
+            text_str = f"[{room_name}] - {lock_str} / 참여인원: {info['count']}명 탐지됨"
+            join_cmd = lambda r=room_name, p=info["is_private"]: self._handle_join_btn(r, p)
 
-        if not rooms:
-            ctk.CTkLabel(self.room_scroll, text="현재 네트워크에 개설된 방이 없습니다.", text_color="gray").pack(pady=20)
-            return
+            if row is not None:
+                # 인원/비공개 여부만 바뀐 경우: 위젯을 다시 만들지 않고 내용만 교체
+                row[1].configure(text=text_str)
+                row[2].configure(command=join_cmd)
+                continue
 
-        for room_name, info in rooms.items():
             frame = ctk.CTkFrame(self.room_scroll)
             frame.pack(fill="x", pady=5, padx=5)
 
-            lock_str = "🔒(비공개)" if info["is_private"] else "🔓(공개)"
-            text_str = f"[{room_name}] - {lock_str} / 참여인원: {info['count']}명 탐지됨"
-
             lbl = ctk.CTkLabel(frame, text=text_str, font=("Arial", 14))
             lbl.pack(side="left", padx=10, pady=10)
 
-            btn = ctk.CTkButton(frame, text="참여하기", width=80,
-                                command=lambda r=room_name, p=info["is_private"]: self._handle_join_btn(r, p))
+            btn = ctk.CTkButton(frame, text="참여하기", width=80, command=join_cmd,
+                                state="normal" if self._actions_enabled else "disabled")
             btn.pack(side="right", padx=10, pady=10)
+            self._room_rows[room_name] = (frame, lbl, btn)
+
+        if self._room_rows:
+            self.empty_label.pack_forget()
+        else:
+            self.empty_label.pack(pady=20)
 
     def _handle_join_btn(self, room_name, is_private):
         if is_private:
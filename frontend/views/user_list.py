@@ -22,8 +22,10 @@ class UserListView(ctk.CTkFrame):
         self.leave_btn = ctk.CTkButton(self, text="방 나가기", fg_color="#D9534F", hover_color="#C9302C")
         self.leave_btn.grid(row=2, column=0, padx=10, pady=(0, 10), sticky="ew")
 
-    def update_users(self, peers: dict, my_session_id: str = "", my_nickname: str = "", my_short_id: str = ""):
-        """P2PEngine에서 전달받은 피어 딕셔너리를 기반으로 목록 뷰를 갱신합니다."""
+    def update_users(self, peers: dict, my_session_id: str = "", my_nickname: str = "", my_short_id: str = "",
+                     slow_peers=(), suspect_peers=()):
+        """P2PEngine에서 전달받은 피어 딕셔너리를 기반으로 목록 뷰를 갱신합니다.
+        slow_peers: 송신이 밀리는 피어, suspect_peers: 생존 확인에 응답하지 않는 피어"""
         for widget in self.scrollable_frame.winfo_children():
             widget.destroy()
 
@@ -46,9 +48,15 @@ class UserListView(ctk.CTkFrame):
             ip = info.get("ip", "")
             short_id = PeerDiscovery.ip_short_id(ip)
 
+            if session_id in suspect_peers:
+                status = f"⚪ {nickname} #{short_id} (응답 없음)"
+            elif session_id in slow_peers:
+                status = f"🟠 {nickname} #{short_id} (지연)"
+            else:
+                status = f"🟢 {nickname} #{short_id}"
             btn = ctk.CTkButton(
                 self.scrollable_frame,
-                text=f"🟢 {nickname} #{short_id}",
+                text=status,
                 anchor="w",
                 fg_color="transparent",
                 text_color="#1a1a1a",
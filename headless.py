@@ -0,0 +1,261 @@
+"""GUI 없이 P2PEngine만 실행하는 헤드리스 노드.
+
+항상 켜 두는 서버에서 방 히스토리를 보관해 새로 들어오는 피어에게 전달하고, 선택적으로 공유 파일을 자동으로
+받아 다시 공유(시드)하여 노트북이 꺼져도 파일을 받을 수 있게 합니다. customtkinter를 import하지 않습니다.
+
+    python headless.py --nickname keeper --room 개발팀 --room 공지 --events events.jsonl
+    python headless.py --room 자료실 --download-dir /srv/lanchat --reshare
+    python headless.py --room 빌드 --api-port 50080   # 로컬 제어 API (backend/network/control_api.py)
+    python headless.py --room 빌드 --metrics-port 9464   # Prometheus 계측 (backend/utils/metrics.py)
+
+설정 우선순위: 명령줄 인자 > 환경변수(LANCHAT_*) > config.json > 기본값
+"""
+import argparse
+import os
+import signal
+import threading
+
+from backend.core.engine import P2PEngine
+from backend.core.events import EventBus, open_sink
+from backend.network.control_api import DEFAULT_API_HOST, DEFAULT_DOWNLOAD_DIR, DEFAULT_TOKEN_FILE, ControlAPI
+from backend.utils.config import global_config
+from backend.utils.logger import configure as configure_logging, get_logger
+from backend.utils.metrics import DEFAULT_DUMP_INTERVAL, start_exporters
+
+logger = get_logger("headless")
+
+
+def _env(name: str, default=None):
+    value = os.environ.get(f"LANCHAT_{name}")
+    return value if value not in (None, "") else default
+
+
+def _env_int(name: str, default: int) -> int:
+    value = _env(name)
+    try:
+        return int(value) if value is not None else default
+    except ValueError:
+        logger.warning("ignoring invalid LANCHAT_%s=%r", name, value)
+        return default
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    env_rooms = [name.strip() for name in (_env("ROOMS") or "").split(",") if name.strip()]
+    parser = argparse.ArgumentParser(description="Local LAN Chat headless node")
+    parser.add_argument("--nickname", default=_env("NICKNAME", global_config.nickname or "keeper"),
+                        help="표시 이름 (LANCHAT_NICKNAME)")
+    parser.add_argument("--room", dest="rooms", action="append", default=None,
+                        help="참여할 방. 여러 번 지정 가능 (LANCHAT_ROOMS=방1,방2)")
+    parser.add_argument("--password", default=_env("PASSWORD", ""),
+                        help="방 비밀번호 — 지정한 모든 방에 적용 (LANCHAT_PASSWORD)")
+    parser.add_argument("--events", default=_env("EVENTS", "log"),
+                        help='이벤트 출력: "log"(요약), JSONL 파일 경로, "-"(표준 출력 JSONL), ""(없음) (LANCHAT_EVENTS)')
+    parser.add_argument("--download-dir", default=_env("DOWNLOAD_DIR"),
+                        help="지정하면 공유된 파일을 이 폴더의 방별 하위 폴더로 자동 수신 (LANCHAT_DOWNLOAD_DIR)")
+    parser.add_argument("--max-size", type=int, default=_env_int("MAX_SIZE_MB", 0),
+                        help="자동 수신할 최대 파일 크기(MB), 0이면 제한 없음 (LANCHAT_MAX_SIZE_MB)")
+    parser.add_argument("--reshare", action="store_true", default=_env("RESHARE", "") in ("1", "true", "yes"),
+                        help="자동 수신한 파일을 같은 방에 다시 공유 (LANCHAT_RESHARE=1)")
+    parser.add_argument("--api-port", type=int, default=_env_int("API_PORT", 0),
+                        help="로컬 제어 API 포트, 0이면 끔 (LANCHAT_API_PORT)")
+    parser.add_argument("--api-host", default=_env("API_HOST", DEFAULT_API_HOST),
+                        help="제어 API 바인딩 주소 (LANCHAT_API_HOST)")
+    parser.add_argument("--api-socket", default=_env("API_SOCKET"),
+                        help="POSIX에서 TCP 대신 이 경로의 유닉스 소켓으로 제어 API 열기 (LANCHAT_API_SOCKET)")
+    parser.add_argument("--api-token", default=_env("API_TOKEN", ""),
+                        help="요청에 필요한 Authorization: Bearer 토큰. 생략하면 --api-token-file 사용 (LANCHAT_API_TOKEN)")
+    parser.add_argument("--api-token-file", default=_env("API_TOKEN_FILE", DEFAULT_TOKEN_FILE),
+                        help="토큰 파일 — 없으면 새 토큰을 만들어 0600으로 저장 (LANCHAT_API_TOKEN_FILE)")
+    parser.add_argument("--metrics-port", type=int, default=_env_int("METRICS_PORT", 0),
+                        help="127.0.0.1:<port>/metrics 계측 엔드포인트, 0이면 끔 (LANCHAT_METRICS_PORT)")
+    parser.add_argument("--metrics-file", default=_env("METRICS_FILE"),
+                        help="지정하면 계측 스냅샷을 이 JSON 파일에 주기적으로 기록 (LANCHAT_METRICS_FILE)")
+    parser.add_argument("--metrics-interval", type=float, default=float(_env("METRICS_INTERVAL", DEFAULT_DUMP_INTERVAL)),
+                        help="--metrics-file 기록 주기(초) (LANCHAT_METRICS_INTERVAL)")
+    parser.add_argument("--log-level", default=_env("LOG_LEVEL", "info"),
+                        help="로그 레벨 debug/info/warning/error (LANCHAT_LOG_LEVEL, 카테고리별은 LANCHAT_LOG_LEVELS)")
+    parser.add_argument("--log-format", choices=("text", "json"), default=_env("LOG_FORMAT", "text"),
+                        help="로그 형식 — json이면 한 줄에 하나씩 (LANCHAT_LOG_FORMAT)")
+    parser.add_argument("--multicast-group", default=_env("MULTICAST_GROUP", global_config.multicast_group))
+    parser.add_argument("--multicast-ttl", type=int, default=_env_int("MULTICAST_TTL", global_config.multicast_ttl))
+    parser.add_argument("--relay-fanout", type=int, default=_env_int("RELAY_FANOUT", global_config.relay_fanout))
+    parser.add_argument("--relay-ttl", type=int, default=_env_int("RELAY_TTL", global_config.relay_ttl))
+    parser.add_argument("--tcp-backlog", type=int, default=_env_int("TCP_BACKLOG", global_config.tcp_backlog))
+    parser.add_argument("--no-legacy-discovery", dest="legacy_discovery", action="store_false",
+                        default=_env("LEGACY_DISCOVERY", "1" if global_config.legacy_discovery else "0") in ("1", "true", "yes"),
+                        help="구버전(JSON 디스커버리) 피어용 호환 알림을 보내지 않음 (LANCHAT_LEGACY_DISCOVERY=0)")
+    args = parser.parse_args(argv)
+    args.rooms = args.rooms or env_rooms
+    if not args.rooms:
+        parser.error("참여할 방을 --room 또는 LANCHAT_ROOMS로 지정하세요")
+    return args
+
+
+class HeadlessNode:
+    """엔진 이벤트를 sink로 내보내고, 설정에 따라 공유 파일을 자동 수신/재공유합니다."""
+
+    def __init__(self, engine: P2PEngine, bus: EventBus, download_dir: str = None, max_size_mb: int = 0,
+                 reshare: bool = False):
+        self.engine = engine
+        self.bus = bus
+        self.download_dir = os.path.abspath(download_dir) if download_dir else None
+        self.max_size = max_size_mb * 1024 * 1024
+        self.reshare = reshare
+        self._lock = threading.Lock()
+        self._downloads = {}  # {req_id: (room_name, 원본 해시, 표시한 해시들)} — 자동 수신 중인 요청
+        # 이 노드가 받았거나 받는 중인 파일의 sha256 (재공유 요청의 origin_sha256 포함).
+        # 재공유하는 노드가 여럿인 방에서 서로의 사본을 끝없이 받아 다시 공유하지 않도록 함
+        self._held_hashes = set()
+        bus.subscribe(self._on_event)
+
+    def _on_event(self, event: dict):
+        kind = event.get("event")
+        if kind == "messages" and self.download_dir and not event.get("synced"):
+            for msg in event.get("messages", []):
+                if msg.get("type") == "FILE_REQ" and msg.get("sender_session") != self.engine.discovery.session_id:
+                    if not self._claim(msg):
+                        logger.debug("skipped %s (already held or offered here)", msg.get("file_name"))
+                        continue
+                    # 수락은 TCP 전송을 동반하므로 수신 스레드를 막지 않도록 분리
+                    threading.Thread(target=self._accept, args=(event["room"], msg), daemon=True).start()
+        elif kind == "download_completed":
+            with self._lock:
+                download = self._downloads.pop(event.get("req_id"), None)
+            if download is not None and self.reshare:
+                room_name, origin, _hashes = download
+                threading.Thread(target=self._reshare, args=(room_name, event["path"], origin), daemon=True).start()
+        elif kind == "download_failed":
+            with self._lock:
+                download = self._downloads.pop(event.get("req_id"), None)
+                if download is not None:
+                    self._held_hashes.difference_update(download[2])
+
+    @staticmethod
+    def _hashes_of(msg: dict) -> set:
+        return {h.lower() for h in (msg.get("file_sha256"), msg.get("origin_sha256")) if isinstance(h, str) and h}
+
+    def _offered_hashes(self) -> set:
+        """이 노드가 지금 공유 중인 파일의 sha256"""
+        return {
+            info.get("file_sha256") for session in list(self.engine.joined.values())
+            for info in list(session.outgoing_file_requests.values())
+        }
+
+    def _claim(self, msg: dict) -> bool:
+        """이미 받았거나 받는 중이거나 이 노드가 공유한 파일이 아니면 수신할 파일로 표시하고 True"""
+        hashes = self._hashes_of(msg)
+        with self._lock:
+            if hashes & (self._held_hashes | self._offered_hashes()):
+                return False
+            self._held_hashes.update(hashes)
+        return True
+
+    def _release(self, msg: dict):
+        with self._lock:
+            self._held_hashes.difference_update(self._hashes_of(msg))
+
+    def _accept(self, room_name: str, msg: dict):
+        req_id = msg.get("req_id")
+        size = int(msg.get("file_size") or 0)
+        if self.max_size and size > self.max_size:
+            logger.info("skipped %s (%s bytes > --max-size)", msg.get('file_name'), size)
+            self._release(msg)
+            return
+        room_dir = os.path.join(self.download_dir, _safe_name(room_name))
+        os.makedirs(room_dir, exist_ok=True)
+        save_path = _unique_path(os.path.join(room_dir, _safe_name(msg.get("file_name") or req_id)))
+        # 재공유할 때 알릴 원본 해시 — 재공유된 사본을 받은 경우 그 사본의 원본을 그대로 이어감
+        origin = (msg.get("origin_sha256") or msg.get("file_sha256") or "").lower()
+        with self._lock:
+            self._downloads[req_id] = (room_name, origin, self._hashes_of(msg))
+        if self.engine.accept_file_transfer(req_id, save_path, room_name=room_name):
+            logger.info("accepted %s -> %s", msg.get('file_name'), save_path)
+            self.bus.publish("download_accepted", room=room_name, req_id=req_id, path=save_path)
+        else:
+            with self._lock:
+                self._downloads.pop(req_id, None)
+            self._release(msg)
+            logger.warning("could not accept %s in '%s'", req_id, room_name)
+
+    def _reshare(self, room_name: str, path: str, origin: str = ""):
+        try:
+            ok, meta, req_id = self.engine.broadcast_file_request([path], room_name=room_name, origin_sha256=origin)
+        except Exception as e:
+            logger.warning("reshare failed (%s): %s", path, e)
+            return
+        logger.info("reshared %s in '%s' (ok=%s)", meta['name'], room_name, ok)
+        self.bus.publish("reshared", room=room_name, req_id=req_id, path=path)
+
+
+def _safe_name(name: str) -> str:
+    """경로 구분자/상위 폴더 이동을 제거한 파일 이름"""
+    name = os.path.basename(name.replace("\\", "/")).strip()
+    return name if name not in ("", ".", "..") else "unnamed"
+
+
+def _unique_path(path: str) -> str:
+    base, ext = os.path.splitext(path)
+    candidate, n = path, 1
+    while os.path.exists(candidate) or os.path.exists(candidate + "_extracted"):
+        candidate = f"{base} ({n}){ext}"
+        n += 1
+    return candidate
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_logging(level=args.log_level, fmt=args.log_format)
+
+    # 1. 엔진 생성 — GUI와 같은 설정값을 사용하되 콜백은 이벤트 버스로 연결
+    engine = P2PEngine(nickname=args.nickname,
+                       multicast_group=args.multicast_group, multicast_ttl=args.multicast_ttl,
+                       relay_fanout=args.relay_fanout, relay_ttl=args.relay_ttl,
+                       tcp_backlog=args.tcp_backlog, legacy_discovery=args.legacy_discovery)
+    bus = EventBus()
+    bus.attach(engine)
+    sink = open_sink(args.events)
+    if sink is not None:
+        bus.subscribe(sink)
+    HeadlessNode(engine, bus, download_dir=args.download_dir, max_size_mb=args.max_size, reshare=args.reshare)
+
+    # 2. 종료 신호를 받으면 메인 스레드가 깨어나 정리
+    stop_event = threading.Event()
+
+    def on_signal(signum, _frame):
+        logger.info("received signal %s, shutting down", signum)
+        stop_event.set()
+
+    for name in ("SIGINT", "SIGTERM", "SIGHUP"):
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), on_signal)
+
+    # 3. 네트워크 시작 후 방 참여 (첫 방을 기본 방으로 사용)
+    engine.start()
+    for i, room_name in enumerate(args.rooms):
+        engine.join_room(room_name, args.password, focus=(i == 0))
+    bus.publish("started", nickname=args.nickname, session_id=engine.discovery.session_id, rooms=list(args.rooms))
+
+    # 4. 자동화용 로컬 제어 API와 계측 내보내기 (선택)
+    api = None
+    exporters = start_exporters(args.metrics_port, args.metrics_file, args.metrics_interval)
+    try:
+        if args.api_port or args.api_socket:
+            api = ControlAPI(engine, bus, host=args.api_host, port=args.api_port, token=args.api_token,
+                             token_file=args.api_token_file, unix_socket=args.api_socket,
+                             download_dir=args.download_dir or DEFAULT_DOWNLOAD_DIR)
+            api.start()
+        while not stop_event.wait(1.0):
+            pass
+    finally:
+        if api is not None:
+            api.stop()
+        engine.stop()
+        for exporter in exporters:
+            exporter.stop()
+        bus.publish("stopped")
+        if hasattr(sink, "close"):
+            sink.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,99 @@
-import os
-from backend.core.engine import P2PEngine
-from frontend.app import LanChatApp
-from frontend.controllers.ui_controller import UIController
+import threading
+from backend.utils.startup import timer
 from backend.utils.config import global_config
+from backend.utils.logger import get_logger
+
+logger = get_logger("startup")
+
+ENGINE_POLL_MS = 20  # 백그라운드에서 엔진이 준비됐는지 UI 스레드가 확인하는 간격
+
+def create_engine(state):
+    """(백그라운드 스레드) 엔진 모듈 import와 생성 — 로비 창이 뜨는 동안 진행.
+    실패하면 예외를 state["error"]에 남겨 UI 스레드가 표시하도록 함"""
+    try:
+        from backend.core.engine import P2PEngine
+        timer.mark("import engine")
+
+        # 프로세스 수명 동안 유지되는 P2PEngine 생성
+        # (방에 들어가기 전에는 디스커버리만 실행해 방 목록을 집계하고, 입장에 필요한 TCP 서버는 미리 준비해 둠.
+        #  입장/퇴장은 join_room()/leave_room()으로 방 세션만 교체하므로 소켓을 다시 바인딩하지 않음)
+        engine = P2PEngine(nickname=global_config.nickname,
+                           multicast_group=global_config.multicast_group, multicast_ttl=global_config.multicast_ttl,
+                           relay_fanout=global_config.relay_fanout, relay_ttl=global_config.relay_ttl,
+                           tcp_backlog=global_config.tcp_backlog, legacy_discovery=global_config.legacy_discovery)
+    except Exception as e:
+        logger.error("engine startup failed: %s: %s", type(e).__name__, e)
+        state["error"] = e
+        return
+    state["engine"] = engine
+    timer.mark("engine init")
+
+def start_engine(state):
+    """(백그라운드 스레드) 디스커버리/TCP 서버 시작. 시작 중에 창이 닫혔으면 바로 정리"""
+    from backend.utils.metrics import start_exporters_from_env
+    engine = state["engine"]
+    engine.start()
+    engine.prewarm()
+    timer.mark("network started")
+    # LANCHAT_METRICS_PORT / LANCHAT_METRICS_FILE이 지정된 경우에만 계측 내보내기 시작
+    exporters = start_exporters_from_env()
+    with state["lock"]:
+        state["started"] = True
+        state["exporters"] = exporters
+        closed = state["closed"]
+    if closed:
+        stop_engine(state)
+
+def stop_engine(state):
+    state["engine"].stop()
+    for exporter in state["exporters"]:
+        exporter.stop()
 
 def main():
     # 1. 환경설정 로드 확인 (global_config 객체가 자동 수행함)
     if not global_config.nickname:
         global_config.nickname = "Anonymous"
-        
-    # 2. 메인 윈도우 생성
+
+    # 2. 메인 윈도우 생성 — 로비만 먼저 만들어 창을 바로 띄움 (채팅방 화면은 첫 입장 시 생성)
+    from frontend.app import LanChatApp
+    timer.mark("import ui")
     app = LanChatApp()
-    
-    # 3. 로비 상태용 P2PEngine 생성 및 네트워크 시작
-    # (로비 상태에서는 room_name="__LOBBY__" 로 두어 실제 방에 속하지 않게 하며 정보를 주고받음)
-    engine = P2PEngine(nickname=global_config.nickname, password="", room_name="__LOBBY__")
-    engine.start()
-    
-    # 4. 프론트엔드 - 백엔드 링커 연결
-    controller = UIController(app, engine)
-    
+    timer.mark("lobby ui")
+    app.after(0, lambda: timer.mark("first frame"))
+
+    # 3. 엔진 import/생성은 백그라운드에서 진행하고, 준비되면 UI 스레드에서 연결한 뒤 네트워크 시작
+    # (로비의 방 목록은 디스커버리가 피어를 찾는 대로 채워짐)
+    state = {"engine": None, "error": None, "lock": threading.Lock(), "started": False, "closed": False, "exporters": []}
+    threading.Thread(target=create_engine, args=(state,), name="startup", daemon=True).start()
+
+    def attach_engine():
+        error = state["error"]
+        if error is not None:
+            # 엔진을 만들지 못했으면 더 기다리지 않고 로비에 오류를 표시
+            app.views["Lobby"].show_startup_error(f"{type(error).__name__}: {error}")
+            return
+        if state["engine"] is None:
+            app.after(ENGINE_POLL_MS, attach_engine)
+            return
+        # 4. 프론트엔드 - 백엔드 링커 연결 (콜백을 먼저 연결해야 첫 피어/방 이벤트를 놓치지 않음)
+        from frontend.controllers.ui_controller import UIController
+        UIController(app, state["engine"])
+        timer.mark("controller ready")
+        threading.Thread(target=start_engine, args=(state,), name="startup-network", daemon=True).start()
+
+    app.after(0, attach_engine)
+
     # 앱 종료 시 완전한 리소스 정리
     def on_close():
-        if controller.engine:
-            controller.engine.stop()
+        with state["lock"]:
+            state["closed"] = True
+            started = state["started"]
+        if started:
+            stop_engine(state)
         app.destroy()
-        
+
     app.protocol("WM_DELETE_WINDOW", on_close)
-    
+
     # 5. 앱 구동 (초기 뷰 Lobby 노출)
     app.start()
 
@@ -0,0 +1,109 @@
+from backend.core.causal import CausalDeliveryBuffer
+from backend.core.history import MessageRecord
+
+
+def _msg(sender: str, clock: dict) -> MessageRecord:
+    counter = clock[sender]
+    return MessageRecord("MESSAGE", f"{sender}_{counter}", sender, sender, f"{sender}{counter}", 0.0, clock)
+
+
+def _ids(delivered) -> list:
+    return [record.msg_id for record, _clock in delivered]
+
+
+def _offer(buffer: CausalDeliveryBuffer, record: MessageRecord) -> list:
+    return _ids(buffer.offer(record, dict(record.vclock)))
+
+
+def test_in_order_messages_are_delivered_immediately():
+    buffer = CausalDeliveryBuffer()
+    assert _offer(buffer, _msg("a", {"a": 1})) == ["a_1"]
+    assert _offer(buffer, _msg("a", {"a": 2})) == ["a_2"]
+    assert len(buffer) == 0
+
+
+def test_out_of_order_message_waits_for_its_predecessor():
+    buffer = CausalDeliveryBuffer()
+    assert _offer(buffer, _msg("a", {"a": 2})) == []
+    assert len(buffer) == 1
+    assert _offer(buffer, _msg("a", {"a": 1})) == ["a_1", "a_2"]
+    assert len(buffer) == 0
+
+
+def test_chain_of_dependencies_across_senders_delivered_in_causal_order():
+    buffer = CausalDeliveryBuffer()
+    # a1 → b1(a1을 봄) → c1(b1을 봄) → a2(c1을 봄): 역순으로 도착
+    chain = [
+        _msg("a", {"a": 1}),
+        _msg("b", {"a": 1, "b": 1}),
+        _msg("c", {"a": 1, "b": 1, "c": 1}),
+        _msg("a", {"a": 2, "b": 1, "c": 1}),
+    ]
+    for record in reversed(chain[1:]):
+        assert _offer(buffer, record) == []
+    assert len(buffer) == 3
+    assert _offer(buffer, chain[0]) == ["a_1", "b_1", "c_1", "a_2"]
+    assert len(buffer) == 0
+    assert buffer.delivered == {"a": 2, "b": 1, "c": 1}
+
+
+def test_pending_message_is_indexed_only_under_its_first_missing_dependency():
+    buffer = CausalDeliveryBuffer()
+    assert _offer(buffer, _msg("c", {"a": 1, "b": 1, "c": 1})) == []
+    assert set(buffer._waiting) == {"a"}
+
+    # a1이 전달되면 다음으로 부족한 b 아래로 옮겨짐 (전체 재탐색 없이)
+    assert _offer(buffer, _msg("a", {"a": 1})) == ["a_1"]
+    assert set(buffer._waiting) == {"b"}
+    assert len(buffer) == 1
+
+    assert _offer(buffer, _msg("b", {"b": 1})) == ["b_1", "c_1"]
+    assert buffer._waiting == {}
+
+
+def test_concurrently_ready_messages_use_deterministic_total_order():
+    buffer = CausalDeliveryBuffer()
+    pending = [
+        _msg("c", {"a": 1, "c": 1}),
+        _msg("b", {"a": 1, "b": 2}),
+        _msg("b", {"a": 1, "b": 1}),
+    ]
+    for record in pending:
+        assert _offer(buffer, record) == []
+    # (클락 합, 발신자, counter) 순 — 도착 순서와 무관
+    assert _offer(buffer, _msg("a", {"a": 1})) == ["a_1", "b_1", "c_1", "b_2"]
+
+
+def test_locally_generated_messages_satisfy_dependencies():
+    buffer = CausalDeliveryBuffer()
+    buffer.mark_delivered("me", 3)
+    assert _offer(buffer, _msg("b", {"me": 3, "b": 1})) == ["b_1"]
+    assert _offer(buffer, _msg("b", {"me": 4, "b": 2})) == []
+
+
+def test_release_stale_gives_up_on_lost_predecessor():
+    buffer = CausalDeliveryBuffer(wait_timeout=5.0)
+    stuck = _msg("a", {"a": 2})  # a1이 유실됨
+    follower = _msg("b", {"a": 2, "b": 1})
+    assert _offer(buffer, stuck) == []
+    assert _offer(buffer, follower) == []
+    deadline = buffer._expiry[0][0]
+
+    assert buffer.release_stale(now=deadline - 0.1) == []
+    assert len(buffer) == 2
+
+    # 같은 유실 메시지를 기다리던 메시지도 함께 풀려남
+    assert _ids(buffer.release_stale(now=deadline)) == ["a_2", "b_1"]
+    assert len(buffer) == 0
+    assert buffer.delivered == {"a": 2, "b": 1}
+    # 늦게 도착한 유실 메시지의 후속은 바로 전달됨
+    assert _offer(buffer, _msg("a", {"a": 3, "b": 1})) == ["a_3"]
+
+
+def test_release_stale_skips_messages_already_delivered():
+    buffer = CausalDeliveryBuffer(wait_timeout=5.0)
+    assert _offer(buffer, _msg("a", {"a": 2})) == []
+    deadline = buffer._expiry[0][0]
+    assert _offer(buffer, _msg("a", {"a": 1})) == ["a_1", "a_2"]
+    assert buffer.release_stale(now=deadline + 1) == []
+    assert len(buffer) == 0
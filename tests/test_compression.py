@@ -0,0 +1,73 @@
+import json
+import zlib
+
+import pytest
+
+from backend.core import compression
+from backend.core.compression import (
+    CODEC_ZLIB,
+    FLAG_RAW,
+    FLAG_ZLIB,
+    ChunkCompressor,
+    pack_payload,
+    unpack_chunk,
+    unpack_payload,
+)
+
+_TEXT = json.dumps({"type": "MESSAGE", "content": "hello " * 500}).encode("utf-8")
+
+
+def test_small_or_uncompressed_payload_is_passed_through():
+    small = b'{"type": "PING"}'
+    assert pack_payload(small, CODEC_ZLIB) is small
+    assert pack_payload(_TEXT, None) is _TEXT
+    assert unpack_payload(_TEXT) is _TEXT
+
+
+def test_payload_round_trip():
+    packed = pack_payload(_TEXT, CODEC_ZLIB)
+    assert packed[0] == FLAG_ZLIB
+    assert len(packed) < len(_TEXT)
+    assert unpack_payload(packed) == _TEXT
+
+
+def test_truncated_zlib_payload_is_rejected():
+    packed = pack_payload(_TEXT, CODEC_ZLIB)
+    with pytest.raises(ValueError, match="truncated"):
+        unpack_payload(packed[:-8])
+
+
+def test_trailing_data_after_zlib_payload_is_rejected():
+    packed = pack_payload(_TEXT, CODEC_ZLIB)
+    with pytest.raises(ValueError, match="trailing"):
+        unpack_payload(packed + b"junk")
+
+
+def test_oversized_zlib_payload_is_rejected(monkeypatch):
+    monkeypatch.setattr(compression, "MAX_DECOMPRESSED_SIZE", len(_TEXT) - 1)
+    with pytest.raises(ValueError, match="too large"):
+        unpack_payload(pack_payload(_TEXT, CODEC_ZLIB))
+
+
+def test_chunk_round_trip_and_truncation():
+    packer = ChunkCompressor(CODEC_ZLIB)
+    packed = packer.pack(_TEXT)
+    assert packed[0] == FLAG_ZLIB
+    assert unpack_chunk(packed) == _TEXT
+    with pytest.raises(ValueError, match="truncated"):
+        unpack_chunk(packed[: len(packed) // 2])
+
+
+def test_incompressible_chunks_stop_being_compressed():
+    packer = ChunkCompressor(CODEC_ZLIB)
+    noise = zlib.compress(_TEXT * 4, 9)  # 이미 압축된 데이터
+    flags = [packer.pack(noise)[0] for _ in range(compression.CHUNK_GIVE_UP_AFTER + 2)]
+    assert flags == [FLAG_RAW] * len(flags)
+    assert unpack_chunk(bytes((FLAG_RAW,)) + noise) == noise
+
+
+def test_empty_chunk_and_unknown_flag_are_rejected():
+    with pytest.raises(ValueError):
+        unpack_chunk(b"")
+    with pytest.raises(ValueError, match="unknown codec flag"):
+        unpack_chunk(b"\x7fdata")
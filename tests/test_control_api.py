@@ -0,0 +1,145 @@
+import http.client
+import json
+import pathlib
+import socket
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from backend.core.events import EventBus
+from backend.network import control_api
+from backend.network.control_api import ControlAPI
+
+TOKEN = "test-token"
+
+
+@pytest.fixture(scope="module")
+def api(tmp_path_factory):
+    tmp_path = tmp_path_factory.mktemp("api")
+    engine = SimpleNamespace(joined={}, session=None, room_summary=lambda: {})
+    bus = EventBus()
+    api = ControlAPI(engine, bus, port=0, token=TOKEN, download_dir=str(tmp_path / "downloads"))
+    api.start()
+    yield api
+    api.stop()
+
+
+def _request(api, method, path, headers=None, body=None, token=TOKEN):
+    conn = http.client.HTTPConnection("127.0.0.1", api.port, timeout=5)
+    headers = dict(headers or {})
+    if token is not None:
+        headers.setdefault("Authorization", f"Bearer {token}")
+    data = None
+    if body is not None:
+        data = json.dumps(body).encode("utf-8")
+        headers["Content-Type"] = "application/json"
+    try:
+        conn.request(method, path, body=data, headers=headers)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read() or b"null")
+    finally:
+        conn.close()
+
+
+def test_valid_token_is_accepted(api):
+    status, payload = _request(api, "GET", "/rooms")
+    assert status == 200 and payload["joined"] == []
+    status, _ = _request(api, "GET", "/rooms", headers={"Authorization": "", "X-Api-Token": TOKEN})
+    assert status == 200
+
+
+@pytest.mark.parametrize("headers,token", [
+    ({}, None),
+    ({}, "wrong-token"),
+    ({"Authorization": f"Basic {TOKEN}"}, None),
+    ({"X-Api-Token": TOKEN[:-1]}, None),
+])
+def test_missing_or_wrong_token_is_rejected(api, headers, token):
+    status, payload = _request(api, "GET", "/rooms", headers=headers, token=token)
+    assert status == 401 and "token" in payload["error"]
+
+
+@pytest.mark.parametrize("host", ["evil.example", "evil.example:{port}", "127.0.0.1:1", "10.0.0.5:{port}", ""])
+def test_foreign_host_is_rejected(api, host):
+    status, payload = _request(api, "GET", "/rooms", headers={"Host": host.format(port=api.port)})
+    assert status == 403 and "Host" in payload["error"]
+
+
+def test_foreign_origin_is_rejected(api):
+    status, _ = _request(api, "GET", "/rooms", headers={"Origin": f"http://localhost:{api.port}"})
+    assert status == 200
+    status, payload = _request(api, "GET", "/rooms", headers={"Origin": "http://evil.example"})
+    assert status == 403 and "cross-origin" in payload["error"]
+
+
+@pytest.mark.parametrize("field,value", [
+    ("save_path", "../x"),
+    ("save_path", "sub/../../x"),
+    ("save_path", "/etc/passwd"),
+    ("save_path", "."),
+    ("dir", "../elsewhere"),
+])
+def test_download_path_outside_download_dir_is_rejected(api, field, value):
+    status, payload = _request(api, "POST", "/downloads", body={"req_id": "r1", field: value})
+    assert status == 403 and "download directory" in payload["error"]
+
+
+def test_download_path_symlink_escape_is_rejected(api, tmp_path):
+    root = pathlib.Path(api.download_dir)
+    root.mkdir(exist_ok=True)
+    (root / "link").symlink_to(tmp_path)
+    status, _ = _request(api, "POST", "/downloads", body={"req_id": "r1", "save_path": "link/x"})
+    assert status == 403
+
+
+def _read_until(sock, marker: bytes, timeout: float = 5.0) -> bytes:
+    data = b""
+    deadline = time.time() + timeout
+    while marker not in data and time.time() < deadline:
+        chunk = sock.recv(65536)
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def test_slow_event_consumer_stream_is_closed(api, monkeypatch):
+    monkeypatch.setattr(control_api, "EVENT_QUEUE_SIZE", 5)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)  # 읽지 않는 동안 서버 쓰기가 빨리 막히도록
+    sock.settimeout(5)
+    sock.connect(("127.0.0.1", api.port))
+    try:
+        sock.sendall(
+            f"GET /events HTTP/1.1\r\nHost: 127.0.0.1:{api.port}\r\nAuthorization: Bearer {TOKEN}\r\n\r\n".encode()
+        )
+        assert b": connected" in _read_until(sock, b": connected")
+
+        # 클라이언트가 읽지 않는 동안 큰 이벤트를 쏟아 부음 → 대기열이 넘쳐 스트림 구독이 해제됨
+        blob = "x" * 65536
+        published = 0
+        while api.bus._sinks and published < 2000:
+            api.bus.publish("messages", blob=blob, n=published)
+            published += 1
+        assert api.bus._sinks == []
+
+        # 밀린 이벤트를 다 읽으면 서버가 연결을 닫음 (EOF)
+        received = b""
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            received += chunk
+        events = received.count(b"event: messages")
+        assert 0 < events < published
+    finally:
+        sock.close()
+    assert _wait_for(lambda: not api._streams)
+
+
+def _wait_for(predicate, timeout: float = 5.0):
+    deadline = time.time() + timeout
+    while not predicate() and time.time() < deadline:
+        time.sleep(0.01)
+    return predicate()
@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+from backend.network.discovery_protocol import (
+    LEGACY_COMPAT_FIELD, MAX_ADVERTISED_ROOMS, decode_packet, encode_discovery, encode_leave, encode_legacy_discovery,
+    encode_probe,
+)
+
+
+def _discovery(**overrides):
+    fields = dict(session_id="a1b2c3d4", nickname="앨리스", tcp_port=50123, room_name="개발팀", is_private=False, interval=2.5)
+    fields.update(overrides)
+    return encode_discovery(**fields)
+
+
+def test_discovery_round_trip_with_all_flags_and_rooms():
+    packet = decode_packet(_discovery(
+        is_private=True, rooms=[("개발팀", True), ("공지", False)],
+        relay=True, acks=True, batch=True, codecs=("zlib", "zstd"),
+    ))
+    assert packet == {
+        "type": "DISCOVERY",
+        "session_id": "a1b2c3d4",
+        "tcp_port": 50123,
+        "interval": 2.5,
+        "is_private": True,
+        "nickname": "앨리스",
+        "room_name": "개발팀",
+        "rooms": (("개발팀", True), ("공지", False)),
+        "relay": True,
+        "acks": True,
+        "batch": True,
+        "codecs": ("zstd", "zlib"),
+    }
+
+
+def test_discovery_without_optional_parts_omits_them():
+    packet = decode_packet(_discovery())
+    assert "rooms" not in packet
+    for key in ("relay", "acks", "batch", "codecs"):
+        assert key not in packet
+    assert packet["is_private"] is False
+
+    # 빈 목록 블록은 "방 ID 프레임을 이해함"을 뜻하므로 생략과 구분됨
+    assert decode_packet(_discovery(rooms=[]))["rooms"] == ()
+
+
+def test_discovery_caps_rooms_and_long_strings():
+    rooms = [(f"room{i}", False) for i in range(MAX_ADVERTISED_ROOMS + 5)]
+    packet = decode_packet(_discovery(nickname="가" * 200, rooms=rooms))
+    assert len(packet["rooms"]) == MAX_ADVERTISED_ROOMS
+    # 255바이트에서 자르되 멀티바이트 문자를 깨뜨리지 않음
+    assert packet["nickname"] == "가" * 85
+
+
+def test_probe_and_leave_round_trip():
+    assert decode_packet(encode_probe("a1b2c3d4")) == {"type": "DISCOVERY_PROBE", "session_id": "a1b2c3d4"}
+    assert decode_packet(encode_leave("a1b2c3d4")) == {"type": "DISCOVERY_LEAVE", "session_id": "a1b2c3d4"}
+
+
+@pytest.mark.parametrize("cut", [2, 3, 5, 12, 16, 20, -1])
+def test_truncated_packet_is_rejected(cut):
+    data = _discovery(rooms=[("개발팀", True), ("공지", False)])
+    assert decode_packet(data[:cut]) is None
+
+
+def test_unknown_version_or_type_is_rejected():
+    data = bytearray(encode_probe("a1b2c3d4"))
+    data[2] = 99
+    assert decode_packet(bytes(data)) is None
+    data = bytearray(encode_probe("a1b2c3d4"))
+    data[3] = 99
+    assert decode_packet(bytes(data)) is None
+
+
+def test_legacy_json_packets():
+    # 구버전 피어가 보내는 JSON은 그대로 해석
+    legacy = {"type": "DISCOVERY", "nickname": "bob", "session_id": "0000beef", "tcp_port": 1, "room_name": "Lobby", "is_private": False}
+    assert decode_packet(json.dumps(legacy).encode("utf-8")) == legacy
+    assert decode_packet(b"\xff\xfe not json") is None
+    assert decode_packet(b"[1, 2]") is None
+
+    # 호환용 JSON 알림은 구버전이 읽는 키를 모두 담고, 표시 필드로 구분됨
+    compat = json.loads(encode_legacy_discovery("a1b2c3d4", "앨리스", 50123, "개발팀", True))
+    assert {key: compat[key] for key in legacy} == {
+        "type": "DISCOVERY", "nickname": "앨리스", "session_id": "a1b2c3d4",
+        "tcp_port": 50123, "room_name": "개발팀", "is_private": True,
+    }
+    assert compat[LEGACY_COMPAT_FIELD] is True
@@ -0,0 +1,115 @@
+import json
+import socket
+import struct
+import threading
+
+import pytest
+
+from backend.core.engine import P2PEngine
+from backend.core.room_session import frame_for_room
+
+SENDER = "a1b2c3d4"
+
+
+@pytest.fixture
+def engine():
+    engine = P2PEngine("bob")
+    engine.join_room("R")
+    yield engine
+    engine.stop()
+
+
+def _frame(session, counter: int, content: str, **fields) -> bytes:
+    packet = {
+        "type": "MESSAGE",
+        "msg_id": f"{SENDER}_{counter}",
+        "sender_session": SENDER,
+        "sender_nickname": "alice",
+        "content": content,
+        "timestamp": float(counter),
+        "vclock": {SENDER: counter},
+    }
+    packet.update(fields)
+    return frame_for_room(session.room_id, session.security.encrypt(json.dumps(packet).encode("utf-8")))
+
+
+def _connection(engine, frames) -> threading.Thread:
+    """frames를 연결 하나로 보낸 것처럼 수신 처리하는 스레드 (서버의 연결 처리 워커 역할)"""
+    server_side, client_side = socket.socketpair()
+    client_side.sendall(b"".join(struct.pack("!I", len(frame)) + frame for frame in frames))
+    client_side.close()
+    return threading.Thread(target=engine._handle_incoming_tcp, args=(server_side, ("127.0.0.1", 0)))
+
+
+def test_callbacks_follow_history_order_across_connections(engine):
+    session = engine.session
+    received = []
+    second = _connection(engine, [_frame(session, n, f"m{n - 2}") for n in (2, 3, 4)])
+
+    def on_message(record):
+        if record.content == "hello":
+            # "hello"를 전달하는 도중 다른 워커가 뒤따르는 메시지를 받아 처리
+            second.start()
+            second.join(timeout=5)
+        received.append(record.content)
+
+    engine.on_message_received = on_message
+    first = _connection(engine, [_frame(session, 1, "hello")])
+    first.start()
+    first.join(timeout=5)
+    second.join(timeout=5)
+
+    history = [record.content for record in engine.get_history()]
+    assert history == ["hello", "m0", "m1", "m2"]
+    assert received == history
+
+
+def test_room_messages_callback_sees_history_order(engine):
+    session = engine.session
+    received = []
+    engine.on_room_messages = lambda room, records, synced: received.extend(r.content for r in records)
+
+    # 뒤따르는 묶음이 먼저 처리되면 인과 버퍼가 선행 메시지를 기다렸다가 함께 전달
+    later = _connection(engine, [_frame(session, n, f"m{n}") for n in (2, 3)])
+    later.start()
+    later.join(timeout=5)
+    assert received == []
+    first = _connection(engine, [_frame(session, 1, "m1")])
+    first.start()
+    first.join(timeout=5)
+    assert received == ["m1", "m2", "m3"]
+
+
+def test_stale_messages_of_left_room_wait_for_rejoin(engine):
+    session = engine.session
+    session.history_mgr._causal.wait_timeout = 0  # 보류 즉시 만료
+    received, activity = [], []
+    engine.on_room_messages = lambda room, records, synced: received.extend(r.content for r in records)
+    engine.on_room_activity = lambda *args: activity.append(args)
+
+    held = _connection(engine, [_frame(session, 2, "m2")])  # m1이 없어 보류
+    held.start()
+    held.join(timeout=5)
+    engine.leave_room("R")
+    engine._housekeeping()
+    assert received == [] and activity == []
+
+    assert engine.join_room("R") is session
+    engine._housekeeping()
+    assert received == ["m2"]
+
+
+def test_malformed_frame_does_not_drop_rest_of_batch(engine):
+    session = engine.session
+    received = []
+    engine.on_room_messages = lambda room, records, synced: received.extend(r.content for r in records)
+
+    batch = _connection(engine, [
+        _frame(session, 1, "m1"),
+        _frame(session, 2, "bad", sender_session=12345),
+        _frame(session, 2, "bad", vclock={"1": "x"}),
+        _frame(session, 2, "m2"),
+    ])
+    batch.start()
+    batch.join(timeout=5)
+    assert received == ["m1", "m2"]
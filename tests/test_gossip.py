@@ -0,0 +1,49 @@
+import random
+
+from backend.core.gossip import relay_targets, split_targets
+
+
+def _peers(relay: int, plain: int = 0):
+    peers = {f"r{i}": {"relay": True} for i in range(relay)}
+    peers.update({f"p{i}": {} for i in range(plain)})
+    return peers
+
+
+def _ids(targets):
+    return sorted(sid for sid, _info in targets)
+
+
+def test_split_sends_everything_direct_when_relay_is_off_or_room_is_small():
+    peers = _peers(relay=4, plain=2)
+    for fanout in (0, 4, 10):
+        direct, gossip = split_targets(peers, fanout)
+        assert _ids(direct) == sorted(peers) and gossip == []
+
+
+def test_split_keeps_non_relay_peers_direct_and_samples_relays():
+    peers = _peers(relay=20, plain=3)
+    direct, gossip = split_targets(peers, 5, rng=random.Random(1))
+    assert _ids(direct) == ["p0", "p1", "p2"]
+    assert len(gossip) == 5 and len(set(_ids(gossip))) == 5
+    assert all(info.get("relay") for _sid, info in gossip)
+
+
+def test_split_spreads_load_across_relays():
+    peers = _peers(relay=20)
+    rng = random.Random(2)
+    chosen = set()
+    for _ in range(50):
+        chosen.update(_ids(split_targets(peers, 3, rng=rng)[1]))
+    assert chosen == set(peers)
+
+
+def test_relay_targets_skip_excluded_and_non_relay_peers():
+    peers = _peers(relay=3, plain=2)
+    assert _ids(relay_targets(peers, 5, exclude=("r1",))) == ["r0", "r2"]
+    assert relay_targets(peers, 5, exclude=("r0", "r1", "r2")) == []
+
+
+def test_relay_targets_cap_at_fanout():
+    peers = _peers(relay=10)
+    targets = relay_targets(peers, 4, exclude=("r0",), rng=random.Random(3))
+    assert len(targets) == 4 and "r0" not in _ids(targets)
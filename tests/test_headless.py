@@ -0,0 +1,97 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from backend.core.events import EventBus
+from headless import HeadlessNode
+
+
+class _FakeEngine:
+    """HeadlessNode가 쓰는 엔진 메서드만 흉내 — 수락/공유 호출을 기록"""
+
+    def __init__(self):
+        self.discovery = SimpleNamespace(session_id="self0001")
+        self.joined = {"R": SimpleNamespace(outgoing_file_requests={})}
+        self.accepted = []
+        self.shared = []
+        self._lock = threading.Lock()
+
+    def accept_file_transfer(self, req_id, save_path, room_name=None):
+        with self._lock:
+            self.accepted.append(req_id)
+        return True
+
+    def broadcast_file_request(self, paths, speed_limit_bytes=0, room_name=None, origin_sha256=""):
+        req_id = f"reshare-{len(self.shared) + 1}"
+        with self._lock:
+            self.shared.append((paths[0], origin_sha256))
+        # 폴더를 다시 압축한 것처럼 원본과 다른 해시로 공유됨
+        self.joined[room_name].outgoing_file_requests[req_id] = {"file_sha256": f"zip-of-{origin_sha256}"}
+        return True, {"name": "Archive.zip"}, req_id
+
+
+@pytest.fixture
+def node(tmp_path):
+    engine = _FakeEngine()
+    bus = EventBus()
+    HeadlessNode(engine, bus, download_dir=str(tmp_path), reshare=True)
+    return engine, bus
+
+
+def _offer(bus, req_id, sender="peer0001", **fields):
+    msg = {"type": "FILE_REQ", "req_id": req_id, "sender_session": sender, "file_name": "a.bin", "file_size": 10}
+    msg.update(fields)
+    bus.publish("messages", room="R", synced=False, messages=[msg])
+
+
+def _wait(predicate, timeout: float = 5.0):
+    deadline = time.time() + timeout
+    while not predicate() and time.time() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_same_file_is_accepted_once(node):
+    engine, bus = node
+    _offer(bus, "r1", file_sha256="h1")
+    _offer(bus, "r2", sender="peer0002", file_sha256="H1")  # 다른 피어가 같은 파일을 공유
+    assert _wait(lambda: engine.accepted == ["r1"])
+    time.sleep(0.05)
+    assert engine.accepted == ["r1"]
+
+
+def test_reshare_carries_origin_and_copies_are_not_downloaded_back(node):
+    engine, bus = node
+    _offer(bus, "r1", file_sha256="h1")
+    assert _wait(lambda: engine.accepted == ["r1"])
+    bus.publish("download_completed", req_id="r1", path="/tmp/a_extracted")
+    assert _wait(lambda: engine.shared == [("/tmp/a_extracted", "h1")])
+
+    # 다른 재공유 노드가 내 사본을 받아 다시 압축해 공유 → 해시는 다르지만 원본이 같으므로 받지 않음
+    _offer(bus, "r2", sender="keeper02", file_sha256="h3", origin_sha256="h1")
+    # 내가 공유 중인 파일과 해시가 같은 요청도 받지 않음
+    _offer(bus, "r3", sender="keeper02", file_sha256="zip-of-h1")
+    time.sleep(0.05)
+    assert engine.accepted == ["r1"]
+
+
+def test_failed_download_can_be_retried(node):
+    engine, bus = node
+    _offer(bus, "r1", file_sha256="h1")
+    assert _wait(lambda: engine.accepted == ["r1"])
+    bus.publish("download_failed", req_id="r1", error="SHA-256 mismatch")
+    _offer(bus, "r2", sender="peer0002", file_sha256="h1")
+    assert _wait(lambda: engine.accepted == ["r1", "r2"])
+    assert engine.shared == []
+
+
+def test_own_and_history_requests_are_ignored(node):
+    engine, bus = node
+    _offer(bus, "mine", sender="self0001", file_sha256="h9")
+    bus.publish("messages", room="R", synced=True, messages=[
+        {"type": "FILE_REQ", "req_id": "old", "sender_session": "peer0001", "file_sha256": "h8"},
+    ])
+    time.sleep(0.05)
+    assert engine.accepted == []
@@ -0,0 +1,59 @@
+import logging
+import queue
+import sys
+import threading
+
+from backend.utils.logger import _NonBlockingQueueHandler
+
+
+def _record(index: int) -> logging.LogRecord:
+    return logging.LogRecord("lanchat.test", logging.INFO, __file__, 0, "message %d", (index,), None)
+
+
+def test_full_queue_drops_without_blocking_and_reports_count():
+    log_queue = queue.Queue(maxsize=1)
+    handler = _NonBlockingQueueHandler(log_queue)
+    for i in range(4):
+        handler.enqueue(_record(i))
+    assert log_queue.get_nowait().getMessage() == "message 0"
+
+    handler.enqueue(_record(4))
+    reported = log_queue.get_nowait()
+    assert reported.dropped == 3
+    handler.enqueue(_record(5))
+    assert not hasattr(log_queue.get_nowait(), "dropped")
+
+
+def test_dropped_count_is_exact_across_threads():
+    log_queue = queue.Queue(maxsize=8)
+    handler = _NonBlockingQueueHandler(log_queue)
+    threads_count, per_thread = 8, 2000
+    start = threading.Barrier(threads_count)
+
+    def produce():
+        start.wait()
+        for i in range(per_thread):
+            handler.enqueue(_record(i))
+
+    threads = [threading.Thread(target=produce) for _ in range(threads_count)]
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # 스레드 전환을 자주 일으켜 += 경합이 드러나도록
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    delivered = 0
+    reported = 0
+    while True:
+        try:
+            record = log_queue.get_nowait()
+        except queue.Empty:
+            break
+        delivered += 1
+        reported += getattr(record, "dropped", 0)
+    # 큐에 들어간 기록 + 알린 버림 건수 + 아직 알리지 못한 건수 == 전체
+    assert delivered + reported + handler._dropped == threads_count * per_thread
@@ -0,0 +1,57 @@
+import pytest
+
+from backend.core.history import ChatHistoryManager, MessageRecord
+
+
+def _wire(**fields):
+    packet = {
+        "type": "MESSAGE",
+        "msg_id": "a1b2c3d4_1",
+        "sender_session": "a1b2c3d4",
+        "sender_nickname": "alice",
+        "content": "hi",
+        "timestamp": 1.0,
+        "vclock": {"a1b2c3d4": 1},
+    }
+    packet.update(fields)
+    return packet
+
+
+def test_from_wire_keeps_fields_and_extras():
+    record = MessageRecord.from_wire(_wire(file_name="a.bin"))
+    assert record.msg_id == "a1b2c3d4_1"
+    assert record.sender_session == "a1b2c3d4"
+    assert record.full_vclock() == {"a1b2c3d4": 1}
+    assert record.extra == {"file_name": "a.bin"}
+
+
+@pytest.mark.parametrize("fields", [
+    {"sender_session": 123},
+    {"type": ["MESSAGE"]},
+    {"sender_nickname": {"x": 1}},
+    {"content": None, "sender_short_id": 7},
+    {"msg_id": None},
+    {"msg_id": 5},
+    {"timestamp": "now"},
+    {"timestamp": True},
+    {"vclock": [1, 2]},
+    {"vclock": {"a1b2c3d4": "1"}},
+    {"vclock": {"a1b2c3d4": -1}},
+])
+def test_from_wire_rejects_malformed_fields(fields):
+    with pytest.raises(ValueError):
+        MessageRecord.from_wire(_wire(**fields))
+
+
+def test_from_wire_rejects_non_object():
+    with pytest.raises(ValueError):
+        MessageRecord.from_wire(["a1b2c3d4_1"])
+
+
+def test_expand_wire_snapshot_passes_malformed_entries_through():
+    packets = ["junk", _wire(vclock=[1], vclock_delta=True), _wire(msg_id="a1b2c3d4_2", vclock={"a1b2c3d4": 2})]
+    expanded = ChatHistoryManager.expand_wire_snapshot(packets)
+    assert expanded[0] == "junk"
+    with pytest.raises(ValueError):
+        MessageRecord.from_wire(expanded[1])
+    assert MessageRecord.from_wire(expanded[2]).full_vclock() == {"a1b2c3d4": 2}
@@ -0,0 +1,165 @@
+import threading
+import time
+
+import pytest
+
+from backend.network.outbox import ReliableOutbox
+
+
+class _Transport:
+    """transmit 대역 — 전송 시각을 기록하고 결과(ok)를 바로 또는 나중에 돌려줌"""
+
+    def __init__(self, ok: bool = True, auto: bool = True):
+        self.ok = ok
+        self.auto = auto
+        self.sent = []  # [(시각, peer_id, data)]
+        self.waiting = []  # auto=False일 때 아직 결과를 돌려주지 않은 done 콜백
+        self.lock = threading.Lock()
+
+    def __call__(self, peer_id, data, done):
+        with self.lock:
+            self.sent.append((time.time(), peer_id, data))
+            if not self.auto:
+                self.waiting.append(done)
+                return
+        done(self.ok)
+
+    def count(self, peer_id=None):
+        with self.lock:
+            return sum(1 for _, peer, _ in self.sent if peer_id is None or peer == peer_id)
+
+
+def _wait(predicate, timeout: float = 5.0):
+    deadline = time.time() + timeout
+    while not predicate() and time.time() < deadline:
+        time.sleep(0.005)
+    return predicate()
+
+
+@pytest.fixture
+def make_outbox():
+    boxes = []
+
+    def make(transport, **kwargs):
+        states = []
+        box = ReliableOutbox(transport, on_state=lambda *args: states.append(args), **kwargs)
+        box.start()
+        boxes.append(box)
+        return box, states
+
+    yield make
+    for box in boxes:
+        box.stop()
+
+
+def test_ack_from_every_peer_marks_delivered(make_outbox):
+    transport = _Transport()
+    box, states = make_outbox(transport)
+    assert box.submit("R", "m1", [("a", b"x" * 10, True), ("b", b"y" * 10, True)]) == 2
+    assert box.state("m1") == (0, 2, "sending")
+    assert box.pending_bytes() == 20
+
+    box.ack("a", ["m1"])
+    assert box.state("m1") == (1, 2, "sending")
+    box.ack("a", ["m1"])  # 중복 ACK는 무시
+    box.ack("b", ["m1", "unknown"])
+    assert box.state("m1") == (2, 2, "delivered")
+    assert states[-1] == ("R", "m1", 2, 2, "delivered")
+    assert box.pending_bytes() == 0 and box.pending_bytes("a") == 0
+
+
+def test_peer_without_acks_is_delivered_on_successful_send(make_outbox):
+    box, _states = make_outbox(_Transport())
+    box.submit("R", "m1", [("old", b"x", False)])
+    assert box.state("m1") == (1, 1, "delivered")
+    assert box.pending_bytes() == 0
+
+
+def test_retransmits_with_exponential_backoff_then_gives_up(make_outbox):
+    transport = _Transport()
+    box, states = make_outbox(transport, base_delay=0.05, max_delay=0.2, max_attempts=5)
+    box.submit("R", "m1", [("a", b"x", True)])
+    assert _wait(lambda: box.state("m1")[2] == "failed")
+    assert transport.count() == 5
+
+    times = [sent_at for sent_at, _, _ in transport.sent]
+    gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+    # 0.05, 0.1, 0.2, 0.2(상한) 간격
+    for gap, expected in zip(gaps, (0.05, 0.1, 0.2, 0.2)):
+        assert expected * 0.9 <= gap < expected + 0.15
+    assert states[-1] == ("R", "m1", 0, 1, "failed")
+    assert box.pending_bytes() == 0
+
+
+def test_ack_stops_retransmission(make_outbox):
+    transport = _Transport()
+    box, _states = make_outbox(transport, base_delay=0.05)
+    box.submit("R", "m1", [("a", b"x", True)])
+    assert _wait(lambda: transport.count() >= 2)
+    box.ack("a", ["m1"])
+    sent = transport.count()
+    time.sleep(0.3)
+    assert transport.count() == sent
+    assert box.state("m1") == (1, 1, "delivered")
+
+
+def test_ack_during_send_is_not_overwritten(make_outbox):
+    transport = _Transport(auto=False)
+    box, _states = make_outbox(transport, base_delay=0.05)
+    box.submit("R", "m1", [("a", b"x", True)])
+    box.ack("a", ["m1"])
+    transport.waiting.pop()(False)  # 전송 결과가 ACK보다 늦게 도착
+    time.sleep(0.15)
+    assert transport.count() == 1
+    assert box.state("m1") == (1, 1, "delivered")
+
+
+def test_forget_peer_fails_its_frames_only(make_outbox):
+    transport = _Transport()
+    box, states = make_outbox(transport, base_delay=0.05)
+    box.submit("R", "m1", [("a", b"x" * 4, True), ("b", b"y" * 4, True)])
+    box.submit("R", "m2", [("a", b"z" * 4, True)])
+    box.forget_peer("a")
+    assert box.pending_bytes("a") == 0 and box.pending_bytes() == 4
+    assert box.state("m2") == (0, 1, "failed")
+    box.ack("b", ["m1"])
+    assert box.state("m1") == (1, 2, "failed")
+    sent = transport.count("a")
+    time.sleep(0.2)
+    assert transport.count("a") == sent  # 떠난 피어에게는 더 보내지 않음
+
+
+def test_peer_byte_cap_evicts_oldest(make_outbox):
+    box, _states = make_outbox(_Transport(), base_delay=10, max_peer_bytes=25)
+    for i in range(3):
+        box.submit("R", f"m{i}", [("a", b"x" * 10, True)])
+    assert box.state("m0") == (0, 1, "failed")
+    assert box.state("m1")[2] == box.state("m2")[2] == "sending"
+    assert box.pending_bytes("a") == 20 == box.pending_bytes()
+
+
+def test_total_byte_cap_evicts_from_heaviest_peer(make_outbox):
+    box, _states = make_outbox(_Transport(), base_delay=10, max_total_bytes=35)
+    box.submit("R", "m0", [("a", b"x" * 10, True)])
+    box.submit("R", "m1", [("a", b"x" * 10, True)])
+    box.submit("R", "m2", [("b", b"y" * 14, True)])
+    assert box.state("m0")[2] == "sending"  # 상한 이하이면 보관
+    box.submit("R", "m3", [("b", b"y" * 2, True)])
+    assert box.state("m0") == (0, 1, "failed")  # a(20) > b(16)이므로 a의 가장 오래된 프레임
+    assert box.pending_bytes() == 26
+    assert box.pending_bytes("a") == 10 and box.pending_bytes("b") == 16
+
+
+def test_resubmitting_same_message_replaces_pending_bytes(make_outbox):
+    transport = _Transport()
+    box, _states = make_outbox(transport, base_delay=10, max_peer_bytes=25)
+    box.submit("R", "m1", [("a", b"x" * 10, True)])
+    box.submit("R", "m1", [("a", b"x" * 10, True)])  # 다시 보내기
+    assert box.pending_bytes("a") == 10 == box.pending_bytes()
+
+    # 이중으로 셌다면 여기서 상한을 넘어 m2가 포기됨
+    box.submit("R", "m2", [("a", b"y" * 10, True)])
+    assert box.state("m2")[2] == "sending"
+    box.ack("a", ["m1", "m2"])
+    assert box.pending_bytes() == 0
+    assert box.state("m1") == (1, 1, "delivered")
@@ -0,0 +1,79 @@
+import socket
+import time
+
+import pytest
+
+from backend.core.engine import P2PEngine
+from backend.network.discovery import PeerDiscovery
+from backend.network.discovery_protocol import encode_discovery, encode_leave
+
+PEER = "feedbeef"
+PORT = 50557
+
+
+def _wait(predicate, timeout: float = 5.0):
+    deadline = time.time() + timeout
+    while not predicate() and time.time() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+@pytest.fixture
+def discovery():
+    discovery = PeerDiscovery("me", 1234, port=PORT)
+    discovery.legacy_announce = False
+    discovery.start()
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    yield discovery, sender
+    sender.close()
+    discovery.stop()
+
+
+def _announce(sender, nickname="peer"):
+    sender.sendto(encode_discovery(PEER, nickname, 4321, "R", False, 5.0, rooms=[("R", False)]), ("127.0.0.1", PORT))
+
+
+def test_evicted_peer_stays_out_until_readmitted(discovery):
+    discovery, sender = discovery
+    _announce(sender)
+    assert _wait(lambda: discovery.get_peer(PEER) is not None)
+
+    assert discovery.evict(PEER)
+    _announce(sender, nickname="renamed")
+    assert _wait(lambda: discovery.suppressed_peers() and discovery._suppressed[PEER][0]["nickname"] == "renamed")
+    # UDP 알림이 계속 와도 다시 join되지 않음
+    assert discovery.get_peer(PEER) is None
+    assert discovery.suppressed_peers() == {PEER: ("127.0.0.1", 4321)}
+
+    assert discovery.readmit(PEER)
+    assert discovery.get_peer(PEER)["nickname"] == "renamed"
+    assert not discovery.is_suppressed(PEER)
+
+
+def test_leave_or_silence_ends_suppression(discovery):
+    discovery, sender = discovery
+    _announce(sender)
+    assert _wait(lambda: discovery.get_peer(PEER) is not None)
+    discovery.evict(PEER)
+    sender.sendto(encode_leave(PEER), ("127.0.0.1", PORT))
+    assert _wait(lambda: not discovery.is_suppressed(PEER))
+
+    _announce(sender)
+    assert _wait(lambda: discovery.get_peer(PEER) is not None)
+    discovery.evict(PEER)
+    info, ttl, _expires = discovery._suppressed[PEER]
+    discovery._suppressed[PEER] = (info, ttl, time.time() - 1)  # 알림이 끊긴 지 오래됨
+    assert discovery.suppressed_peers() == {}
+    assert not discovery.readmit(PEER)
+
+
+def test_engine_readmits_peer_on_tcp_contact():
+    engine = P2PEngine("bob")
+    try:
+        engine.discovery.registry.upsert(PEER, {"ip": "127.0.0.1", "tcp_port": 1, "nickname": "alice", "room_name": "R"})
+        engine._on_peer_dead(PEER)
+        assert engine.discovery.get_peer(PEER) is None
+        engine._record_contact(PEER)
+        assert engine.discovery.get_peer(PEER)["nickname"] == "alice"
+    finally:
+        engine.stop()
@@ -0,0 +1,91 @@
+from backend.core.history import MessageRecord
+from backend.core.search import HistorySearchIndex, tokenize
+
+
+def _message(index: int, sender: str, content: str) -> MessageRecord:
+    return MessageRecord("MESSAGE", f"{sender}_{index}", sender, sender, content, float(index))
+
+
+def _file(index: int, sender: str, file_name: str) -> MessageRecord:
+    return MessageRecord("FILE_REQ", f"{sender}_{index}", sender, sender, "", float(index), extra={"file_name": file_name})
+
+
+def _index(*records) -> HistorySearchIndex:
+    index = HistorySearchIndex()
+    for record in records:
+        index.add(record)
+    return index
+
+
+def _ids(results) -> list:
+    return [record.msg_id for record in results]
+
+
+def test_tokenize_lowercases_and_splits_on_non_word_characters():
+    assert tokenize("Hello, 세계! report-v2") == ["hello", "세계", "report", "v2"]
+    assert tokenize("") == []
+
+
+def test_words_are_combined_with_and():
+    index = _index(
+        _message(1, "alice", "lunch at noon"),
+        _message(2, "bob", "meeting at noon"),
+        _message(3, "alice", "lunch tomorrow"),
+    )
+    assert _ids(index.search("lunch noon")) == ["alice_1"]
+    assert _ids(index.search("noon")) == ["bob_2", "alice_1"]
+    assert index.search("lunch dinner") == []
+
+
+def test_trailing_star_matches_prefix():
+    index = _index(
+        _message(1, "alice", "deploy finished"),
+        _message(2, "bob", "deployment failed"),
+        _message(3, "carol", "redeploy later"),
+    )
+    assert _ids(index.search("deploy*")) == ["bob_2", "alice_1"]
+    assert _ids(index.search("deploy")) == ["alice_1"]
+    assert _ids(index.search("deploy* fail*")) == ["bob_2"]
+
+
+def test_from_restricts_to_sender_nickname():
+    index = _index(
+        _message(1, "alice", "hello bob"),
+        _message(2, "bob", "hello alice"),
+    )
+    assert _ids(index.search("bob")) == ["bob_2", "alice_1"]
+    assert _ids(index.search("from:bob")) == ["bob_2"]
+    assert _ids(index.search("from:bob hello")) == ["bob_2"]
+    assert _ids(index.search("FROM:ali*")) == ["alice_1"]
+
+
+def test_file_restricts_to_file_request_names():
+    index = _index(
+        _message(1, "alice", "the report is coming"),
+        _file(2, "alice", "Quarterly-Report.pdf"),
+        _file(3, "bob", "photo.png"),
+    )
+    assert _ids(index.search("report")) == ["alice_2", "alice_1"]
+    assert _ids(index.search("file:report")) == ["alice_2"]
+    assert _ids(index.search("file:quarterly-report")) == ["alice_2"]
+    assert _ids(index.search("file:p*")) == ["bob_3", "alice_2"]
+
+
+def test_unknown_field_prefix_is_searched_as_plain_text():
+    index = _index(_message(1, "alice", "see http://intranet docs"))
+    assert _ids(index.search("http://intranet")) == ["alice_1"]
+
+
+def test_results_are_newest_first_and_limited():
+    index = _index(*(_message(i, "alice", f"status update {i}") for i in range(100)))
+    assert _ids(index.search("status", limit=3)) == ["alice_99", "alice_98", "alice_97"]
+    assert len(index.search("status", limit=None)) == 100
+    # 흔하지 않은 단어와 흔한 접두어를 섞어도 결과는 같음
+    assert _ids(index.search("up* 42")) == ["alice_42"]
+
+
+def test_non_message_types_are_not_indexed():
+    index = _index(MessageRecord("SYSTEM", "s_1", "", "", "alice joined", 0.0))
+    assert len(index) == 0
+    assert index.search("alice") == []
+    assert index.search("") == []
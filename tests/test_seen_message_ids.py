@@ -0,0 +1,87 @@
+from backend.core.history import ChatHistoryManager, MessageRecord, SeenMessageIds
+
+
+def test_in_order_ids_advance_high_water_mark():
+    seen = SeenMessageIds()
+    for counter in range(1, 6):
+        assert seen.add(f"abcd1234_{counter}")
+    assert seen._senders["abcd1234"] == (5, None)
+    assert "abcd1234_5" in seen
+    assert "abcd1234_6" not in seen
+    assert len(seen) == 5
+
+
+def test_duplicates_are_rejected():
+    seen = SeenMessageIds()
+    assert seen.add("a_1")
+    assert not seen.add("a_1")
+    assert seen.add("a_3")
+    assert not seen.add("a_3")  # gap 집합에 있는 id
+    assert len(seen) == 2
+
+
+def test_out_of_order_ids_are_kept_as_gaps_then_absorbed():
+    seen = SeenMessageIds()
+    for counter in (1, 3, 4, 6):
+        seen.add(f"a_{counter}")
+    assert seen._senders["a"] == (1, {3, 4, 6})
+    assert "a_2" not in seen
+    assert "a_5" not in seen
+
+    # 빈 자리가 메워지면 연속 구간이 high-water mark로 흡수되고 남은 gap만 유지
+    assert seen.add("a_2")
+    assert seen._senders["a"] == (4, {6})
+    assert seen.add("a_5")
+    assert seen._senders["a"] == (6, None)
+    assert all(f"a_{counter}" in seen for counter in range(1, 7))
+    assert len(seen) == 6
+
+
+def test_ids_below_high_water_mark_count_as_seen():
+    seen = SeenMessageIds()
+    for counter in range(1, 101):
+        seen.add(f"a_{counter}")
+    assert not seen.add("a_1")
+    assert not seen.add("a_100")
+    assert seen.add("a_101")
+
+
+def test_senders_are_independent():
+    seen = SeenMessageIds()
+    seen.add("a_1")
+    assert "b_1" not in seen
+    assert seen.add("b_1")
+    assert seen.add("a_2")
+    assert seen._senders["a"] == (2, None)
+    assert seen._senders["b"] == (1, None)
+
+
+def test_session_id_may_contain_underscores():
+    seen = SeenMessageIds()
+    assert seen.add("node_x_1")
+    assert "node_x_1" in seen
+    assert "node_1" not in seen
+    assert seen._senders["node_x"] == (1, None)
+
+
+def test_non_canonical_ids_fall_back_to_exact_set():
+    seen = SeenMessageIds()
+    # 0, 앞자리 0, 음수, 숫자가 아닌 counter, 구분자 없음 — 압축 표현으로 바꾸면 오탐이 생길 수 있는 형식
+    foreign = ["a_0", "a_007", "a_-1", "a_x", "plain", "_5", None, 42]
+    for msg_id in foreign:
+        assert seen.add(msg_id)
+        assert not seen.add(msg_id)
+        assert msg_id in seen
+    assert "a" not in seen._senders
+    assert "a_7" not in seen  # "a_007"과 같은 id로 보지 않음
+    assert seen.add("a_7")
+    assert len(seen) == len(foreign) + 1
+
+
+def test_history_manager_drops_duplicate_remote_messages():
+    history = ChatHistoryManager("local")
+    record = MessageRecord("MESSAGE", "peer_1", "peer", "bob", "hi", 1.0, {"peer": 1})
+    assert history.receive_remote_message(record) == [record]
+    duplicate = MessageRecord("MESSAGE", "peer_1", "peer", "bob", "hi", 1.0, {"peer": 1})
+    assert history.receive_remote_message(duplicate) == []
+    assert len(history.messages) == 1
@@ -0,0 +1,137 @@
+import json
+import random
+import threading
+import time
+
+import pytest
+
+from backend.core.engine import P2PEngine
+from backend.core.room_session import frame_for_room
+from backend.network import send_queue as send_queue_module
+from backend.network.send_queue import PeerSendQueue
+
+SENDER = "a1b2c3d4"
+
+
+class _FakeClient:
+    """P2PClient 대신 연결마다 보낸 프레임 묶음을 기록. 첫 연결은 느리게 끝나 뒤따르는 프레임이 쌓이게 함"""
+
+    def __init__(self, first_delay: float = 0.1):
+        self.connections = []
+        self.first_delay = first_delay
+        self.sending = threading.Event()
+
+    def send_data(self, ip, port, payload):
+        return self.send_frames(ip, port, [payload])
+
+    def send_frames(self, ip, port, payloads):
+        if not self.connections:
+            self.sending.set()
+            time.sleep(self.first_delay)
+        self.connections.append(list(payloads))
+        return True
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    client = _FakeClient()
+    monkeypatch.setattr(send_queue_module, "P2PClient", client)
+    return client
+
+
+def _wait(predicate, timeout: float = 5.0):
+    deadline = time.time() + timeout
+    while not predicate() and time.time() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_frames_to_one_peer_keep_submit_order_and_batch(fake_client):
+    queue = PeerSendQueue(lambda peer_id: ("127.0.0.1", 1, True), workers=4)
+    queue.start()
+    try:
+        results = []
+        queue.submit("p", b"0", lambda ok: results.append(0))
+        assert fake_client.sending.wait(5)
+        for i in range(1, 10):
+            queue.submit("p", b"%d" % i, lambda ok, i=i: results.append(i))
+        assert _wait(lambda: len(results) == 10)
+    finally:
+        queue.stop()
+    # 첫 프레임은 혼자, 그동안 쌓인 나머지는 한 연결로
+    assert fake_client.connections[0] == [b"0"]
+    assert [frame for conn in fake_client.connections for frame in conn] == [b"%d" % i for i in range(10)]
+    assert len(fake_client.connections) == 2
+    assert results == list(range(10))
+
+
+def test_peer_without_batch_support_gets_one_frame_per_connection(fake_client):
+    queue = PeerSendQueue(lambda peer_id: ("127.0.0.1", 1, False), workers=2)
+    queue.start()
+    try:
+        done = []
+        for i in range(3):
+            queue.submit("p", b"%d" % i, done.append)
+        assert _wait(lambda: len(done) == 3)
+    finally:
+        queue.stop()
+    assert fake_client.connections == [[b"0"], [b"1"], [b"2"]]
+
+
+def test_unresolved_peer_fails_without_connecting(fake_client):
+    queue = PeerSendQueue(lambda peer_id: None)
+    queue.start()
+    try:
+        done = []
+        queue.submit("gone", b"x", done.append)
+        assert _wait(lambda: done == [False])
+    finally:
+        queue.stop()
+    assert fake_client.connections == []
+
+
+def _frame(session, counter: int) -> bytes:
+    packet = {
+        "type": "MESSAGE",
+        "msg_id": f"{SENDER}_{counter}",
+        "sender_session": SENDER,
+        "sender_nickname": "alice",
+        "content": f"m{counter}",
+        "timestamp": float(counter),
+        "vclock": {SENDER: counter},
+    }
+    return frame_for_room(session.room_id, session.security.encrypt(json.dumps(packet).encode("utf-8")))
+
+
+def test_receiver_restores_per_peer_order_across_connections():
+    """송신 큐는 첫 프레임과 뒤따르는 묶음을 서로 다른 연결로 보내고, 수신측은 연결마다 다른 워커가 읽음.
+    수신 콜백은 보낸 순서 그대로여야 함"""
+    engine = P2PEngine("bob")
+    session = engine.join_room("R")
+    received = []
+    lock = threading.Lock()
+    delays = random.Random(1)
+
+    def on_room_messages(room, records, synced):
+        # 걸리는 시간이 들쭉날쭉한 콜백 (UI 갱신 등) — 그동안 다른 워커가 다음 연결을 처리
+        time.sleep(delays.uniform(0, 0.005))
+        with lock:
+            received.extend(record.content for record in records)
+
+    engine.on_room_messages = on_room_messages
+    queue = PeerSendQueue(lambda peer_id: ("127.0.0.1", engine.tcp_server.port, True))
+    queue.start()
+    total = 40
+    try:
+        counter = 0
+        for burst in (1, 5, 1, 3, 10, 1, 7, 12):
+            for _ in range(burst):
+                counter += 1
+                queue.submit("bob", _frame(session, counter))
+            time.sleep(0.002)
+        assert counter == total
+        assert _wait(lambda: len(received) == total)
+    finally:
+        queue.stop()
+        engine.stop()
+    assert received == [f"m{i}" for i in range(1, total + 1)]
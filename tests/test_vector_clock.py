@@ -0,0 +1,40 @@
+import time
+
+from backend.core.history import VectorClock
+
+
+def _idle(clock: VectorClock, node: str, seconds: float = 1000):
+    clock.last_advanced[node] = time.time() - seconds
+
+
+def test_prune_removes_departed_idle_nodes_only():
+    clock = VectorClock("me")
+    clock.merge({"gone": 3, "idle": 2, "busy": 5})
+    _idle(clock, "gone")
+    _idle(clock, "idle")
+    assert clock.prune(present_nodes=["idle"]) == ["gone"]
+    assert clock.get_clock() == {"me": 0, "idle": 2, "busy": 5}
+
+
+def test_pruned_node_is_not_readded_by_peer_that_has_not_pruned_yet():
+    clock = VectorClock("me")
+    clock.merge({"gone": 3})
+    _idle(clock, "gone")
+    assert clock.prune(present_nodes=[]) == ["gone"]
+
+    # 아직 "gone"을 정리하지 않은 피어의 클락 — 같거나 낮은 값은 무시
+    clock.merge({"gone": 3, "peer": 1})
+    clock.merge({"gone": 2})
+    assert clock.get_clock() == {"me": 0, "peer": 1}
+    assert clock.prune(present_nodes=["peer"]) == []
+
+
+def test_pruned_node_that_advanced_again_is_restored():
+    clock = VectorClock("me")
+    clock.merge({"back": 3})
+    _idle(clock, "back")
+    clock.prune(present_nodes=[])
+
+    clock.merge({"back": 4})
+    assert clock.get_clock()["back"] == 4
+    assert "back" not in clock.pruned